@@ -0,0 +1,16 @@
+"""
+PFForth benchmark suite
+
+Usage:
+    python main.py bench                     # ejecuta y compara con baseline.json
+    python main.py bench fib sieve           # solo los casos que contienen 'fib' o 'sieve'
+    python main.py bench --save-baseline     # guarda los resultados como nueva referencia
+
+Los casos Forth estan en suite.fth; el runner mide cada uno con f.bench()
+y escribe los resultados en JSON.  baseline.json es local a cada maquina
+(no se versiona): sin el, o si es de otra maquina, bench no falla.
+"""
+
+from .runner import CASES, run_suite, compare, main
+
+__all__ = ['CASES', 'run_suite', 'compare', 'main']
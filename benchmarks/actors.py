@@ -0,0 +1,82 @@
+"""
+PFForth actor benchmark - contention on the send path (N senders, 1 receiver)
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+try:
+    from pfforth import InteractiveForth
+except ImportError:
+    from pfforth.repl import InteractiveForth
+
+
+DEFAULT_SENDERS = (1, 2, 4, 8)
+DEFAULT_MESSAGES = 20000    # mensajes por emisor
+
+SOURCE = """
+0 value sink-id
+0 value per-sender
+0 value expected
+: sink  0 begin receive drop 1+ dup expected = until drop ;
+: blast  per-sender 0 do i sink-id actor-send loop ;
+"""
+
+
+def run_contention(senders, messages, f=None):
+    """Lanza un actor receptor y senders emisores que le envían messages
+    mensajes cada uno a la vez; devuelve un dict con el tiempo total y
+    los mensajes por segundo que atraviesan actor-send"""
+    f = f if f is not None else InteractiveForth()
+    with contextlib.redirect_stdout(io.StringIO()):
+        f.execute(SOURCE)
+        f.execute(f"{messages} to per-sender {senders * messages} to expected")
+        f.execute("' sink actor-spawn to sink-id")
+        for _ in range(senders):
+            f.execute("' blast actor-spawn drop")
+        f._flush_output()
+        start = time.perf_counter()
+        f.execute("actor-run sink-id actor-wait")
+        elapsed = time.perf_counter() - start
+        f._flush_output()
+    total = senders * messages
+    return {
+        'senders': senders,
+        'messages': total,
+        'elapsed': elapsed,
+        'msgs_sec': total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    """Punto de entrada de 'python -m benchmarks.actors [N...] [--messages M]'"""
+    args = list(sys.argv[1:] if argv is None else argv)
+    messages = DEFAULT_MESSAGES
+    counts = []
+    i = 0
+    while i < len(args):
+        try:
+            if args[i] == '--messages':
+                messages = int(args[i + 1])
+                i += 1
+            else:
+                counts.append(int(args[i]))
+        except (IndexError, ValueError):
+            print("Uso: python -m benchmarks.actors [emisores...] [--messages M]")
+            return 2
+        i += 1
+
+    f = InteractiveForth()
+    print(f"{'Emisores':>8} {'Mensajes':>10} {'Tiempo':>10} {'msg/s':>12}")
+    print("-" * 44)
+    for n in counts or DEFAULT_SENDERS:
+        r = run_contention(n, messages, f)
+        print(f"{r['senders']:>8} {r['messages']:>10} "
+              f"{r['elapsed']:>9.3f}s {r['msgs_sec']:>12,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+PFForth codec benchmark - encode/decode of pfforth-actor envelopes, JSON (v1) vs binary (v2)
+"""
+
+import sys
+import time
+
+from pfforth import codec
+
+
+DEFAULT_ROUNDS = 20000      # codificaciones por caso
+
+CASES = [
+    ('int', 42),
+    ('int grande', 2 ** 40 + 7),
+    ('float', 3.14159),
+    ('str', "temperatura sala 2"),
+    ('lista', [1, 2.5, "x", [3, 4], None, True]),
+    ('lista 100 int', list(range(100))),
+]
+
+
+def _cases():
+    cases = list(CASES)
+    try:
+        import numpy as np
+    except ImportError:
+        return cases
+    cases.append(('ndarray f32[256]', np.arange(256, dtype=np.float32)))
+    return cases
+
+
+def _timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def run_case(value, rounds, to_id=10, from_id=3):
+    """Tamaño y tiempos por mensaje (s) de codificar y decodificar value en
+    JSON y en binario"""
+    result = {}
+    for name, v in (('json', codec.V_JSON), ('bin', codec.V_BINARY)):
+        packet = codec.encode(to_id, from_id, value, v)
+        result[name] = {
+            'bytes':  len(packet),
+            'encode': _timed(lambda: codec.encode(to_id, from_id, value, v), rounds),
+            'decode': _timed(lambda: codec.decode(packet), rounds),
+        }
+    return result
+
+
+def main(argv=None):
+    """Punto de entrada de 'python -m benchmarks.codec [--rounds N]'"""
+    args = list(sys.argv[1:] if argv is None else argv)
+    rounds = DEFAULT_ROUNDS
+    try:
+        if args:
+            if args[0] != '--rounds' or len(args) != 2:
+                raise ValueError
+            rounds = int(args[1])
+    except ValueError:
+        print("Uso: python -m benchmarks.codec [--rounds N]")
+        return 2
+
+    us = lambda s: f"{s * 1e6:.2f}"
+    print(f"{'Caso':<18} {'Bytes json':>10} {'bin':>6}   "
+          f"{'enc json':>9} {'bin':>7}   {'dec json':>9} {'bin':>7}  (us/msg)")
+    print("-" * 84)
+    for label, value in _cases():
+        r = run_case(value, rounds)
+        j, b = r['json'], r['bin']
+        print(f"{label:<18} {j['bytes']:>10} {b['bytes']:>6}   "
+              f"{us(j['encode']):>9} {us(b['encode']):>7}   "
+              f"{us(j['decode']):>9} {us(b['decode']):>7}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
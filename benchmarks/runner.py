@@ -0,0 +1,200 @@
+"""
+PFForth benchmark runner - runs suite.fth cases and compares with a baseline
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+
+try:
+    from pfforth import InteractiveForth
+except ImportError:
+    from pfforth.repl import InteractiveForth
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SUITE_FILE = os.path.join(BENCH_DIR, 'suite.fth')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')   # local, no versionado
+RESULTS_FILE = 'bench-results.json'
+DEFAULT_SAMPLES = 15
+DEFAULT_THRESHOLD = 0.25    # regresión máxima tolerada sobre la mediana
+
+
+def _dsl_chain(f):
+    """Caso DSL: encadenamiento de métodos resueltos por __getattr__"""
+    def run():
+        for _ in range(20):
+            f.push(3, 4).tuck().nip().sq().drop().drop()
+    return run
+
+
+def _startup(f):
+    """Caso de arranque: construir un intérprete completo (actores, workers)"""
+    return InteractiveForth
+
+
+# nombre -> palabra de suite.fth, fábrica f -> callable, o
+# (palabra o fábrica, profundidad de pila con la que se mide)
+CASES = {
+    'fib-rec': 'bench-fib-rec',
+    'fib-iter': 'bench-fib-iter',
+    'sieve': 'bench-sieve',
+    'bubble-sort': 'bench-bubble',
+    'nested-do': 'bench-nested',
+    'case-dispatch': 'bench-case',
+    's>mem': 'bench-s>mem',
+    'locals': 'bench-locals',
+    'py-calls': 'bench-py',
+    'catch': 'bench-catch',
+    'catch-deep': ('bench-catch', 5000),
+    'dsl-chain': _dsl_chain,
+    'startup': _startup,
+}
+
+
+def create_suite_forth():
+    """Crea un intérprete con suite.fth cargado"""
+    f = InteractiveForth()
+    with open(SUITE_FILE, 'r') as file:
+        f.execute(file.read())
+    f._flush_output()
+    return f
+
+
+def run_suite(names=None, samples=DEFAULT_SAMPLES, quiet=False):
+    """Ejecuta los casos (todos o los que contienen alguno de names) y
+    devuelve un dict serializable con los resultados de f.bench()"""
+    f = create_suite_forth()
+    results = {}
+    for case, target in CASES.items():
+        if names and not any(n in case for n in names):
+            continue
+        target, depth = target if isinstance(target, tuple) else (target, 0)
+        word = target if isinstance(target, str) else target(f)
+        f.stack.clear()
+        f.stack.extend(range(depth))
+        r = f.bench(word, samples, quiet=True)
+        r['word'] = case
+        results[case] = r
+        if not quiet:
+            print(f"{case:<16} {f._bench_fmt(r['median']):>12} mediana  "
+                  f"{f._bench_fmt(r['p95']):>12} p95  {r['ops_sec']:>12,.0f} ops/s")
+    return {
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'samples': samples,
+        'cases': results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compara medianas con baseline. Devuelve [(caso, antes, ahora, ratio)]
+    de los casos que empeoran más de threshold (0.25 = 25%)"""
+    regressions = []
+    for case, r in results['cases'].items():
+        ref = baseline.get('cases', {}).get(case)
+        if not ref or ref['median'] <= 0:
+            continue
+        ratio = r['median'] / ref['median']
+        if ratio > 1 + threshold:
+            regressions.append((case, ref['median'], r['median'], ratio))
+    return regressions
+
+
+def same_machine(results, baseline):
+    """True si baseline se midió en esta máquina y con este Python: los
+    tiempos absolutos de otra no sirven para decidir una regresión"""
+    return all(baseline.get(k) == results[k] for k in ('host', 'python', 'platform'))
+
+
+def _print_comparison(results, baseline):
+    """Imprime la variación de cada caso respecto al baseline"""
+    print(f"\n{'Caso':<16} {'Baseline':>12} {'Actual':>12} {'Cambio':>9}")
+    print("-" * 52)
+    fmt = InteractiveForth._bench_fmt
+    for case, r in results['cases'].items():
+        ref = baseline.get('cases', {}).get(case)
+        if not ref:
+            print(f"{case:<16} {'-':>12} {fmt(r['median']):>12} {'nuevo':>9}")
+            continue
+        change = (r['median'] / ref['median'] - 1) * 100 if ref['median'] else 0.0
+        print(f"{case:<16} {fmt(ref['median']):>12} {fmt(r['median']):>12} {change:>+8.1f}%")
+
+
+def main(argv=None):
+    """Punto de entrada de 'python main.py bench'. Devuelve el código de salida:
+    0 si todo va bien, 1 si algún caso empeora más que el umbral."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    usage = ("Uso: python main.py bench [casos...] [--samples N] [--threshold PCT]\n"
+             "                          [--json fichero] [--baseline fichero] [--save-baseline]")
+    options = {'--samples': DEFAULT_SAMPLES, '--threshold': DEFAULT_THRESHOLD * 100,
+               '--json': RESULTS_FILE, '--baseline': BASELINE_FILE}
+    save_baseline = False
+    names = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '--save-baseline':
+            save_baseline = True
+        elif arg in options:
+            if i + 1 >= len(args):
+                print(usage)
+                return 2
+            value = args[i + 1]
+            try:
+                if arg == '--samples':
+                    value = int(value)
+                elif arg == '--threshold':
+                    value = float(value)
+            except ValueError:
+                print(f"Error: valor no valido para {arg}: {value}")
+                return 2
+            options[arg] = value
+            i += 1
+        elif arg.startswith('--'):
+            print(usage)
+            return 2
+        else:
+            names.append(arg)
+        i += 1
+
+    results = run_suite(names, options['--samples'])
+    with open(options['--json'], 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados guardados en {options['--json']}")
+
+    baseline_path = options['--baseline']
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"Sin baseline ({baseline_path}); usa --save-baseline para crearlo")
+        return 0
+
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    _print_comparison(results, baseline)
+    if not same_machine(results, baseline):
+        print(f"\nBaseline de otra maquina ({baseline.get('host', '?')}, "
+              f"Python {baseline.get('python', '?')}): solo informativo; "
+              f"usa --save-baseline para crear uno local")
+        return 0
+    threshold = options['--threshold'] / 100
+    regressions = compare(results, baseline, threshold)
+    if regressions:
+        print(f"\nREGRESION: {len(regressions)} caso(s) mas de {threshold:.0%} mas lentos:")
+        for case, before, after, ratio in regressions:
+            print(f"  {case}: x{ratio:.2f}")
+        return 1
+    print(f"\nSin regresiones (umbral {threshold:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
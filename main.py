@@ -6,6 +6,20 @@ Modos de uso:
 1. REPL interactivo de Forth: python main.py repl
 2. Modo DSL de Python: python main.py (o python -i main.py)
 3. Ejecutar archivo Forth: python main.py archivo.fth
+4. Filtro de tuberia: python main.py --filter palabra archivo.fth [--record N]
+   Carga archivo.fth y pasa cada linea de stdin (o cada registro de N
+   caracteres) como string a 'palabra'; su salida va a stdout con buffer.
+   Ejemplo: cat sensores.log | python main.py --filter procesa filtros.fth
+5. Benchmarks: python main.py bench [casos...] [--save-baseline]
+   Ejecuta benchmarks/suite.fth, escribe bench-results.json y falla si
+   algun caso empeora mas del umbral respecto a benchmarks/baseline.json.
+   El baseline es local (no se versiona): se crea con --save-baseline en
+   cada maquina; sin el, o si es de otra maquina, no se falla.
+   Contencion de actores (N emisores, 1 receptor): python -m benchmarks.actors
+   Codec de sobres (JSON vs binario, encode/decode): python -m benchmarks.codec
+
+Opcion --startup-report (con cualquier modo): muestra el desglose del tiempo
+de importacion y construccion del interprete (en modo filtro, por stderr).
 
 Compatible con:
 - Cualquier Python 3.x estandar
@@ -13,6 +27,7 @@ Compatible con:
 - Sin dependencias externas
 """
 
+import contextlib
 import sys
 
 try:
@@ -24,21 +39,85 @@ def create_forth():
     """Create a new Forth interpreter instance"""
     return InteractiveForth()
 
+def run_filter(word, path, record_len=None, startup_report=False):
+    """Load path and stream stdin through word without the REPL loop"""
+    f = create_forth()
+    with open(path, 'r') as file:
+        f.execute(file.read())
+    if startup_report:
+        f._flush_output()
+        with contextlib.redirect_stdout(sys.stderr):
+            f.startup_report()
+    
+    func = f.words.get(word) or f.immediate_words.get(word)
+    if func is None:
+        f._flush_output()
+        sys.stderr.write(f"Error: palabra '{word}' no encontrada en {path}\n")
+        return 1
+    
+    f._flush_full()
+    fileid = f._next_fileid
+    f._next_fileid += 1
+    f._file_handles[fileid] = sys.stdin
+    try:
+        if record_len:
+            f.stack.extend([func, record_len, fileid])
+            f._file_each_record()
+        else:
+            f.stack.extend([func, fileid])
+            f._file_each_line()
+    except BrokenPipeError:
+        return 0
+    finally:
+        del f._file_handles[fileid]
+    f._flush_output()
+    return 0
+
 def main():
+    startup_report = '--startup-report' in sys.argv
+    if startup_report:
+        sys.argv.remove('--startup-report')
+    
     if len(sys.argv) > 1:
         arg = sys.argv[1]
         
-        if arg == 'repl':
+        if arg == '--filter':
+            args = sys.argv[2:]
+            record_len = None
+            if '--record' in args:
+                pos = args.index('--record')
+                try:
+                    record_len = int(args[pos + 1])
+                except (IndexError, ValueError):
+                    record_len = 0
+                del args[pos:pos + 2]
+                if record_len <= 0:
+                    print("Error: --record requiere un tamaño positivo")
+                    return 1
+            if len(args) != 2:
+                print("Uso: python main.py --filter palabra archivo.fth [--record N]")
+                return 1
+            return run_filter(args[0], args[1], record_len, startup_report)
+        elif arg == 'bench':
+            from benchmarks.runner import main as bench_main
+            return bench_main(sys.argv[2:])
+        elif arg == 'repl':
             print("Iniciando Forth REPL...")
             print("Escribe 'help' para ver comandos, 'bye' para salir")
             print()
             f = InteractiveForth()
+            if startup_report:
+                f.startup_report()
             f.repl()
         elif arg.endswith('.fth') or arg.endswith('.forth'):
             f = create_forth()
+            f._flush_line()
             with open(arg, 'r') as file:
                 code = file.read()
                 f.execute(code)
+            f._flush_output()
+            if startup_report:
+                f.startup_report()
         else:
             print(f"Argumento no reconocido: {arg}")
             print(__doc__)
@@ -64,9 +143,11 @@ def main():
         print()
         
         f = create_forth()
+        if startup_report:
+            f.startup_report()
         
         import code
         code.interact(local=locals(), banner="")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -3,13 +3,19 @@ PFForth - Python Forth Interpreter/Compiler
 Modular package implementation
 
 Usage:
-    from pfforth import InteractiveForth
+    from pfforth import InteractiveForth, Pool
     forth = InteractiveForth()
     forth.execute("1 2 + .")
+
+    pool = Pool(4, init_source=": f 3 * ;")   # intérpretes para varios hilos
+    pool.run("f", 5)                           # -> [15]
     
 Compatible with Jupyter Notebook and any Python 3.x environment.
 """
 
+import time as _time
+_import_start = _time.perf_counter()
+
 from .core import ForthException, ForthBase
 from .arithmetic import ForthArithmetic
 from .stack_ops import ForthStack
@@ -20,7 +26,13 @@ from .io_words import ForthIO
 from .persistence import ForthPersistence
 from .optimizations import ForthOptimizations
 from .actors import ForthActors
+from .profiler import ForthProfiler
+from .tracing import ForthTracing
+from .parallel import ForthParallel
 from .repl import ForthREPL, InteractiveForth
+from .pool import Pool
+
+IMPORT_TIME = _time.perf_counter() - _import_start
 
-__all__ = ['InteractiveForth', 'ForthException']
+__all__ = ['InteractiveForth', 'ForthException', 'Pool']
 __version__ = '2.0.0'
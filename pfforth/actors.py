@@ -17,22 +17,54 @@ Phase 3 adds:
   uart-ruta-add         — register a remote UART route for an actor-id
   ruta-del              — remove a route
   rutas                 — print routing table
+  ruta-v!               — fix a route's envelope encoding (JSON / binary);
+                          by default it follows the peer's 'v' (pfforth.codec)
   actor-wifi-in         — MQTT listener that delivers remote messages locally
   actor-uart-in         — UART listener that delivers remote messages locally
   actor-ntp             — synchronise local clock with NTP
   actor-time            — current time in milliseconds (NTP-adjusted)
   actor-send is extended to auto-route remote messages transparently
+
+Scheduler (M:N):
+  actor-spawn-handler   — reactive actor run as a message handler on a
+                          shared pool of worker threads (no thread per actor)
+  actor-workers!        — size of the worker pool
+  actor-sched-stats     — scheduler counters
+
+Timers:
+  proactive ticks, watchdog checks and send-after share one timer thread
+  timer-stats           — timer lateness (jitter) and drift
+
+Process actors:
+  actor-spawn-process   — actor in its own process (no shared GIL), same ids
+  actor-cpu!            — pin a process actor to a core
+  shm-alloc / shm-release / shm-stats
+                        — ndarray and large bytes payloads to process actors
+                          travel as handles to recycled shared-memory segments
+
+Mailboxes:
+  actor-mailbox!        — bound an actor's queue with an overflow policy
+                          (block / drop-newest / drop-oldest / coalesce)
+  receive-batch         — take up to N messages in one queue operation
+  actor-send-many       — enqueue a list of messages in one queue operation
 """
 
 import threading
 import queue
 import time
 import sys
-import json
+import heapq
+import itertools
+import select
 import socket
 import struct
+from collections import deque
 from datetime import datetime
 
+from .shm import ShmHandle, to_wire, from_wire, get_pool as _shm_pool
+from . import mqttlink as _mqttlink
+from . import codec as _codec
+
 # Thread-local: each actor thread sets actor_id before running its word
 _actor_local = threading.local()
 
@@ -53,6 +85,131 @@ class _ActorKilled(Exception):
     """Raised inside an actor thread when actor-kill is received."""
 
 
+# ── Bounded mailboxes (actor-mailbox!) ───────────────────────────────────────
+#
+# Mailboxes are unbounded unless actor-mailbox! gives them a capacity.  When a
+# bounded mailbox is full the policy decides what happens to a new message:
+#   block        the sender waits until the actor takes a message
+#   drop-newest  the new message is discarded
+#   drop-oldest  the oldest queued message is discarded
+#   coalesce     one pending message per sender: a new message from a sender
+#                that already has one queued just replaces its value (and a
+#                new sender over capacity evicts the oldest)
+# The kill sentinel always gets in.  Every discarded or replaced message
+# counts in 'dropped'; 'high_water' is the deepest the queue has been.
+
+MAILBOX_POLICIES = ('block', 'drop-newest', 'drop-oldest', 'coalesce')
+
+
+def _mailbox_admit(box, items, item, cond, block, timeout):
+    """Apply box's capacity and policy to *item* (caller holds the lock of
+    *cond*).  Returns True if the caller must append it to *items*."""
+    policy = box.policy
+    coalesce = policy == 'coalesce' and isinstance(item, _ActorMsg)
+    if coalesce:
+        prev = box.latest.get(item.sender_id)
+        if prev is not None:
+            prev.value = item.value
+            box.dropped += 1
+            return False
+    if len(items) >= box.capacity:
+        if policy == 'block':
+            if not block or not cond.wait_for(
+                    lambda: len(items) < box.capacity or not box.capacity, timeout):
+                raise queue.Full
+        elif policy == 'drop-newest' or items[0] is _KILL_SENTINEL:
+            box.dropped += 1
+            return False
+        else:
+            _mailbox_taken(box, items.popleft())
+            box.dropped += 1
+    if coalesce:
+        box.latest[item.sender_id] = item
+    return True
+
+
+def _mailbox_taken(box, item):
+    """Forget *item* as the pending message of its sender (coalesce)."""
+    if box.latest and isinstance(item, _ActorMsg) \
+            and box.latest.get(item.sender_id) is item:
+        del box.latest[item.sender_id]
+
+
+def _mailbox_limit(box, capacity, policy):
+    """Set capacity (0 = unbounded) and policy of a mailbox."""
+    with box.lock if isinstance(box, _Mailbox) else box.mutex:
+        box.capacity = capacity
+        box.policy   = policy
+        if policy != 'coalesce':
+            box.latest.clear()
+
+
+class _ActorQueue(queue.Queue):
+    """queue.Queue for actor mailboxes, with the optional capacity and
+    overflow policy of actor-mailbox! (unbounded by default)."""
+
+    def __init__(self):
+        super().__init__()
+        self.capacity   = 0
+        self.policy     = 'block'
+        self.dropped    = 0
+        self.high_water = 0
+        self.latest     = {}     # sender-id -> pending message (coalesce)
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self.capacity and item is not _KILL_SENTINEL:
+                if not _mailbox_admit(self, self.queue, item, self.not_full,
+                                      block, timeout):
+                    return
+            self.queue.append(item)
+            self.unfinished_tasks += 1
+            if len(self.queue) > self.high_water:
+                self.high_water = len(self.queue)
+            self.not_empty.notify()
+
+    def put_many(self, items):
+        """Enqueue several messages under one lock acquisition."""
+        with self.not_full:
+            q = self.queue
+            for item in items:
+                if self.capacity and item is not _KILL_SENTINEL:
+                    if len(q) >= self.capacity and self.policy == 'block':
+                        # about to wait for room: the receiver must see
+                        # what is already queued or it never makes any
+                        self._published(q)
+                    if not _mailbox_admit(self, q, item, self.not_full, True, None):
+                        continue
+                q.append(item)
+                self.unfinished_tasks += 1
+            self._published(q)
+
+    def _published(self, q):
+        if len(q) > self.high_water:
+            self.high_water = len(q)
+        self.not_empty.notify()
+
+    def get_batch(self, n, timeout=None):
+        """Take up to n messages under one lock acquisition, waiting up to
+        timeout seconds (None = forever) for the first; [] on timeout."""
+        with self.not_empty:
+            if not self.queue:
+                if timeout is not None and timeout <= 0:
+                    return []
+                if not self.not_empty.wait_for(lambda: self.queue, timeout):
+                    return []
+            q, batch = self.queue, []
+            while q and len(batch) < n:
+                batch.append(self._get())
+            self.not_full.notify_all()
+            return batch
+
+    def _get(self):
+        item = self.queue.popleft()
+        _mailbox_taken(self, item)
+        return item
+
+
 # ── Free functions used by child lambdas ──────────────────────────────────────
 
 def _receive_in(child):
@@ -88,8 +245,7 @@ def _reply_in(child):
     value = child.stack.pop()
     sid   = child._last_sender_id
     from pfforth.actors import ForthActors
-    with ForthActors._registry_lock:
-        entry = ForthActors._registry.get(sid)
+    entry = ForthActors._registry.get(sid)
     if entry:
         my_id = child._actor_id_val
         entry['queue'].put(_ActorMsg(my_id, value))
@@ -102,13 +258,33 @@ def _respawn_actor(parent_forth, actor_id):
     Returns True on success, False if actor is not in registry."""
     from pfforth.actors import ForthActors, _actor_local, _ActorKilled
 
-    with ForthActors._registry_lock:
-        entry = ForthActors._registry.get(actor_id)
+    entry = ForthActors._registry.get(actor_id)
     if not entry:
         return False
 
+    if isinstance(entry['queue'], _Mailbox):
+        # Handler actor: fresh state, same mailbox
+        mb = entry['queue']
+        mb.stack, mb.variables, mb.values = [], None, None
+        with ForthActors._registry_lock:
+            entry.update({'alive': True, 'pending': False})
+        mb.start()
+        return True
+
+    if isinstance(entry['thread'], _ProcessActor):
+        # Process actor: new child process from the same snapshot
+        proc = entry['thread'].clone()
+        with ForthActors._registry_lock:
+            entry.update({'thread': proc, 'queue': proc.mailbox,
+                          'alive': False, 'pending': False})
+        proc.start()
+        return True
+
     word_name = entry['name']
     child = parent_forth._create_child_forth(actor_id)
+    old_queue = entry['queue']
+    if getattr(old_queue, 'capacity', 0):
+        _mailbox_limit(child._actor_queue, old_queue.capacity, old_queue.policy)
 
     def actor_body():
         _actor_local.actor_id = actor_id
@@ -149,6 +325,1004 @@ def _respawn_actor(parent_forth, actor_id):
     return True
 
 
+# ── M:N scheduler for handler actors ──────────────────────────────────────────
+#
+# A handler actor (actor-spawn-handler) has no thread and no interpreter of its
+# own: only a mailbox plus its data stack, variables and values.  When a message
+# arrives in an idle mailbox the mailbox is queued on the scheduler; a worker
+# thread takes it, binds the actor state into the worker's interpreter, runs the
+# handler word ( msg -- ) once per message (up to SCHED_BATCH in a row, then
+# re-queues it for fairness) and unbinds it.  The 'scheduled' flag guarantees a
+# mailbox is never run by two workers at once.
+#
+# A handler that calls a blocking receive with an empty mailbox keeps its worker
+# thread (dedicated-thread fallback) and the scheduler starts a compensating
+# worker; the blocked thread exits once the handler returns.
+
+SCHED_BATCH = 32
+
+
+class _Mailbox:
+    """Mailbox and state of a handler actor.  Offers the queue.Queue methods
+    the rest of the module uses (put/get/qsize/empty) so routing, broadcast,
+    proactive ticks and actor-kill work unchanged."""
+
+    __slots__ = ('actor_id', 'word', 'key', 'items', 'lock', 'cond',
+                 'scheduled', 'active', 'stack', 'variables', 'values',
+                 'capacity', 'policy', 'dropped', 'high_water', 'latest')
+
+    def __init__(self, actor_id, word, key):
+        self.actor_id  = actor_id
+        self.word      = word
+        self.key       = key
+        self.items     = deque()
+        self.lock      = threading.Lock()
+        self.cond      = None      # created on first blocking get
+        self.scheduled = False
+        self.active    = False     # False while pending or dead
+        self.stack     = []
+        self.variables = None      # copied from the worker on first run
+        self.values    = None
+        self.capacity   = 0        # actor-mailbox! (0 = unbounded)
+        self.policy     = 'block'
+        self.dropped    = 0
+        self.high_water = 0
+        self.latest     = {}
+
+    def put(self, item, block=True, timeout=None):
+        with self.lock:
+            if self.capacity and item is not _KILL_SENTINEL:
+                if self.cond is None:
+                    self.cond = threading.Condition(self.lock)
+                if not _mailbox_admit(self, self.items, item, self.cond,
+                                      block, timeout):
+                    return
+            self.items.append(item)
+            if len(self.items) > self.high_water:
+                self.high_water = len(self.items)
+            if self.cond is not None:
+                self.cond.notify_all()
+            if not self.active or self.scheduled:
+                return
+            self.scheduled = True
+        ForthActors._scheduler.submit(self)
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def put_many(self, items):
+        with self.lock:
+            for item in items:
+                if self.capacity and item is not _KILL_SENTINEL:
+                    if self.cond is None:
+                        self.cond = threading.Condition(self.lock)
+                    if len(self.items) >= self.capacity and self.policy == 'block':
+                        # about to wait for room: the handler must be
+                        # scheduled to drain what is already queued
+                        self._published()
+                    if not _mailbox_admit(self, self.items, item, self.cond,
+                                          True, None):
+                        continue
+                self.items.append(item)
+            self._published()
+
+    def _published(self):
+        """Wake receivers and schedule the handler (caller holds the lock;
+        submit only enqueues, so it is safe here)."""
+        if len(self.items) > self.high_water:
+            self.high_water = len(self.items)
+        if self.cond is not None:
+            self.cond.notify_all()
+        if self.active and not self.scheduled and self.items:
+            self.scheduled = True
+            ForthActors._scheduler.submit(self)
+
+    def get(self, block=True, timeout=None):
+        with self.lock:
+            if not self.items:
+                if not block:
+                    raise queue.Empty
+                if self.cond is None:
+                    self.cond = threading.Condition(self.lock)
+                if not self.cond.wait_for(lambda: self.items, timeout):
+                    raise queue.Empty
+            return self.pop()
+
+    def pop(self):
+        """Take the oldest message (caller holds the lock)."""
+        item = self.items.popleft()
+        if self.capacity:
+            _mailbox_taken(self, item)
+            if self.cond is not None:
+                self.cond.notify_all()
+        return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_batch(self, n, timeout=None):
+        with self.lock:
+            if not self.items:
+                if timeout is not None and timeout <= 0:
+                    return []
+                if self.cond is None:
+                    self.cond = threading.Condition(self.lock)
+                if not self.cond.wait_for(lambda: self.items, timeout):
+                    return []
+            batch = []
+            while self.items and len(batch) < n:
+                batch.append(self.pop())
+            return batch
+
+    def qsize(self):
+        return len(self.items)
+
+    def empty(self):
+        return not self.items
+
+    def start(self):
+        """Activate the actor (actor-run / respawn); schedules pending mail."""
+        with self.lock:
+            self.active = True
+            if not self.items or self.scheduled:
+                return
+            self.scheduled = True
+        ForthActors._scheduler.submit(self)
+
+
+class _Scheduler:
+    """Fixed pool of worker threads that runs handler actors."""
+
+    def __init__(self, size):
+        self.size      = size
+        self._ready    = queue.SimpleQueue()
+        self._lock     = threading.Lock()
+        self._local    = threading.local()
+        self._keys     = {}        # dictionary signature -> key
+        self._snaps    = {}        # key -> snapshot of the spawning interpreter
+        self._threads  = []
+        self.stats     = {'activations': 0, 'messages': 0, 'compensations': 0,
+                          'errors': 0}
+        for _ in range(size):
+            self._start_worker()
+
+    def _start_worker(self):
+        t = threading.Thread(target=self._worker, daemon=True,
+                             name=f"sched-worker-{len(self._threads)}")
+        with self._lock:
+            self._threads.append(t)
+        t.start()
+
+    def workers(self):
+        """Number of live worker threads (pool plus blocked fallbacks)."""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            return len(self._threads)
+
+    def resize(self, size):
+        """Grow by starting workers; shrink by sending stop tokens."""
+        delta, self.size = size - self.size, size
+        for _ in range(max(delta, 0)):
+            self._start_worker()
+        for _ in range(max(-delta, 0)):
+            self._ready.put(None)
+
+    def register(self, forth):
+        """Key for the dictionary of *forth*; workers build one interpreter
+        per key and reuse it for every actor spawned with that dictionary."""
+        sig = tuple((t, n, forth._definition_source.get(n))
+                    for t, n in forth._definition_order)
+        with self._lock:
+            key = self._keys.get(sig)
+            if key is None:
+                key = self._keys[sig] = len(self._keys) + 1
+                self._snaps[key] = forth._dictionary_snapshot()
+        return key
+
+    def submit(self, mailbox):
+        self._ready.put(mailbox)
+
+    def compensate(self):
+        """Called before a handler blocks its worker: start a replacement
+        worker (once per thread) and retire this one when the handler ends."""
+        local = self._local
+        if getattr(local, 'retiring', True):
+            return
+        local.retiring = True
+        with self._lock:
+            self.stats['compensations'] += 1
+        self._start_worker()
+
+    # ── Worker side ────────────────────────────────────────────────────
+
+    def _interpreter(self, key):
+        """Worker-local interpreter for dictionary *key*."""
+        interps = self._local.interps
+        f = interps.get(key)
+        if f is None:
+            from pfforth.repl import InteractiveForth
+            f = InteractiveForth()
+            # Override before loading so compiled words bind to these
+            f.words['receive']         = lambda: _sched_receive(f)
+            f.words['receive-timeout'] = lambda: _sched_receive_timeout(f)
+            f.words['receive-batch']   = lambda: _sched_receive_batch(f)
+            f.words['actor-id']        = lambda: f.stack.append(f._actor_id_val)
+            f.words['sender-id']       = lambda: f.stack.append(f._last_sender_id)
+            f.words['reply']           = lambda: _reply_in(f)
+            f._load_snapshot(self._snaps[key])
+            f._sched_base = (dict(f.variables), dict(f.values))
+            interps[key] = f
+        return f
+
+    def _worker(self):
+        local = self._local
+        local.interps  = {}
+        local.retiring = False
+        while True:
+            mb = self._ready.get()
+            if mb is None:
+                break
+            self._run(mb)
+            if local.retiring:
+                break
+
+    def _run(self, mb):
+        f = self._interpreter(mb.key)
+        if mb.variables is None:
+            mb.variables, mb.values = dict(f._sched_base[0]), dict(f._sched_base[1])
+        saved = (f.variables, f.values)
+        f.variables, f.values = mb.variables, mb.values
+        f.stack[:] = mb.stack
+        f._actor_id_val   = mb.actor_id
+        f._actor_queue    = mb
+        _actor_local.actor_id = mb.actor_id
+        handled = 0
+        requeue = False
+        try:
+            handler = f.words.get(mb.word)
+            while True:
+                with mb.lock:
+                    if not mb.active or not mb.items:
+                        mb.scheduled = False
+                        break
+                    if handled >= SCHED_BATCH:
+                        requeue = True
+                        break
+                    msg = mb.pop()
+                if msg is _KILL_SENTINEL:
+                    raise _ActorKilled()
+                handled += 1
+                if isinstance(msg, _ActorMsg):
+                    f._last_sender_id = msg.sender_id
+                    f.stack.append(msg.value)
+                else:
+                    f.stack.append(msg)
+                if handler is None:
+                    raise RuntimeError(f"palabra desconocida '{mb.word}'")
+                handler()
+        except _ActorKilled:
+            self._stop(mb)
+        except Exception as e:
+            print(f"\nActor {mb.actor_id} ({mb.word}) error: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            self._stop(mb)
+        finally:
+            mb.stack = f.stack[:]
+            f.stack.clear()
+            f.rstack.clear()
+            f._loop_stack.clear()
+            f._locals_stack.clear()
+            f.variables, f.values = saved
+            f._actor_queue = None
+            _actor_local.actor_id = None
+            with self._lock:
+                self.stats['activations'] += 1
+                self.stats['messages'] += handled
+        if requeue:
+            self.submit(mb)
+
+    @staticmethod
+    def _stop(mb):
+        with mb.lock:
+            mb.active = False
+            mb.scheduled = False
+        with ForthActors._registry_lock:
+            entry = ForthActors._registry.get(mb.actor_id)
+            if entry is not None and entry['queue'] is mb:
+                entry['alive'] = False
+                stop = entry.get('_timer_stop')
+                if stop:
+                    stop.set()
+
+
+def _sched_receive(f):
+    """receive for handler actors: takes the next message of the actor's
+    mailbox; if it is empty, falls back to blocking this worker thread."""
+    mb = f._actor_queue
+    try:
+        msg = mb.get(block=False)
+    except queue.Empty:
+        ForthActors._scheduler.compensate()
+        msg = mb.get(block=True)
+    if msg is _KILL_SENTINEL:
+        raise _ActorKilled()
+    f._last_sender_id = msg.sender_id
+    f.stack.append(msg.value)
+
+
+def _sched_receive_timeout(f):
+    """receive-timeout for handler actors (same fallback as receive)."""
+    timeout_ms = int(f.stack.pop()) if f.stack else 0
+    mb = f._actor_queue
+    try:
+        msg = mb.get(block=False)
+    except queue.Empty:
+        if timeout_ms <= 0:
+            f.stack += [0, 0]
+            return
+        ForthActors._scheduler.compensate()
+        try:
+            msg = mb.get(block=True, timeout=timeout_ms / 1000.0)
+        except queue.Empty:
+            f.stack += [0, 0]
+            return
+    if msg is _KILL_SENTINEL:
+        raise _ActorKilled()
+    f._last_sender_id = msg.sender_id
+    f.stack.append(msg.value)
+    f.stack.append(-1)
+
+
+def _sched_receive_batch(f):
+    """receive-batch for handler actors (same fallback as receive)."""
+    if len(f.stack) < 2:
+        print("Error: receive-batch requiere ( max timeout-ms -- )")
+        return
+    timeout_ms = int(f.stack.pop())
+    n = int(f.stack.pop())
+    mb = f._actor_queue
+    batch = mb.get_batch(n, 0) if n > 0 else []
+    if not batch and n > 0 and timeout_ms != 0:
+        ForthActors._scheduler.compensate()
+        batch = mb.get_batch(n, None if timeout_ms < 0 else timeout_ms / 1000.0)
+    _push_batch(f, batch)
+
+
+# ── Shared timer thread ───────────────────────────────────────────────────────
+#
+# Proactive ticks, watchdog checks and send-after all run on one heapq timer
+# thread instead of a thread per actor.  Periodic timers are rescheduled from
+# their previous due time (not from "now"), so lateness does not accumulate;
+# if the thread falls more than a period behind, missed ticks are skipped.
+
+TIMER_STATS_WINDOW = 1024
+
+
+class _Timer:
+    """A timer on the shared timer thread.  Stored in registry entries where
+    a threading.Thread used to be, so it offers start/is_alive/join.
+    Setting *stop* (the entry's '_timer_stop' event) cancels it."""
+
+    __slots__ = ('fn', 'delay', 'interval', 'stop', 'name', 'due',
+                 'first_fire', 'last_fire', 'fires', 'skipped', 'done')
+
+    def __init__(self, fn, delay, interval=None, stop=None, name='timer'):
+        self.fn         = fn
+        self.delay      = delay
+        self.interval   = interval
+        self.stop       = stop if stop is not None else threading.Event()
+        self.name       = name
+        self.due        = None
+        self.first_fire = None
+        self.last_fire  = None
+        self.fires      = 0
+        self.skipped    = 0
+        self.done       = False
+
+    def start(self):
+        if self.due is None:
+            self.due = time.monotonic() + self.delay
+            _timer_service().schedule(self)
+
+    def cancel(self):
+        self.stop.set()
+
+    def is_alive(self):
+        return self.due is not None and not self.done and not self.stop.is_set()
+
+    def join(self, timeout=None):
+        pass   # cancelling is immediate: the timer thread drops it when due
+
+    def drift(self):
+        """Accumulated drift of a periodic timer: real time between its first
+        and last tick minus the ideal time for the periods in between
+        (skipped periods included)."""
+        if not self.interval or self.fires < 2:
+            return 0.0
+        periods = self.fires - 1 + self.skipped
+        return (self.last_fire - self.first_fire) - periods * self.interval
+
+
+def _timer_put(q, item):
+    """Put *item* from the shared timer thread.  The timer thread must never
+    wait on a full 'block' mailbox (every tick, watchdog and send-after in
+    the process would stall behind one slow actor), so the message is
+    dropped and counted in timer-stats instead."""
+    try:
+        q.put(item, block=False)
+    except queue.Full:
+        _timer_service().stats['dropped'] += 1
+
+
+class _TimerService:
+    """The single timer thread (started on first use)."""
+
+    def __init__(self):
+        self._heap   = []
+        self._cond   = threading.Condition()
+        self._seq    = itertools.count()
+        self._late   = deque(maxlen=TIMER_STATS_WINDOW)
+        self.stats   = {'fired': 0, 'skipped': 0, 'errors': 0, 'dropped': 0}
+        self.thread  = threading.Thread(target=self._loop, daemon=True,
+                                        name='actor-timers')
+        self.thread.start()
+
+    def schedule(self, timer):
+        with self._cond:
+            heapq.heappush(self._heap, (timer.due, next(self._seq), timer))
+            if self._heap[0][2] is timer:
+                self._cond.notify()
+
+    def timers(self):
+        with self._cond:
+            return [t for _, _, t in self._heap if t.is_alive()]
+
+    def _loop(self):
+        clock = time.monotonic
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - clock()
+                    if delay <= 0:
+                        timer = heapq.heappop(self._heap)[2]
+                        break
+                    self._cond.wait(delay)
+            self._fire(timer, clock())
+
+    def _fire(self, timer, now):
+        if timer.stop.is_set():
+            timer.done = True
+            return
+        self._late.append(now - timer.due)
+        self.stats['fired'] += 1
+        if timer.first_fire is None:
+            timer.first_fire = now
+        timer.last_fire = now
+        timer.fires += 1
+        try:
+            timer.fn()
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"\n[{timer.name}] error: {e}")
+        if not timer.interval:
+            timer.done = True
+            return
+        timer.due += timer.interval
+        behind = time.monotonic() - timer.due
+        if behind > 0:
+            skipped = int(behind // timer.interval) + 1
+            timer.due += skipped * timer.interval
+            timer.skipped += skipped
+            self.stats['skipped'] += skipped
+        self.schedule(timer)
+
+    def report(self):
+        """Lateness (jitter) and drift statistics in seconds."""
+        late = sorted(self._late)
+        n = len(late)
+        mean = sum(late) / n if n else 0.0
+        periodic = [t for t in self.timers() if t.interval]
+        drifts = [abs(t.drift()) for t in periodic]
+        return {
+            'timers':      len(self.timers()),
+            'periodic':    len(periodic),
+            'fired':       self.stats['fired'],
+            'skipped':     self.stats['skipped'],
+            'errors':      self.stats['errors'],
+            'dropped':     self.stats['dropped'],
+            'late_mean':   mean,
+            'late_p95':    late[min(n - 1, int(0.95 * n))] if n else 0.0,
+            'late_max':    late[-1] if n else 0.0,
+            'jitter':      (sum((x - mean) ** 2 for x in late) / n) ** 0.5 if n else 0.0,
+            'drift_max':   max(drifts) if drifts else 0.0,
+        }
+
+
+_timer_service_obj  = None
+_timer_service_lock = threading.Lock()
+
+
+def _timer_service():
+    """Return the shared timer thread, starting it on first use."""
+    global _timer_service_obj
+    with _timer_service_lock:
+        if _timer_service_obj is None:
+            _timer_service_obj = _TimerService()
+        return _timer_service_obj
+
+
+# ── Copy-on-write registry and route table ────────────────────────────────────
+#
+# actor-send, reply, broadcast and the transport readers look actors up on
+# every message.  Instead of taking _registry_lock / _route_lock per lookup,
+# both tables are immutable snapshots: writers (spawn, kill, route changes)
+# copy the dict under the lock and rebind the class attribute, and readers
+# just do ForthActors._registry.get(id) on whatever snapshot is current.
+# Entry dicts themselves are shared between snapshots, so flag updates
+# ('alive', 'pending') stay in place.
+
+def _registry_put(actor_id, entry):
+    """Publish a registry entry (caller holds _registry_lock)."""
+    registry = dict(ForthActors._registry)
+    registry[actor_id] = entry
+    ForthActors._registry = registry
+
+
+def _registry_drop(actor_id):
+    """Remove and return a registry entry (caller holds _registry_lock)."""
+    if actor_id not in ForthActors._registry:
+        return None
+    registry = dict(ForthActors._registry)
+    entry = registry.pop(actor_id)
+    ForthActors._registry = registry
+    return entry
+
+
+def _route_put(actor_id, route):
+    """Publish a route (caller holds _route_lock)."""
+    table = dict(ForthActors._route_table)
+    table[actor_id] = route
+    ForthActors._route_table = table
+
+
+def _route_set_codec(actor_id, v, fixed=None):
+    """Set the encoding ('v') of actor_id's route; False if it has none
+    (caller holds _route_lock).  fixed None = negotiated (a route fixed by
+    ruta-v! keeps its encoding); True/False = set by ruta-v!."""
+    route = ForthActors._route_table.get(actor_id)
+    if route is None:
+        return False
+    if fixed is not None or not route.get('v_fixed'):
+        _route_put(actor_id, dict(route, v=v, v_fixed=bool(fixed)))
+    return True
+
+
+def _route_drop(actor_id):
+    """Remove and return a route (caller holds _route_lock)."""
+    if actor_id not in ForthActors._route_table:
+        return None
+    table = dict(ForthActors._route_table)
+    route = table.pop(actor_id)
+    ForthActors._route_table = table
+    return route
+
+
+def _deliver(sender_id, actor_id, value, block=True):
+    """Deliver value to a local or routed actor (actor-send, send-after).
+
+    Phase 3: if the actor-id has a route in the routing table,
+    the message is dispatched via the registered transport actor
+    instead of a local queue.
+
+    block=False raises queue.Full instead of waiting on a full 'block'
+    mailbox (timer thread).
+    """
+    route = ForthActors._route_table.get(actor_id)
+
+    if route:
+        ta_id = route['transport_actor_id']
+        ta_entry = ForthActors._registry.get(ta_id)
+        if ta_entry and ta_entry.get('alive'):
+            # Deliver (to_id, value) to the transport actor's queue
+            ta_entry['queue'].put(_ActorMsg(sender_id, (actor_id, value)), block)
+        else:
+            print(f"Error: actor-send: transport actor {ta_id} "
+                  f"({route.get('transport','?')}) no disponible")
+        return
+
+    # ── Local delivery ────────────────────────────────────────────────
+    entry = ForthActors._registry.get(actor_id)
+    if entry:
+        entry['queue'].put(_ActorMsg(sender_id, value), block)
+    else:
+        print(f"Error: actor {actor_id} no existe (ni local ni remoto)")
+
+
+def _deliver_many(sender_id, actor_id, values):
+    """Deliver several values to one actor (actor-send-many): same routing
+    as _deliver, but a single put_many on the target queue."""
+    route = ForthActors._route_table.get(actor_id)
+
+    if route:
+        ta_id = route['transport_actor_id']
+        ta_entry = ForthActors._registry.get(ta_id)
+        if ta_entry and ta_entry.get('alive'):
+            _put_many(ta_entry['queue'],
+                      [_ActorMsg(sender_id, (actor_id, v)) for v in values])
+        else:
+            print(f"Error: actor-send-many: transport actor {ta_id} "
+                  f"({route.get('transport','?')}) no disponible")
+        return
+
+    entry = ForthActors._registry.get(actor_id)
+    if entry:
+        _put_many(entry['queue'], [_ActorMsg(sender_id, v) for v in values])
+    else:
+        print(f"Error: actor {actor_id} no existe (ni local ni remoto)")
+
+
+def _put_many(box, items):
+    """put_many on actor mailboxes; one put per item on plain queues."""
+    put_many = getattr(box, 'put_many', None)
+    if put_many is not None:
+        put_many(items)
+    else:
+        for item in items:
+            box.put(item)
+
+
+def _deliver_envelopes(payloads):
+    """Deliver decoded pfforth-actor envelopes from a transport IN reader,
+    grouped into one put_many per destination actor.
+
+    The 'v' of each envelope tells which encodings its sender understands;
+    a route back to that sender follows it (binary from v2 on) unless
+    ruta-v! fixed it."""
+    batches = {}
+    versions = {}
+    for payload in payloads:
+        if payload.get('proto') != 'pfforth-actor':
+            continue
+        from_id = payload.get('from', 0)
+        v = payload.get('v', 1)
+        # un par JSON puede mandar "v": "2" o null; se trata como v1
+        versions[from_id] = v if type(v) is int else 1
+        batches.setdefault(payload.get('to', 0), []).append(
+            _ActorMsg(from_id, payload.get('msg')))
+    for from_id, v in versions.items():
+        route = ForthActors._route_table.get(from_id)
+        if route is not None and not route.get('v_fixed'):
+            v = _codec.V_BINARY if v >= _codec.V_BINARY else _codec.V_JSON
+            if route.get('v', _codec.V_JSON) != v:
+                with ForthActors._route_lock:
+                    _route_set_codec(from_id, v)
+    for to_id, msgs in batches.items():
+        entry = ForthActors._registry.get(to_id)
+        if entry:
+            _put_many(entry['queue'], msgs)
+
+
+def _push_batch(f, batch):
+    """Push the values of a receive-batch and their count onto f's stack."""
+    for msg in batch:
+        if msg is _KILL_SENTINEL:
+            raise _ActorKilled()
+        if isinstance(msg, _ActorMsg):
+            f._last_sender_id = msg.sender_id
+            f.stack.append(msg.value)
+        else:
+            f.stack.append(msg)
+    f.stack.append(len(batch))
+
+
+# ── Process actors ────────────────────────────────────────────────────────────
+#
+# actor-spawn-process runs the actor word in a multiprocessing child (spawn
+# start method, as par-map) built from the dictionary snapshot, so CPU-bound
+# actors do not share the GIL.  The parent keeps a normal registry entry:
+# 'queue' is a _ProcessMailbox that puts message batches on the child's inbox
+# pipe and 'thread' is the _ProcessActor.  A router thread in the parent reads
+# the child's outbox and delivers its actor-send / reply / broadcast messages
+# with the process actor's id as sender, so ids stay transparent both ways.
+#
+# Inbox items:  [(sender-id, value), ...]  or None (kill)
+# Outbox items: ('send', to, value) ('many', to, values) ('broadcast', None,
+#               value) ('exit', None, None)
+
+PROCESS_KILL_TIMEOUT = 1.0
+
+
+class _ProcessInbox:
+    """Child side of a process actor's mailbox: get/get_batch as in
+    _ActorQueue, fed from the inbox pipe.  on_wait runs before blocking
+    (the child flushes its Forth output there)."""
+
+    def __init__(self, pipe, on_wait=None):
+        self.pipe    = pipe
+        self.items   = deque()
+        self.on_wait = on_wait
+
+    def _add(self, batch):
+        if batch is None:
+            self.items.append(_KILL_SENTINEL)
+        else:
+            self.items.extend(_ActorMsg(sid, from_wire(value)) for sid, value in batch)
+
+    def _fill(self, timeout):
+        """Read at least one batch (waiting up to timeout, None = forever)
+        plus whatever else is already in the pipe."""
+        if not self.items:
+            if timeout is not None and timeout <= 0:
+                try:
+                    self._add(self.pipe.get_nowait())
+                except queue.Empty:
+                    return False
+            else:
+                if self.on_wait is not None:
+                    self.on_wait()
+                try:
+                    self._add(self.pipe.get(True, timeout))
+                except queue.Empty:
+                    return False
+        while True:
+            try:
+                self._add(self.pipe.get_nowait())
+            except queue.Empty:
+                return True
+
+    def get(self, block=True, timeout=None):
+        if not self.items and not self._fill(timeout if block else 0):
+            raise queue.Empty
+        return self.items.popleft()
+
+    def get_batch(self, n, timeout=None):
+        if not self._fill(timeout):
+            return []
+        items = self.items
+        return [items.popleft() for _ in range(min(n, len(items)))]
+
+    def qsize(self):
+        return len(self.items)
+
+    def empty(self):
+        return not self.items
+
+
+class _ProcessMailbox:
+    """Parent side of a process actor's mailbox (the registry 'queue').
+
+    Remembers the shared-memory handles it sent ({name: gen}) so that
+    reclaim() can give them back to their pool when the child dies."""
+
+    def __init__(self, pipe):
+        self.pipe    = pipe
+        self.handles = {}
+        self.closed  = False
+
+    def _wire(self, value):
+        value = to_wire(value)
+        if type(value) is ShmHandle:
+            self.handles[value.name] = value.gen
+            if self.closed:                 # nobody will read it any more
+                _shm_pool().reclaim({value.name: value.gen})
+        return value
+
+    def reclaim(self):
+        """Free the segments of every handle the child did not release."""
+        self.closed = True
+        if self.handles:
+            _shm_pool().reclaim(self.handles)
+
+    def put(self, item, block=True, timeout=None):
+        if item is _KILL_SENTINEL:
+            self.pipe.put(None)
+        elif isinstance(item, _ActorMsg):
+            self.pipe.put([(item.sender_id, self._wire(item.value))])
+        else:
+            self.pipe.put([(0, self._wire(item))])
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def put_many(self, items):
+        batch = [(m.sender_id, self._wire(m.value)) if isinstance(m, _ActorMsg)
+                 else (0, self._wire(m))
+                 for m in items if m is not _KILL_SENTINEL]
+        if batch:
+            self.pipe.put(batch)
+        if len(batch) < len(items):
+            self.pipe.put(None)
+
+    def qsize(self):
+        try:
+            return self.pipe.qsize()
+        except NotImplementedError:      # macOS
+            return 0
+
+    def empty(self):
+        return self.qsize() == 0
+
+
+def _process_actor_main(actor_id, word_name, snap, state, inbox, outbox):
+    """Entry point of the child process of actor-spawn-process."""
+    import signal
+    from pfforth.repl import InteractiveForth
+    from pfforth.parallel import _par_apply_state
+    from pfforth.shm import close_pool
+    # terminate() (actor-kill) must still run the finally below
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    child = InteractiveForth()
+    _actor_local.actor_id = actor_id
+    child._actor_queue    = _ProcessInbox(inbox, on_wait=child._flush_output)
+    child._actor_id_val   = actor_id
+    child._last_sender_id = 0
+
+    def send():
+        if len(child.stack) < 2:
+            print("Error: actor-send requiere ( valor actor-id -- )")
+            return
+        to = int(child.stack.pop())
+        outbox.put(('send', to, to_wire(child.stack.pop())))
+
+    def send_many():
+        if len(child.stack) < 2:
+            print("Error: actor-send-many requiere ( lista actor-id -- )")
+            return
+        to = int(child.stack.pop())
+        outbox.put(('many', to, [to_wire(v) for v in child.stack.pop()]))
+
+    def reply():
+        if not child.stack:
+            print("Error: reply requiere un valor en la pila")
+            return
+        outbox.put(('send', child._last_sender_id, to_wire(child.stack.pop())))
+
+    def broadcast():
+        if not child.stack:
+            print("Error: broadcast requiere un valor en la pila")
+            return
+        outbox.put(('broadcast', None, to_wire(child.stack.pop())))
+
+    # Overrides before loading, so compiled words bind to them
+    child.words['receive']         = lambda: _receive_in(child)
+    child.words['receive-timeout'] = lambda: _receive_timeout_in(child)
+    child.words['actor-id']        = lambda: child.stack.append(actor_id)
+    child.words['sender-id']       = lambda: child.stack.append(child._last_sender_id)
+    child.words['actor-send']      = send
+    child.words['actor-send-many'] = send_many
+    child.words['reply']           = reply
+    child.words['broadcast']       = broadcast
+    child._load_snapshot(snap)
+    _par_apply_state(child, state)
+    try:
+        child.execute(word_name)
+    except _ActorKilled:
+        pass
+    except Exception as e:
+        print(f"\nActor {actor_id} ({word_name}) error: {e}")
+    finally:
+        child._flush_output()
+        outbox.put(('exit', None, None))
+        # Our segments die with us: unlink them once the receivers have
+        # mapped what we sent (no resource_tracker "leaked" warning)
+        close_pool()
+
+
+def _shm_for(to_id, value):
+    """A shared-memory handle from a child goes on untouched to another
+    process actor (zero copy end to end); anything else in this process
+    gets the mapped ndarray / bytes."""
+    if type(value) is not ShmHandle:
+        return value
+    entry = ForthActors._registry.get(to_id)
+    if entry is not None and isinstance(entry['queue'], _ProcessMailbox) \
+            and to_id not in ForthActors._route_table:
+        return value
+    return from_wire(value)
+
+
+class _ProcessActor:
+    """Child process of a process actor plus its router thread.  Stored in
+    the registry entry where a threading.Thread would be (start, is_alive,
+    join); clone() gives a fresh one for a watchdog respawn."""
+
+    def __init__(self, actor_id, word_name, snap, state, cpus=None):
+        import multiprocessing
+        from pfforth.parallel import PAR_START_METHOD
+        ctx = multiprocessing.get_context(PAR_START_METHOD)
+        self.actor_id  = actor_id
+        self.word_name = word_name
+        self.snap      = snap
+        self.state     = state
+        self.cpus      = cpus          # None = any core
+        self.inbox     = ctx.Queue()
+        self.outbox    = ctx.Queue()
+        self.mailbox   = _ProcessMailbox(self.inbox)
+        self.process   = ctx.Process(
+            target=_process_actor_main,
+            args=(actor_id, word_name, snap, state, self.inbox, self.outbox),
+            daemon=True, name=f"actor-{actor_id}-{word_name}")
+        self.router    = threading.Thread(
+            target=self._route, daemon=True,
+            name=f"actor-{actor_id}-router")
+
+    def clone(self):
+        return _ProcessActor(self.actor_id, self.word_name, self.snap,
+                             self.state, self.cpus)
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def start(self):
+        self.process.start()
+        if self.cpus is not None:
+            self.pin(self.cpus)
+        self.router.start()
+
+    def pin(self, cpus):
+        """Restrict the child to the cores in cpus (None = all cores)."""
+        import os
+        self.cpus = cpus
+        if self.process.pid is not None and self.process.is_alive():
+            os.sched_setaffinity(self.process.pid,
+                                 cpus if cpus is not None else os.sched_getaffinity(0))
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def join(self, timeout=None):
+        if self.process.pid is not None:
+            self.process.join(timeout)
+
+    def terminate(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(PROCESS_KILL_TIMEOUT)
+
+    def _set_alive(self, alive):
+        with ForthActors._registry_lock:
+            entry = ForthActors._registry.get(self.actor_id)
+            if entry is not None and entry['thread'] is self:
+                entry['alive'] = alive
+                if not alive and entry.get('_timer_stop'):
+                    entry['_timer_stop'].set()
+
+    def _route(self):
+        """Deliver the child's outgoing messages until it exits."""
+        actor_id = self.actor_id
+        _actor_local.actor_id = actor_id
+        self._set_alive(True)
+        try:
+            while True:
+                try:
+                    kind, to, value = self.outbox.get(timeout=0.5)
+                except queue.Empty:
+                    if not self.process.is_alive():
+                        break
+                    continue
+                if kind == 'send':
+                    _deliver(actor_id, to, _shm_for(to, value))
+                elif kind == 'many':
+                    _deliver_many(actor_id, to, [_shm_for(to, v) for v in value])
+                elif kind == 'broadcast':
+                    value = from_wire(value)
+                    for aid, e in ForthActors._registry.items():
+                        if aid != actor_id and e.get('alive'):
+                            e['queue'].put(_ActorMsg(actor_id, value))
+                else:
+                    break
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._set_alive(False)
+            self.mailbox.reclaim()
+
+
 # ── Main mixin class ──────────────────────────────────────────────────────────
 
 class ForthActors:
@@ -165,7 +1339,7 @@ class ForthActors:
             ForthActors._registry_lock = threading.Lock()
             ForthActors._next_id       = 1
             # Actor 0 = REPL / main thread — has its own message queue
-            ForthActors._main_queue = queue.Queue()
+            ForthActors._main_queue = _ActorQueue()
             ForthActors._registry[0] = {
                 'thread': None,
                 'queue': ForthActors._main_queue,
@@ -187,6 +1361,11 @@ class ForthActors:
             ForthActors._route_lock     = threading.Lock()
             ForthActors._ntp_offset     = 0.0  # seconds to add to time.time()
 
+        # M:N scheduler for handler actors (started on first use)
+        if not hasattr(ForthActors, '_scheduler'):
+            ForthActors._scheduler      = None
+            ForthActors._sched_workers  = None
+
         # Per-instance actor state (None = not an actor / REPL)
         if not hasattr(self, '_actor_queue'):
             self._actor_queue    = None
@@ -200,6 +1379,8 @@ class ForthActors:
         self.words['actor-send']      = self._actor_send
         self.words['receive']         = self._receive
         self.words['receive-timeout'] = self._receive_timeout
+        self.words['receive-batch']   = self._receive_batch
+        self.words['actor-send-many'] = self._actor_send_many
         self.words['actor-kill']      = self._actor_kill
         self.words['actor-run']       = self._actor_run
         self.words['actor-id']        = self._actor_id
@@ -207,8 +1388,22 @@ class ForthActors:
         self.words['actor-list']      = self._actor_list
         self.words['reactive']        = self._reactive
         self.words['proactive']       = self._proactive
+        self.words['actor-mailbox!']  = self._actor_mailbox_store
         self.words['ms']              = self._ms
         self.words['s']               = self._s_to_ms
+        # ── Scheduler (M:N) ────────────────────────────────────────────
+        self.words['actor-spawn-handler'] = self._actor_spawn_handler
+        self.words['actor-workers!']      = self._actor_workers_store
+        self.words['actor-sched-stats']   = self._actor_sched_stats
+        # ── Process actors ─────────────────────────────────────────────
+        self.words['actor-spawn-process'] = self._actor_spawn_process
+        self.words['actor-cpu!']          = self._actor_cpu_store
+        self.words['shm-alloc']           = self._shm_alloc
+        self.words['shm-release']         = self._shm_release
+        self.words['shm-stats']           = self._shm_stats
+        # ── Timers ─────────────────────────────────────────────────────
+        self.words['send-after']          = self._send_after
+        self.words['timer-stats']         = self._timer_stats_word
         # ── Phase 2 words ──────────────────────────────────────────────
         self.words['sender-id']       = self._sender_id
         self.words['reply']           = self._reply
@@ -225,6 +1420,7 @@ class ForthActors:
         self.words['ruta-buscar']         = self._ruta_buscar
         self.words['ruta-del']            = self._ruta_del
         self.words['rutas']               = self._rutas
+        self.words['ruta-v!']             = self._ruta_v_store
         # Convenience wrappers (auto-start transport actor + register route)
         self.words['wifi-ruta-add']       = self._wifi_ruta_add
         self.words['uart-ruta-add']       = self._uart_ruta_add
@@ -234,6 +1430,7 @@ class ForthActors:
         self.words['actor-wifi-tcp-out']  = self._actor_wifi_tcp_out
         self.words['actor-uart-out']      = self._actor_uart_out
         self.words['actor-spi-out']       = self._actor_spi_out
+        self.words['transport-stats']     = self._transport_stats_word
         # Incoming transport actors
         self.words['actor-wifi-in']       = self._actor_wifi_in
         self.words['actor-wifi-tcp-in']   = self._actor_wifi_tcp_in
@@ -313,7 +1510,7 @@ class ForthActors:
         )
 
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         child._actor_queue,
                 'name':          word_name,
@@ -323,11 +1520,226 @@ class ForthActors:
                 'type':          'reactive',
                 '_timer_stop':   None,
                 '_timer_thread': None,
-            }
+            })
 
         self.stack.append(actor_id)
         print(f"Actor {actor_id} ({word_name}) creado — usa actor-run para iniciarlo")
 
+    # ── Scheduler (M:N) ─────────────────────────────────────────────────
+
+    @staticmethod
+    def _sched_get():
+        """Return the shared scheduler, starting it on first use."""
+        with ForthActors._registry_lock:
+            if ForthActors._scheduler is None:
+                import os
+                size = ForthActors._sched_workers or min(32, (os.cpu_count() or 1) + 4)
+                ForthActors._scheduler = _Scheduler(size)
+            return ForthActors._scheduler
+
+    def _actor_spawn_handler(self):
+        """( xt|name -- actor-id ) Create a handler actor (pending).
+
+        The word is called once per message with the message on the stack
+        ( msg -- ).  Handler actors have no thread of their own: they run on
+        the scheduler's worker pool, one message at a time, and keep their
+        own stack, variables and values between messages (memory created
+        with CREATE/ALLOT is the worker's, not the actor's).
+        Thousands of idle handler actors cost only their mailbox.
+        """
+        if not self.stack:
+            print("Error: actor-spawn-handler requiere xt o nombre en la pila")
+            return
+        word_or_xt = self.stack.pop()
+        if callable(word_or_xt):
+            word_name = next(
+                (k for k, v in self.words.items() if v is word_or_xt),
+                None
+            )
+            if word_name is None:
+                print("Error: actor-spawn-handler: xt sin nombre conocido "
+                      "(usa s\" nombre\" actor-spawn-handler)")
+                return
+        else:
+            word_name = str(word_or_xt)
+
+        sched = self._sched_get()
+        key = sched.register(self)
+        with ForthActors._registry_lock:
+            actor_id = ForthActors._next_id
+            ForthActors._next_id += 1
+            _registry_put(actor_id, {
+                'thread':        None,
+                'queue':         _Mailbox(actor_id, word_name, key),
+                'name':          word_name,
+                'forth':         None,
+                'alive':         False,
+                'pending':       True,
+                'type':          'handler',
+                '_timer_stop':   None,
+                '_timer_thread': None,
+            })
+
+        self.stack.append(actor_id)
+        print(f"Actor {actor_id} ({word_name}) creado (handler) — usa actor-run para iniciarlo")
+
+    def _actor_spawn_process(self):
+        """( xt|name -- actor-id ) Create an actor that runs in its own
+        process (pending).
+
+        The child is built from a snapshot of this dictionary (values and
+        variables included, as par-map); later definitions are not seen.
+        actor-send, reply, sender-id, broadcast and actor-kill work as with
+        thread actors; messages must be picklable.
+        """
+        if not self.stack:
+            print("Error: actor-spawn-process requiere xt o nombre en la pila")
+            return
+        word_or_xt = self.stack.pop()
+        if callable(word_or_xt):
+            word_name = next(
+                (k for k, v in self.words.items() if v is word_or_xt),
+                None
+            )
+            if word_name is None:
+                print("Error: actor-spawn-process: xt sin nombre conocido "
+                      "(usa s\" nombre\" actor-spawn-process)")
+                return
+        else:
+            word_name = str(word_or_xt)
+        if word_name not in self.words:
+            print(f"Error: actor-spawn-process: palabra desconocida '{word_name}'")
+            return
+
+        snap, _, state = self._par_snapshot()
+        with ForthActors._registry_lock:
+            actor_id = ForthActors._next_id
+            ForthActors._next_id += 1
+            proc = _ProcessActor(actor_id, word_name, snap, state)
+            _registry_put(actor_id, {
+                'thread':        proc,
+                'queue':         proc.mailbox,
+                'name':          word_name,
+                'forth':         None,
+                'alive':         False,
+                'pending':       True,
+                'type':          'process',
+                '_timer_stop':   None,
+                '_timer_thread': None,
+            })
+
+        self.stack.append(actor_id)
+        print(f"Actor {actor_id} ({word_name}) creado (proceso) — usa actor-run para iniciarlo")
+
+    def _actor_cpu_store(self):
+        """( core actor-id -- ) Pin a process actor to one core
+        (-1 = any core).  Applies now if it is running, else at actor-run."""
+        if len(self.stack) < 2:
+            print("Error: actor-cpu! requiere ( nucleo actor-id -- )")
+            return
+        actor_id = int(self.stack.pop())
+        core     = int(self.stack.pop())
+        entry = ForthActors._registry.get(actor_id)
+        if not entry:
+            print(f"Error: actor {actor_id} no existe")
+            return
+        proc = entry['thread']
+        if not isinstance(proc, _ProcessActor):
+            print(f"Error: actor-cpu!: actor {actor_id} no es un actor de proceso")
+            return
+        import os
+        if not hasattr(os, 'sched_setaffinity'):
+            print("Error: actor-cpu! no disponible en esta plataforma")
+            return
+        try:
+            proc.pin(None if core < 0 else {core})
+        except OSError as e:
+            print(f"Error: actor-cpu!: {e}")
+
+    def _shm_alloc(self):
+        """( shape dtype -- array ) ndarray backed by a shared-memory
+        segment: sending it to a process actor copies nothing.
+        shape: number or list, dtype: s" uint8" etc."""
+        if len(self.stack) < 2:
+            print("Error: shm-alloc requiere ( forma dtype -- )")
+            return
+        dtype = str(self.stack.pop())
+        shape = self.stack.pop()
+        try:
+            self.stack.append(_shm_pool().alloc(shape, dtype))
+        except ImportError:
+            print("Error: shm-alloc requiere numpy (pip install numpy)")
+        except (TypeError, ValueError) as e:
+            print(f"Error: shm-alloc: {e}")
+
+    def _shm_release(self):
+        """( array -- ) Return the array's shared-memory segment to its
+        pool now instead of when the array is freed.  Do not use it after."""
+        if not self.stack:
+            print("Error: shm-release requiere un array")
+            return
+        if not _shm_pool().release(self.stack.pop()):
+            print("Error: shm-release: el array no está en memoria compartida")
+
+    def _shm_stats(self):
+        """( -- ) Print this process's shared-memory segment pool."""
+        r = _shm_pool().report()
+        print(f"Memoria compartida: {r['segments']} segmentos "
+              f"({r['busy']} ocupados, {r['bytes'] / 1e6:.1f} MB), "
+              f"{r['attached']} mapeados de otros procesos")
+        print(f"  Enviados: {r['exported']} (sin copia {r['zero_copy']}, "
+              f"copiados {r['copied']})  Recibidos: {r['imported']}  "
+              f"Liberados: {r['released']} (de actores muertos {r['reclaimed']})  "
+              f"Pool lleno: {r['fallback']}")
+
+    def _actor_workers_store(self):
+        """( n -- ) Set the number of scheduler worker threads."""
+        if not self.stack:
+            print("Error: actor-workers! requiere un numero")
+            return
+        n = int(self.stack.pop())
+        if n < 1:
+            print("Error: actor-workers! requiere n >= 1")
+            return
+        ForthActors._sched_workers = n
+        if ForthActors._scheduler is not None:
+            ForthActors._scheduler.resize(n)
+
+    def _actor_sched_stats(self):
+        """( -- ) Print scheduler counters."""
+        sched = ForthActors._scheduler
+        if sched is None:
+            print("Planificador inactivo (se arranca con actor-spawn-handler)")
+            return
+        handlers = [e for e in ForthActors._registry.values()
+                    if e.get('type') == 'handler']
+        alive = sum(1 for e in handlers if e.get('alive'))
+        st = dict(sched.stats)
+        print(f"Planificador: {sched.size} workers ({sched.workers()} hilos vivos), "
+              f"{len(handlers)} actores handler ({alive} activos)")
+        print(f"  Activaciones: {st['activations']}  Mensajes: {st['messages']}  "
+              f"Hilos de respaldo: {st['compensations']}  Errores: {st['errors']}")
+
+    # ── Timers ──────────────────────────────────────────────────────────
+
+    def timer_stats(self):
+        """Statistics of the shared timer thread (times in seconds):
+        active timers, ticks fired/skipped, messages dropped on a full
+        mailbox, lateness mean/p95/max, jitter
+        (std. dev. of lateness) and the largest accumulated drift."""
+        return _timer_service().report()
+
+    def _timer_stats_word(self):
+        """( -- ) Print jitter and drift of the shared timer thread."""
+        r = self.timer_stats()
+        ms = lambda v: f"{v * 1000:.3f} ms"
+        print(f"Temporizadores: {r['timers']} activos ({r['periodic']} periodicos), "
+              f"{r['fired']} disparos, {r['skipped']} saltados, {r['errors']} errores, "
+              f"{r['dropped']} mensajes descartados (buzon lleno)")
+        print(f"  Retraso: medio {ms(r['late_mean'])}  p95 {ms(r['late_p95'])}  "
+              f"max {ms(r['late_max'])}  jitter {ms(r['jitter'])}")
+        print(f"  Deriva acumulada max: {ms(r['drift_max'])}")
+
     def _create_child_forth(self, actor_id):
         """Create a fresh Forth instance with inherited user-defined words.
         The child gets its own queue, identity, and fully child-bound actor words.
@@ -336,7 +1748,7 @@ class ForthActors:
         child = ForthClass()
 
         # Give the child its own message queue, identity and sender tracking
-        child._actor_queue    = queue.Queue()
+        child._actor_queue    = _ActorQueue()
         child._actor_id_val   = actor_id
         child._last_sender_id = 0
 
@@ -350,46 +1762,94 @@ class ForthActors:
         child.words['reply']           = lambda: _reply_in(child)
 
         # Inherit all user definitions in declaration order.
-        # Errors are suppressed; set ACTOR_DEBUG=1 to surface them.
+        child._load_snapshot(self._dictionary_snapshot())
+
+        return child
+
+    def _dictionary_snapshot(self, memory=False):
+        """Snapshot of the user dictionary used to clone this interpreter
+        (actor children, par-map workers).  Words travel as Forth source.
+        With memory=True it also carries CREATE words and memory up to HERE,
+        which a child in another process needs to see the same data."""
+        snap = {'order': [], 'source': {}, 'variables': {}, 'values': {},
+                'constants': {}, 'created': {}}
+        for def_type, name in self._definition_order:
+            if def_type == 'word':
+                source = self._definition_source.get(name)
+                if source:
+                    snap['source'][name] = source
+            elif def_type == 'variable':
+                if name in self.variables:
+                    snap['variables'][name] = self.variables[name]
+            elif def_type == 'value':
+                if name in self.values:
+                    snap['values'][name] = self.values[name]
+            elif def_type == 'constant':
+                if name in self.constants:
+                    snap['constants'][name] = self.constants[name]
+            elif def_type == 'created' and memory:
+                defaults = getattr(self.words.get(name), '__defaults__', None)
+                if defaults:
+                    snap['created'][name] = defaults[0]
+            else:
+                continue
+            snap['order'].append((def_type, name))
+        if memory:
+            snap['here'] = self.here
+            snap['memory'] = self.memory[:self.here]
+        return snap
+
+    def _load_snapshot(self, snap):
+        """Recreate the definitions of a _dictionary_snapshot() in self.
+        Errors are suppressed; set ACTOR_DEBUG=1 to surface them."""
         import os as _os
         _debug = _os.environ.get('ACTOR_DEBUG')
 
-        for def_type, name in self._definition_order:
+        for def_type, name in snap['order']:
             try:
                 if def_type == 'word':
                     # Re-execute the Forth source of the word
-                    source = self._definition_source.get(name)
+                    source = snap['source'].get(name)
                     if source:
-                        child.execute(source)
+                        self.execute(source)
 
                 elif def_type == 'variable':
                     # Create variable in child and copy the current value
-                    child.execute(f'variable {name}')
-                    if name in self.variables:
-                        val = self.variables[name]
-                        if isinstance(val, int):
-                            child.execute(f'{val} {name} !')
+                    self.execute(f'variable {name}')
+                    val = snap['variables'].get(name)
+                    if isinstance(val, int):
+                        self.execute(f'{val} {name} !')
 
                 elif def_type == 'value':
                     # Values may hold Python objects (e.g. xt from '); set directly
-                    if name in self.values:
-                        val = self.values[name]
-                        child.values[name] = val
-                        child.words[name] = (
-                            lambda _n=name: child.stack.append(child.values[_n])
+                    if name in snap['values']:
+                        self.values[name] = snap['values'][name]
+                        self.words[name] = (
+                            lambda _n=name: self.stack.append(self.values[_n])
                         )
+                        self._definition_order.append(('value', name))
 
                 elif def_type == 'constant':
-                    if name in self.constants:
-                        val = self.constants[name]
-                        child.constants[name] = val
-                        child.words[name] = (lambda _v=val: lambda: child.stack.append(_v))(val)
+                    if name in snap['constants']:
+                        val = snap['constants'][name]
+                        self.constants[name] = val
+                        self.words[name] = lambda _v=val: self.stack.append(_v)
+                        self._definition_order.append(('constant', name))
+
+                elif def_type == 'created':
+                    addr = snap['created'].get(name)
+                    if addr is not None:
+                        self.words[name] = lambda a=addr: self.stack.append(a)
+                        self._definition_order.append(('created', name))
 
             except Exception as _e:
                 if _debug:
                     print(f"[actor-spawn] advertencia al heredar {def_type} '{name}': {_e}")
 
-        return child
+        if 'memory' in snap:
+            data = snap['memory']
+            self.memory[:len(data)] = data
+            self.here = snap['here']
 
     # ── Messaging ─────────────────────────────────────────────────────
 
@@ -405,6 +1865,22 @@ class ForthActors:
         self._last_sender_id = msg.sender_id
         self.stack.append(msg.value)
 
+    def _receive_batch(self):
+        """( max timeout-ms -- v1 .. vn n ) Take up to max messages in one
+        go, waiting up to timeout-ms for the first (0 = no wait, -1 = no
+        limit).  n = 0 if nothing arrived."""
+        if len(self.stack) < 2:
+            print("Error: receive-batch requiere ( max timeout-ms -- )")
+            return
+        timeout_ms = int(self.stack.pop())
+        n = int(self.stack.pop())
+        q = getattr(self, '_actor_queue', None)
+        if q is None:
+            # REPL / main thread: use actor-0 queue
+            q = ForthActors._main_queue
+        batch = q.get_batch(n, None if timeout_ms < 0 else timeout_ms / 1000.0) if n > 0 else []
+        _push_batch(self, batch)
+
     def _receive_timeout(self):
         """( ms -- msg found ) Receive with timeout; pushes 0 0 if nothing arrives."""
         if not self.stack:
@@ -438,30 +1914,42 @@ class ForthActors:
         actor_id  = int(self.stack.pop())
         value     = self.stack.pop()
         sender_id = getattr(_actor_local, 'actor_id', 0)
+        _deliver(sender_id, actor_id, value)
 
-        # ── Phase 3: check routing table ───────────────────────────────
-        with ForthActors._route_lock:
-            route = ForthActors._route_table.get(actor_id)
+    def _actor_send_many(self):
+        """( list actor-id -- ) Send each element of list as a message to
+        actor-id (local or routed), enqueued in one go."""
+        if len(self.stack) < 2:
+            print("Error: actor-send-many requiere ( lista actor-id -- )")
+            return
+        actor_id = int(self.stack.pop())
+        values   = self.stack.pop()
+        if isinstance(values, (str, bytes, dict)) or not hasattr(values, '__iter__'):
+            print("Error: actor-send-many requiere una lista de valores")
+            return
+        sender_id = getattr(_actor_local, 'actor_id', 0)
+        _deliver_many(sender_id, actor_id, list(values))
 
-        if route:
-            ta_id = route['transport_actor_id']
-            with ForthActors._registry_lock:
-                ta_entry = ForthActors._registry.get(ta_id)
-            if ta_entry and ta_entry.get('alive'):
-                # Deliver (to_id, value) to the transport actor's queue
-                ta_entry['queue'].put(_ActorMsg(sender_id, (actor_id, value)))
-            else:
-                print(f"Error: actor-send: transport actor {ta_id} "
-                      f"({route.get('transport','?')}) no disponible")
+    def _send_after(self):
+        """( value actor-id ms -- ) Deliver value to actor-id (local or
+        routed) after ms milliseconds, from the shared timer thread."""
+        if len(self.stack) < 3:
+            print("Error: send-after requiere ( valor actor-id ms -- )")
             return
+        delay_ms  = int(self.stack.pop())
+        actor_id  = int(self.stack.pop())
+        value     = self.stack.pop()
+        sender_id = getattr(_actor_local, 'actor_id', 0)
 
-        # ── Local delivery ────────────────────────────────────────────
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(actor_id)
-        if entry:
-            entry['queue'].put(_ActorMsg(sender_id, value))
-        else:
-            print(f"Error: actor {actor_id} no existe (ni local ni remoto)")
+        def fire():
+            try:
+                _deliver(sender_id, actor_id, value, block=False)
+            except queue.Full:
+                _timer_service().stats['dropped'] += 1
+
+        _Timer(fire,
+               max(delay_ms, 0) / 1000.0,
+               name=f"send-after-{actor_id}").start()
 
     # ── Phase 2: Advanced messaging ────────────────────────────────────
 
@@ -477,8 +1965,7 @@ class ForthActors:
         value = self.stack.pop()
         sid   = getattr(self, '_last_sender_id', 0)
         my_id = getattr(self, '_actor_id_val', 0)
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(sid)
+        entry = ForthActors._registry.get(sid)
         if entry:
             entry['queue'].put(_ActorMsg(my_id, value))
         else:
@@ -491,11 +1978,10 @@ class ForthActors:
             return
         value  = self.stack.pop()
         my_id  = getattr(_actor_local, 'actor_id', 0)
-        with ForthActors._registry_lock:
-            targets = [
-                (aid, e) for aid, e in ForthActors._registry.items()
-                if aid != my_id and e.get('alive')
-            ]
+        targets = [
+            (aid, e) for aid, e in ForthActors._registry.items()
+            if aid != my_id and e.get('alive')
+        ]
         for aid, e in targets:
             e['queue'].put(_ActorMsg(my_id, value))
         if not targets:
@@ -507,14 +1993,16 @@ class ForthActors:
             print("Error: actor-wait requiere actor-id")
             return
         actor_id = int(self.stack.pop())
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(actor_id)
+        entry = ForthActors._registry.get(actor_id)
         if not entry:
             print(f"Error: actor-wait: actor {actor_id} no existe")
             return
         thread = entry.get('thread')
         if thread:
             thread.join()
+        elif isinstance(entry['queue'], _Mailbox):
+            while entry.get('alive') or entry.get('pending'):
+                time.sleep(0.01)
 
     # ── Phase 2: Watchdog ─────────────────────────────────────────────
 
@@ -532,8 +2020,7 @@ class ForthActors:
         max_retries = int(self.stack.pop())
         interval_ms = int(self.stack.pop())
 
-        with ForthActors._registry_lock:
-            watched_entry = ForthActors._registry.get(actor_id)
+        watched_entry = ForthActors._registry.get(actor_id)
         if not watched_entry:
             print(f"Error: actor-watchdog: actor {actor_id} no existe")
             return
@@ -541,59 +2028,69 @@ class ForthActors:
         word_name     = watched_entry['name']
         parent_forth  = self
         stop_evt      = threading.Event()
+        state         = {'retries': 0, 'respawning': False}
 
         with ForthActors._registry_lock:
             wdg_id = ForthActors._next_id
             ForthActors._next_id += 1
 
-        def watchdog_body():
-            retries = 0
+        def finish():
+            stop_evt.set()
+            # Mark watchdog as dead in registry so actor-list reflects correct state
+            with ForthActors._registry_lock:
+                if wdg_id in ForthActors._registry:
+                    ForthActors._registry[wdg_id]['alive'] = False
+
+        def respawn():
             try:
-                while not stop_evt.wait(timeout=interval_ms / 1000.0):
-                    with ForthActors._registry_lock:
-                        e = ForthActors._registry.get(actor_id)
-                        if not e:
-                            break
-                        alive   = e.get('alive', False)
-                        pending = e.get('pending', False)
-
-                    if not alive and not pending:
-                        if max_retries != -1 and retries >= max_retries:
-                            ts = datetime.now().strftime('%H:%M:%S')
-                            print(f"[{ts}] watchdog: actor {actor_id} ({word_name}) "
-                                  f"agotó reintentos ({max_retries}), deteniendo watchdog")
-                            break
-
-                        retries += 1
-                        ts = datetime.now().strftime('%H:%M:%S')
-                        print(f"[{ts}] watchdog: reiniciando actor {actor_id} "
-                              f"({word_name}) — intento {retries}")
-
-                        # Send log if logger is running
-                        _send_to_log(wdg_id,
-                                     f"watchdog: reinicio #{retries} del actor {actor_id} ({word_name})",
-                                     level='warn')
-
-                        ok = _respawn_actor(parent_forth, actor_id)
-                        if not ok:
-                            break
-
-                        time.sleep(0.05)  # give the new thread a moment to start
+                # Send log if logger is running (may wait on its mailbox,
+                # so not from the timer thread)
+                _send_to_log(wdg_id,
+                             f"watchdog: reinicio #{state['retries']} del actor {actor_id} ({word_name})",
+                             level='warn')
+                if not _respawn_actor(parent_forth, actor_id):
+                    finish()
+                time.sleep(0.05)  # give the new thread a moment to start
             finally:
-                # Mark watchdog as dead in registry so actor-list reflects correct state
-                with ForthActors._registry_lock:
-                    if wdg_id in ForthActors._registry:
-                        ForthActors._registry[wdg_id]['alive'] = False
+                state['respawning'] = False
 
-        wdg_thread = threading.Thread(
-            target=watchdog_body,
-            daemon=True,
-            name=f"watchdog-{actor_id}",
-        )
+        def check():
+            # Runs on the shared timer thread: only the registry check here,
+            # the (slower) respawn goes to a short-lived thread.
+            if state['respawning']:
+                return
+            with ForthActors._registry_lock:
+                e = ForthActors._registry.get(actor_id)
+                if not e:
+                    finish()
+                    return
+                alive   = e.get('alive', False)
+                pending = e.get('pending', False)
+
+            if not alive and not pending:
+                if max_retries != -1 and state['retries'] >= max_retries:
+                    ts = datetime.now().strftime('%H:%M:%S')
+                    print(f"[{ts}] watchdog: actor {actor_id} ({word_name}) "
+                          f"agotó reintentos ({max_retries}), deteniendo watchdog")
+                    finish()
+                    return
+
+                state['retries'] += 1
+                ts = datetime.now().strftime('%H:%M:%S')
+                print(f"[{ts}] watchdog: reiniciando actor {actor_id} "
+                      f"({word_name}) — intento {state['retries']}")
+
+                state['respawning'] = True
+                threading.Thread(target=respawn, daemon=True,
+                                 name=f"watchdog-{actor_id}-respawn").start()
+
+        wdg_timer = _Timer(check, interval_ms / 1000.0,
+                           interval=interval_ms / 1000.0, stop=stop_evt,
+                           name=f"watchdog-{actor_id}")
 
         with ForthActors._registry_lock:
-            ForthActors._registry[wdg_id] = {
-                'thread':        wdg_thread,
+            _registry_put(wdg_id, {
+                'thread':        wdg_timer,
                 'queue':         queue.Queue(),
                 'name':          f'watchdog({word_name})',
                 'forth':         None,
@@ -602,9 +2099,9 @@ class ForthActors:
                 'type':          'watchdog',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
 
-        wdg_thread.start()
+        wdg_timer.start()
         self.stack.append(wdg_id)
         print(f"Watchdog {wdg_id} monitorizando actor {actor_id} ({word_name}), "
               f"intervalo={interval_ms}ms, max_reintentos={max_retries}")
@@ -635,7 +2132,7 @@ class ForthActors:
             log_id = ForthActors._next_id
             ForthActors._next_id += 1
 
-        log_queue = queue.Queue()
+        log_queue = _ActorQueue()
 
         LEVEL_PREFIX = {
             'info':  '[INFO ]',
@@ -676,7 +2173,7 @@ class ForthActors:
         )
 
         with ForthActors._registry_lock:
-            ForthActors._registry[log_id] = {
+            _registry_put(log_id, {
                 'thread':        log_thread,
                 'queue':         log_queue,
                 'name':          'actor-log',
@@ -686,7 +2183,7 @@ class ForthActors:
                 'type':          'logger',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
             ForthActors._log_actor_id = log_id
 
         log_thread.start()
@@ -704,8 +2201,7 @@ class ForthActors:
         if log_id is None:
             print(f"[{level.upper():5}] {text}")
             return
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(log_id)
+        entry = ForthActors._registry.get(log_id)
         if entry and entry.get('alive'):
             my_id = getattr(self, '_actor_id_val',
                             getattr(_actor_local, 'actor_id', 0))
@@ -741,7 +2237,7 @@ class ForthActors:
         actor_id = int(self.stack.pop())
 
         with ForthActors._registry_lock:
-            entry = ForthActors._registry.pop(actor_id, None)
+            entry = _registry_drop(actor_id)
             if actor_id == getattr(ForthActors, '_log_actor_id', None):
                 ForthActors._log_actor_id = None
 
@@ -764,6 +2260,8 @@ class ForthActors:
         thread = entry.get('thread')
         if thread and thread.is_alive():
             thread.join(timeout=1.0)
+            if isinstance(thread, _ProcessActor):
+                thread.terminate()
 
         print(f"Actor {actor_id} ({entry['name']}) eliminado")
 
@@ -780,8 +2278,7 @@ class ForthActors:
             candidate = self.stack[-1]
             if isinstance(candidate, (int, float)):
                 cid = int(candidate)
-                with ForthActors._registry_lock:
-                    entry = ForthActors._registry.get(cid)
+                entry = ForthActors._registry.get(cid)
                 if entry and entry.get('pending'):
                     self.stack.pop()
                     specific_id = cid
@@ -789,14 +2286,18 @@ class ForthActors:
         if specific_id is not None:
             pending = [(specific_id, ForthActors._registry[specific_id])]
         else:
-            with ForthActors._registry_lock:
-                pending = [
-                    (aid, e) for aid, e in ForthActors._registry.items()
-                    if e.get('pending')
-                ]
+            pending = [
+                (aid, e) for aid, e in ForthActors._registry.items()
+                if e.get('pending')
+            ]
 
         for actor_id, entry in pending:
-            entry['thread'].start()
+            if entry['thread'] is not None:
+                entry['thread'].start()
+            else:
+                with ForthActors._registry_lock:
+                    entry['alive'] = True
+                entry['queue'].start()
             with ForthActors._registry_lock:
                 if actor_id in ForthActors._registry:
                     ForthActors._registry[actor_id]['pending'] = False
@@ -824,23 +2325,23 @@ class ForthActors:
             self.stack.append(0)
             return
         actor_id = int(self.stack.pop())
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(actor_id)
+        entry = ForthActors._registry.get(actor_id)
         self.stack.append(-1 if entry and entry.get('alive') else 0)
 
     def _actor_list(self):
         """( -- ) Print a table of all registered actors."""
-        with ForthActors._registry_lock:
-            actors = list(ForthActors._registry.items())
+        actors = list(ForthActors._registry.items())
 
-        out = getattr(self, '_forth_output', sys.stdout)
+        self._flush_output()
+        out = self._forth_output
         if not actors:
             out.write("No hay actores registrados\n")
             out.flush()
             return
 
-        out.write(f"{'ID':>4}  {'Nombre':<22}  {'Tipo':<10}  {'Estado':<10}  {'Cola':>5}\n")
-        out.write("-" * 58 + "\n")
+        out.write(f"{'ID':>4}  {'Nombre':<22}  {'Tipo':<10}  {'Estado':<10}  {'Cola':>5}"
+                  f"  {'Cap':>5}  {'Politica':<11}  {'Max':>5}  {'Desc':>6}\n")
+        out.write("-" * 94 + "\n")
         for actor_id, entry in sorted(actors):
             name  = entry['name'][:22]
             tipo  = entry.get('type', 'reactive')[:10]
@@ -850,12 +2351,46 @@ class ForthActors:
                 estado = 'activo'
             else:
                 estado = 'muerto'
-            cola = entry['queue'].qsize()
-            out.write(f"{actor_id:>4}  {name:<22}  {tipo:<10}  {estado:<10}  {cola:>5}\n")
+            box  = entry['queue']
+            cola = box.qsize()
+            cap  = getattr(box, 'capacity', 0)
+            pol  = box.policy if cap else '-'
+            out.write(f"{actor_id:>4}  {name:<22}  {tipo:<10}  {estado:<10}  {cola:>5}"
+                      f"  {cap or '-':>5}  {pol:<11}  {getattr(box, 'high_water', 0):>5}"
+                      f"  {getattr(box, 'dropped', 0):>6}\n")
         out.flush()
 
     # ── Behaviour ─────────────────────────────────────────────────────
 
+    def _actor_mailbox_store(self):
+        """( capacity policy actor-id -- ) Bound the actor's mailbox.
+
+        policy: block | drop-newest | drop-oldest | coalesce (see
+        MAILBOX_POLICIES).  capacity 0 makes the mailbox unbounded again.
+        """
+        if len(self.stack) < 3:
+            print("Error: actor-mailbox! requiere ( capacidad politica actor-id -- )")
+            return
+        actor_id = int(self.stack.pop())
+        policy   = str(self.stack.pop())
+        capacity = int(self.stack.pop())
+        if policy not in MAILBOX_POLICIES:
+            print(f"Error: actor-mailbox!: politica '{policy}' no valida "
+                  f"({' | '.join(MAILBOX_POLICIES)})")
+            return
+        if capacity < 0:
+            print("Error: actor-mailbox! requiere capacidad >= 0")
+            return
+        entry = ForthActors._registry.get(actor_id)
+        if not entry:
+            print(f"Error: actor {actor_id} no existe")
+            return
+        box = entry['queue']
+        if not hasattr(box, 'capacity'):
+            print(f"Error: actor-mailbox!: el buzon de actor {actor_id} no admite limite")
+            return
+        _mailbox_limit(box, capacity, policy)
+
     def _reactive(self):
         """( actor-id -- ) Mark actor as reactive (message-driven, default)."""
         if not self.stack:
@@ -889,17 +2424,13 @@ class ForthActors:
             stop_evt  = threading.Event()
             msg_queue = entry['queue']
 
-            def tick_loop(stop=stop_evt, aid=actor_id, q=msg_queue,
-                          iv=interval_ms):
-                while not stop.wait(timeout=iv / 1000.0):
-                    with ForthActors._registry_lock:
-                        if aid not in ForthActors._registry:
-                            break
-                    q.put(_ActorMsg(0, "'tick"))
-
-            timer_thread = threading.Thread(
-                target=tick_loop,
-                daemon=True,
+            # Tick from the shared timer thread; actor-kill and actor death
+            # set stop_evt, so no registry lookup is needed per tick.
+            timer_thread = _Timer(
+                lambda q=msg_queue: _timer_put(q, _ActorMsg(0, "'tick")),
+                interval_ms / 1000.0,
+                interval=interval_ms / 1000.0,
+                stop=stop_evt,
                 name=f"timer-{actor_id}",
             )
 
@@ -934,8 +2465,7 @@ class ForthActors:
         transport          = str(self.stack.pop())
         actor_id           = int(self.stack.pop())
 
-        with ForthActors._registry_lock:
-            ta_entry = ForthActors._registry.get(transport_actor_id)
+        ta_entry = ForthActors._registry.get(transport_actor_id)
         if not ta_entry:
             print(f"Error: registrar-ruta: transport actor {transport_actor_id} no existe")
             return
@@ -947,7 +2477,7 @@ class ForthActors:
             'desc':               desc,
         }
         with ForthActors._route_lock:
-            ForthActors._route_table[actor_id] = route
+            _route_put(actor_id, route)
 
         print(f"Ruta registrada: actor-{actor_id} → [{transport}] actor-{transport_actor_id} ({desc})")
 
@@ -969,8 +2499,7 @@ class ForthActors:
             print("Error: ruta-buscar requiere actor-id")
             return
         actor_id = int(self.stack.pop())
-        with ForthActors._route_lock:
-            route = ForthActors._route_table.get(actor_id)
+        route = ForthActors._route_table.get(actor_id)
         if route:
             transport = route.get('transport', '?')
             desc      = route.get('desc', '?')
@@ -1006,7 +2535,7 @@ class ForthActors:
         route = {'transport': 'mqtt', 'transport_actor_id': ta_id,
                  'desc': f"{host}:{port}/{topic}"}
         with ForthActors._route_lock:
-            ForthActors._route_table[actor_id] = route
+            _route_put(actor_id, route)
         print(f"Ruta WiFi MQTT: actor-{actor_id} → actor-{ta_id} ({host}:{port}/{topic})")
 
     def _uart_ruta_add(self):
@@ -1031,7 +2560,7 @@ class ForthActors:
         route = {'transport': 'uart', 'transport_actor_id': ta_id,
                  'desc': f"{device}@{baud}"}
         with ForthActors._route_lock:
-            ForthActors._route_table[actor_id] = route
+            _route_put(actor_id, route)
         print(f"Ruta UART: actor-{actor_id} → actor-{ta_id} ({device}@{baud})")
 
     def _spi_ruta_add(self):
@@ -1059,7 +2588,7 @@ class ForthActors:
         route = {'transport': 'spi', 'transport_actor_id': ta_id,
                  'desc': f"{device}@{speed}Hz"}
         with ForthActors._route_lock:
-            ForthActors._route_table[actor_id] = route
+            _route_put(actor_id, route)
         print(f"Ruta SPI: actor-{actor_id} → actor-{ta_id} ({device}@{speed}Hz)")
 
     def _ruta_del(self):
@@ -1069,39 +2598,60 @@ class ForthActors:
             return
         actor_id = int(self.stack.pop())
         with ForthActors._route_lock:
-            removed = ForthActors._route_table.pop(actor_id, None)
+            removed = _route_drop(actor_id)
         if removed:
             print(f"Ruta de actor-{actor_id} eliminada")
         else:
             print(f"actor-{actor_id} no tenía ruta registrada")
 
+    def _ruta_v_store(self):
+        """( actor-id v -- ) Fix the encoding of actor-id's route: 1 = JSON,
+        2 = binary (pfforth.codec).  0 returns it to negotiation: the route
+        follows the 'v' of the envelopes that arrive from actor-id."""
+        if len(self.stack) < 2:
+            print("Error: ruta-v! requiere ( actor-id v -- )")
+            return
+        v        = int(self.stack.pop())
+        actor_id = int(self.stack.pop())
+        if v not in (0, _codec.V_JSON, _codec.V_BINARY):
+            print(f"Error: ruta-v!: versión {v} no soportada (1 = JSON, 2 = binario, 0 = negociar)")
+            return
+        with ForthActors._route_lock:
+            ok = _route_set_codec(actor_id, v or _codec.V_JSON, fixed=bool(v))
+        if not ok:
+            print(f"Error: ruta-v!: actor-{actor_id} no tiene ruta registrada")
+
     def _rutas(self):
         """( -- ) Print the current routing table."""
-        out = getattr(self, '_forth_output', sys.stdout)
-        with ForthActors._route_lock:
-            routes = list(ForthActors._route_table.items())
+        self._flush_output()
+        out = self._forth_output
+        routes = list(ForthActors._route_table.items())
         if not routes:
             out.write("Tabla de rutas vacía (todos los actores son locales)\n")
             out.flush()
             return
-        out.write(f"{'Actor-ID':>9}  {'Transport':>5}  {'TA-ID':>6}  Endpoint\n")
-        out.write("-" * 64 + "\n")
+        out.write(f"{'Actor-ID':>9}  {'Transport':>5}  {'TA-ID':>6}  {'Codec':<7}  Endpoint\n")
+        out.write("-" * 73 + "\n")
         for actor_id, r in sorted(routes):
             t    = r.get('transport', '?')
             taid = r.get('transport_actor_id', '?')
             desc = r.get('desc', '')
-            out.write(f"{actor_id:>9}  {t:>5}  {str(taid):>6}  {desc}\n")
+            codec = 'bin' if r.get('v', _codec.V_JSON) >= _codec.V_BINARY else 'json'
+            codec += '!' if r.get('v_fixed') else ''
+            out.write(f"{actor_id:>9}  {t:>5}  {str(taid):>6}  {codec:<7}  {desc}\n")
         out.flush()
 
     # ── Outgoing transport actors ──────────────────────────────────────
 
     def _actor_wifi_out(self):
-        """( host port topic -- actor-id ) Start an MQTT OUT transport actor.
+        """( host port topic -- actor-id ) Start (or reuse) the MQTT OUT
+        transport actor for host:port/topic.
 
         The actor sits in a receive loop.  Each received message must be a
         tuple (to_id, value) produced by actor-send when routing remotely.
-        It serialises the message to a JSON pfforth-actor envelope and
-        publishes it to *topic* on the MQTT broker at host:port.
+        It serialises the message to a JSON pfforth-actor envelope (an array
+        of them when the queue is deep) and publishes it to *topic* through
+        the broker's shared persistent client.
         Requires: paho-mqtt
         """
         if len(self.stack) < 3:
@@ -1111,15 +2661,17 @@ class ForthActors:
         port  = int(self.stack.pop())
         host  = str(self.stack.pop())
 
-        actor_id = _start_mqtt_out_actor(self, host, port, topic)
+        actor_id = _get_or_start_transport_out(self, ('mqtt', host, port, topic),
+                    lambda: _start_mqtt_out_actor(self, host, port, topic))
         self.stack.append(actor_id)
 
     def _actor_wifi_tcp_out(self):
-        """( host port -- actor-id ) Start a TCP OUT transport actor.
+        """( host port -- actor-id ) Start (or reuse) the TCP OUT transport
+        actor for host:port.
 
-        Connects to host:port for each outgoing message (stateless; sufficient
-        for low-frequency IoT use).  Sends a JSON pfforth-actor envelope
-        followed by a newline so the remote side can frame it easily.
+        Keeps one persistent connection to host:port, reconnecting with
+        backoff, and sends JSON pfforth-actor envelopes followed by a
+        newline, several per sendall when messages queue up.
         Each received queue message must be (to_id, value) from actor-send.
         """
         if len(self.stack) < 2:
@@ -1128,14 +2680,46 @@ class ForthActors:
         port = int(self.stack.pop())
         host = str(self.stack.pop())
 
-        actor_id = _start_tcp_out_actor(self, host, port)
+        actor_id = _get_or_start_transport_out(self, ('tcp', host, port),
+                    lambda: _start_tcp_out_actor(self, host, port))
         self.stack.append(actor_id)
 
+    def _transport_stats_word(self):
+        """( -- ) Print the counters of the transport OUT actors (msg/s is
+        the average since the actor started) and of the shared MQTT links."""
+        actors = [(aid, e) for aid, e in sorted(ForthActors._registry.items())
+                  if e.get('stats')]
+        links = _mqttlink.links()
+        if not actors and not links:
+            print("No hay actores de transporte con contadores")
+            return
+        self._flush_output()
+        out = self._forth_output
+        now = time.monotonic()
+        out.write(f"{'ID':>4}  {'Transporte':<28}  {'Mensajes':>9}  {'Bytes':>11}  {'msg/s':>9}"
+                  f"  {'Lotes':>7}  {'Media':>6}  {'Max':>5}  {'Reconex':>7}  {'Errores':>7}\n")
+        out.write("-" * 111 + "\n")
+        for aid, e in actors:
+            st = dict(e['stats'])
+            avg = st['messages'] / st['batches'] if st['batches'] else 0.0
+            rate = st['messages'] / max(now - st['since'], 1e-9)
+            out.write(f"{aid:>4}  {e['name'][:28]:<28}  {st['messages']:>9}  {st['bytes']:>11}"
+                      f"  {rate:>9.0f}  {st['batches']:>7}  {avg:>6.1f}  {st['max_batch']:>5}"
+                      f"  {st['reconnects']:>7}  {st['errors']:>7}\n")
+        for link in links:
+            st = dict(link.stats)
+            state = "conectado" if link.connected else "desconectado"
+            out.write(f"MQTT {link.host}:{link.port}: {state}, {link.refs} actor(es), "
+                      f"en vuelo {link.inflight()}/{_mqttlink.MQTT_INFLIGHT}, "
+                      f"publicados {st['published']}, confirmados {st['acked']}, "
+                      f"reconexiones {st['reconnects']}\n")
+        out.flush()
+
     def _actor_uart_out(self):
         """( device baud -- actor-id ) Start a UART OUT transport actor.
 
-        Writes binary-framed JSON envelopes to the serial port for each
-        message.  Frame: [0xAC][0xE0][len_hi][len_lo][json_bytes…]
+        Writes a framed envelope (JSON or binary, per route) to the serial
+        port for each message.  Frame: [0xAC][0xE0][len_hi][len_lo][envelope…]
         Requires: pyserial
         """
         if len(self.stack) < 2:
@@ -1150,7 +2734,7 @@ class ForthActors:
     def _actor_spi_out(self):
         """( device speed -- actor-id ) Start an SPI OUT transport actor.
 
-        Uses spidev (Linux) to write binary-framed JSON envelopes.
+        Uses spidev (Linux) to write framed envelopes.
         Frame format identical to UART: [0xAC][0xE0][len_hi][len_lo][json…]
         device — spidev bus.device string, e.g. '0.0' for /dev/spidev0.0
         speed  — SPI bus speed in Hz, e.g. 500000
@@ -1171,10 +2755,13 @@ class ForthActors:
         """( host port topic -- actor-id ) Start MQTT listener that delivers
         incoming remote messages to their local actor targets.
 
-        Subscribes to *topic* on the MQTT broker at host:port.
-        Each received MQTT message must be a pfforth-actor JSON envelope:
-          {"proto":"pfforth-actor","v":1,"to":<int>,"from":<int>,"msg":<value>}
-        The message is delivered to the local actor whose id matches "to".
+        Subscribes to *topic* on the MQTT broker at host:port through the
+        broker's shared persistent client (resubscribed on every reconnect).
+        Each received MQTT message must be a pfforth-actor JSON envelope, or
+        a JSON array of them (batched by actor-wifi-out):
+          {"proto":"pfforth-actor","v":2,"to":<int>,"from":<int>,"msg":<value>}
+        or a binary pfforth.codec packet.  Each message is delivered to the
+        local actor whose id matches "to".
         """
         if len(self.stack) < 3:
             print("Error: actor-wifi-in requiere ( host port topic -- )")
@@ -1183,9 +2770,7 @@ class ForthActors:
         port  = int(self.stack.pop())
         host  = str(self.stack.pop())
 
-        try:
-            import paho.mqtt.client as mqtt
-        except ImportError:
+        if not _mqttlink.available():
             print("Error: actor-wifi-in requiere paho-mqtt (pip install paho-mqtt)")
             self.stack.append(0)
             return
@@ -1197,44 +2782,34 @@ class ForthActors:
         stop_evt  = threading.Event()
         in_queue  = queue.Queue()   # internal queue (not used for messaging)
 
-        def on_message(client, userdata, message):
+        def on_payload(data):
             try:
-                payload = json.loads(message.payload.decode('utf-8'))
+                envs = _codec.decode(data)
             except Exception:
                 return
-            if payload.get('proto') != 'pfforth-actor':
-                return
-            to_id   = payload.get('to', 0)
-            from_id = payload.get('from', 0)
-            value   = payload.get('msg')
-            with ForthActors._registry_lock:
-                entry = ForthActors._registry.get(to_id)
-            if entry:
-                entry['queue'].put(_ActorMsg(from_id, value))
-            else:
-                ts = datetime.now().strftime('%H:%M:%S')
-                print(f"[{ts}] actor-wifi-in: actor local {to_id} no encontrado")
+            for to_id in {e.get('to', 0) for e in envs}:
+                if to_id not in ForthActors._registry:
+                    ts = datetime.now().strftime('%H:%M:%S')
+                    print(f"[{ts}] actor-wifi-in: actor local {to_id} no encontrado")
+            _deliver_envelopes(envs)
 
         def wifi_in_body():
-            client = mqtt.Client()
-            client.on_message = on_message
+            link = None
             try:
-                client.connect(host, port, keepalive=60)
-                client.subscribe(topic)
+                link = _mqttlink.get_link(host, port)
+                link.subscribe(topic, on_payload)
                 ts = datetime.now().strftime('%H:%M:%S')
                 print(f"[{ts}] actor-wifi-in ({actor_id}): escuchando {host}:{port}/{topic}")
                 with ForthActors._registry_lock:
                     if actor_id in ForthActors._registry:
                         ForthActors._registry[actor_id]['alive'] = True
-                while not stop_evt.is_set():
-                    client.loop(timeout=0.5)
+                stop_evt.wait()
             except Exception as e:
                 print(f"actor-wifi-in error: {e}")
             finally:
-                try:
-                    client.disconnect()
-                except Exception:
-                    pass
+                if link is not None:
+                    link.unsubscribe(topic)
+                    _mqttlink.release_link(link)
                 with ForthActors._registry_lock:
                     if actor_id in ForthActors._registry:
                         ForthActors._registry[actor_id]['alive'] = False
@@ -1245,7 +2820,7 @@ class ForthActors:
             name=f"actor-wifi-in-{actor_id}",
         )
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         in_queue,
                 'name':          f'wifi-in({topic})',
@@ -1255,7 +2830,7 @@ class ForthActors:
                 'type':          'wifi-in',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
 
         thread.start()
         self.stack.append(actor_id)
@@ -1268,8 +2843,8 @@ class ForthActors:
 
         Reads framed messages from the serial port and delivers them to
         the appropriate local actor.  Frame format:
-          [0xAC] [0xE0] [len_hi] [len_lo] [json_bytes…]
-        JSON must be a pfforth-actor envelope (same as WiFi).
+          [0xAC] [0xE0] [len_hi] [len_lo] [envelope…]
+        The payload is a pfforth-actor envelope, JSON or binary (same as WiFi).
         """
         if len(self.stack) < 2:
             print("Error: actor-uart-in requiere ( device baud -- )")
@@ -1311,38 +2886,12 @@ class ForthActors:
             buf = bytearray()
             try:
                 while not stop_evt.is_set():
-                    chunk = ser.read(64)
+                    # Whatever the port has buffered (at least 1 byte)
+                    chunk = ser.read(ser.in_waiting or 1)
                     if not chunk:
                         continue
                     buf.extend(chunk)
-                    while True:
-                        # Find frame header 0xAC 0xE0
-                        idx = _find_uart_frame_start(buf)
-                        if idx < 0:
-                            buf = buf[-1:] if len(buf) > 1 else bytearray()
-                            break
-                        if idx > 0:
-                            del buf[:idx]
-                        if len(buf) < 4:
-                            break
-                        length = (buf[2] << 8) | buf[3]
-                        if len(buf) < 4 + length:
-                            break
-                        frame = bytes(buf[4: 4 + length])
-                        del buf[:4 + length]
-                        try:
-                            payload = json.loads(frame.decode('utf-8'))
-                        except Exception:
-                            continue
-                        if payload.get('proto') != 'pfforth-actor':
-                            continue
-                        to_id   = payload.get('to', 0)
-                        from_id = payload.get('from', 0)
-                        value   = payload.get('msg')
-                        with ForthActors._registry_lock:
-                            entry = ForthActors._registry.get(to_id)
-                        if entry:
-                            entry['queue'].put(_ActorMsg(from_id, value))
+                    _deliver_envelopes(_take_frames(buf))
             except Exception as e:
                 print(f"actor-uart-in error: {e}")
             finally:
@@ -1360,7 +2909,7 @@ class ForthActors:
             name=f"actor-uart-in-{actor_id}",
         )
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         in_queue,
                 'name':          f'uart-in({device})',
@@ -1370,7 +2919,7 @@ class ForthActors:
                 'type':          'uart-in',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
 
         thread.start()
         self.stack.append(actor_id)
@@ -1434,7 +2983,7 @@ class ForthActors:
             name=f"actor-wifi-tcp-in-{actor_id}",
         )
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         in_queue,
                 'name':          f'tcp-in(:{port})',
@@ -1444,7 +2993,7 @@ class ForthActors:
                 'type':          'tcp-in',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
         thread.start()
         self.stack.append(actor_id)
         print(f"actor-wifi-tcp-in {actor_id} iniciado → TCP :{port}")
@@ -1452,9 +3001,9 @@ class ForthActors:
     def _actor_spi_in(self):
         """( device speed -- actor-id ) Start an SPI IN transport actor.
 
-        Reads binary-framed JSON messages from an spidev device and delivers
-        them to the appropriate local actor.
-        Frame: [0xAC][0xE0][len_hi][len_lo][json_bytes…]
+        Reads framed envelopes (JSON or binary) from an spidev device and
+        delivers them to the appropriate local actor.
+        Frame: [0xAC][0xE0][len_hi][len_lo][envelope…]
         device — spidev bus.device string, e.g. '0.0'
         speed  — bus speed in Hz
         Requires: spidev (Linux only)
@@ -1500,33 +3049,7 @@ class ForthActors:
                         time.sleep(0.01)
                         continue
                     buf.extend(chunk)
-                    while True:
-                        idx = _find_uart_frame_start(buf)
-                        if idx < 0:
-                            buf = buf[-1:] if len(buf) > 1 else bytearray()
-                            break
-                        if idx > 0:
-                            del buf[:idx]
-                        if len(buf) < 4:
-                            break
-                        length = (buf[2] << 8) | buf[3]
-                        if len(buf) < 4 + length:
-                            break
-                        frame = bytes(buf[4: 4 + length])
-                        del buf[:4 + length]
-                        try:
-                            payload = json.loads(frame.decode('utf-8'))
-                        except Exception:
-                            continue
-                        if payload.get('proto') != 'pfforth-actor':
-                            continue
-                        to_id   = payload.get('to', 0)
-                        from_id = payload.get('from', 0)
-                        value   = payload.get('msg')
-                        with ForthActors._registry_lock:
-                            entry = ForthActors._registry.get(to_id)
-                        if entry:
-                            entry['queue'].put(_ActorMsg(from_id, value))
+                    _deliver_envelopes(_take_frames(buf))
             except Exception as e:
                 print(f"actor-spi-in error: {e}")
             finally:
@@ -1544,7 +3067,7 @@ class ForthActors:
             name=f"actor-spi-in-{actor_id}",
         )
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         in_queue,
                 'name':          f'spi-in({device})',
@@ -1554,7 +3077,7 @@ class ForthActors:
                 'type':          'spi-in',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
         thread.start()
         self.stack.append(actor_id)
         print(f"actor-spi-in {actor_id} iniciado → SPI /dev/spidev{device}")
@@ -1607,7 +3130,7 @@ class ForthActors:
             name=f"actor-ntp-{actor_id}",
         )
         with ForthActors._registry_lock:
-            ForthActors._registry[actor_id] = {
+            _registry_put(actor_id, {
                 'thread':        thread,
                 'queue':         ntp_queue,
                 'name':          f'actor-ntp({interval_ms}ms)',
@@ -1617,7 +3140,7 @@ class ForthActors:
                 'type':          'ntp',
                 '_timer_stop':   stop_evt,
                 '_timer_thread': None,
-            }
+            })
 
         thread.start()
         self.stack.append(actor_id)
@@ -1632,64 +3155,90 @@ class ForthActors:
 
 # ── Module-level Phase 3 helpers ─────────────────────────────────────────────
 
-def _make_actor_envelope(to_id, from_id, value):
-    """Build a JSON-serialisable pfforth-actor message envelope."""
-    try:
-        json.dumps(value)
-        safe_value = value
-    except (TypeError, ValueError):
-        safe_value = str(value)
-    return {
-        'proto': 'pfforth-actor',
-        'v':     1,
-        'to':    to_id,
-        'from':  from_id,
-        'msg':   safe_value,
-    }
+def _route_codec(to_id):
+    """Encoding negotiated for the route to *to_id* (codec.V_JSON unless
+    the peer has shown it speaks v2, or ruta-v! fixed it)."""
+    route = ForthActors._route_table.get(to_id)
+    return route.get('v', _codec.V_JSON) if route else _codec.V_JSON
+
+
+def _encode_msgs(msgs, json_items, binary_items):
+    """Encode each routed _ActorMsg(sender, (to_id, value)) once, in its
+    route's encoding, appending to json_items / binary_items.  Returns
+    True if the kill sentinel was among msgs (later messages are left)."""
+    for msg in msgs:
+        if msg is _KILL_SENTINEL:
+            return True
+        if not isinstance(msg, _ActorMsg) or not isinstance(msg.value, tuple):
+            continue
+        to_id, value = msg.value
+        if _route_codec(to_id) >= _codec.V_BINARY:
+            try:
+                binary_items.append(_codec.binary_item(to_id, msg.sender_id, value))
+                continue
+            except (ValueError, OverflowError):
+                pass                      # ids negativos: JSON
+        json_items.append(_codec.json_item(to_id, msg.sender_id, value))
+    return False
 
 
 def _make_transport_frame(to_id, from_id, value):
-    """Return a binary-framed JSON envelope for UART/SPI transport."""
-    env     = _make_actor_envelope(to_id, from_id, value)
-    payload = json.dumps(env, separators=(',', ':')).encode('utf-8')
+    """Return a framed envelope (JSON or binary, per route) for UART/SPI."""
+    json_items, binary_items = [], []
+    _encode_msgs([_ActorMsg(from_id, (to_id, value))], json_items, binary_items)
+    payload = _codec.binary_packet(binary_items) if binary_items else json_items[0]
     length  = len(payload)
     return bytes([0xAC, 0xE0, (length >> 8) & 0xFF, length & 0xFF]) + payload
 
 
 def _find_uart_frame_start(buf):
     """Return index of 0xAC 0xE0 header in *buf*, or -1 if not found."""
-    for i in range(len(buf) - 1):
-        if buf[i] == 0xAC and buf[i + 1] == 0xE0:
-            return i
-    return -1
+    return buf.find(b'\xAC\xE0')
+
+
+def _take_frames(buf):
+    """Remove every complete UART/SPI frame from the bytearray *buf* and
+    return their decoded envelopes; a partial frame stays in buf."""
+    payloads = []
+    while True:
+        idx = _find_uart_frame_start(buf)
+        if idx < 0:
+            # keep a trailing 0xAC: it may be the first half of a header
+            del buf[:-1 if buf[-1:] == b'\xAC' else len(buf)]
+            return payloads
+        if idx > 0:
+            del buf[:idx]
+        if len(buf) < 4:
+            return payloads
+        length = (buf[2] << 8) | buf[3]
+        if len(buf) < 4 + length:
+            return payloads
+        frame = bytes(buf[4: 4 + length])
+        del buf[:4 + length]
+        try:
+            payloads.extend(_codec.decode(frame))
+        except Exception:
+            continue
+
+
+TCP_IN_IDLE = 30.0          # s: an IN connection idle this long is closed
 
 
 def _handle_tcp_in_conn(conn):
     """Handle a single incoming TCP connection: read newline-delimited JSON
-    and deliver pfforth-actor envelopes to local actors."""
+    and binary packets and deliver pfforth-actor envelopes to local actors."""
     try:
-        buf = b''
-        conn.settimeout(30)
+        buf = bytearray()
+        conn.settimeout(TCP_IN_IDLE)
         while True:
-            chunk = conn.recv(4096)
+            chunk = conn.recv(65536)
             if not chunk:
                 break
             buf += chunk
-            while b'\n' in buf:
-                line, buf = buf.split(b'\n', 1)
-                try:
-                    payload = json.loads(line.decode('utf-8'))
-                except Exception:
-                    continue
-                if payload.get('proto') != 'pfforth-actor':
-                    continue
-                to_id   = payload.get('to', 0)
-                from_id = payload.get('from', 0)
-                value   = payload.get('msg')
-                with ForthActors._registry_lock:
-                    entry = ForthActors._registry.get(to_id)
-                if entry:
-                    entry['queue'].put(_ActorMsg(from_id, value))
+            # Every complete message of this chunk goes out in one batch
+            payloads = _codec.take_stream(buf)
+            if payloads:
+                _deliver_envelopes(payloads)
     except Exception:
         pass
     finally:
@@ -1712,27 +3261,34 @@ def _get_or_start_transport_out(forth_instance, key, start_fn):
         ta_id = _transport_actor_cache.get(key)
 
     if ta_id is not None:
-        with ForthActors._registry_lock:
-            entry = ForthActors._registry.get(ta_id)
+        entry = ForthActors._registry.get(ta_id)
         if entry and entry.get('alive'):
             return ta_id
 
     # Start a fresh transport actor
     ta_id = start_fn()
-    with _transport_cache_lock:
-        _transport_actor_cache[key] = ta_id
+    if ta_id:
+        with _transport_cache_lock:
+            _transport_actor_cache[key] = ta_id
     return ta_id
 
 
+# MQTT OUT: publishes through the broker's shared MqttLink (persistent client,
+# QoS 1 pipelined up to MQTT_INFLIGHT unacknowledged).  While the window is
+# full the actor queue grows; once MQTT_BATCH_MIN or more messages are waiting
+# they go out as one JSON array of envelopes, or one binary packet for v2
+# routes (actor-wifi-in accepts all of them).
+MQTT_BATCH_MIN = 4
+MQTT_BATCH_MAX = 256
+
+
 def _start_mqtt_out_actor(forth_instance, host, port, topic):
     """Start an MQTT OUT transport actor; return its actor_id.
 
     The actor receives _ActorMsg(sender_id, (to_id, value)) from the routing
-    layer and publishes a JSON pfforth-actor envelope to *topic* via MQTT.
+    layer and publishes JSON pfforth-actor envelopes to *topic* via MQTT.
     """
-    try:
-        import paho.mqtt.client as mqtt  # noqa: F401
-    except ImportError:
+    if not _mqttlink.available():
         print("Error: actor-wifi-out requiere paho-mqtt (pip install paho-mqtt)")
         return 0
 
@@ -1740,66 +3296,155 @@ def _start_mqtt_out_actor(forth_instance, host, port, topic):
         actor_id = ForthActors._next_id
         ForthActors._next_id += 1
 
-    ta_queue  = queue.Queue()
+    ta_queue  = _ActorQueue()
     stop_evt  = threading.Event()
+    stats     = _transport_stats()
+
+    def publish(link, payload, count):
+        if not link.publish(topic, payload, stop_evt):
+            stats['errors'] += 1
+            return
+        stats['messages'] += count
+        stats['bytes']    += len(payload)
+        stats['batches']  += 1
+        stats['max_batch'] = max(stats['max_batch'], count)
 
     def body():
-        with ForthActors._registry_lock:
-            if actor_id in ForthActors._registry:
-                ForthActors._registry[actor_id]['alive'] = True
+        link = _mqttlink.get_link(host, port)
+        link.watch(stats)
         ts = datetime.now().strftime('%H:%M:%S')
         print(f"[{ts}] actor-wifi-out ({actor_id}): "
               f"MQTT {host}:{port}/{topic} listo")
-        while True:
-            msg = ta_queue.get(block=True)
-            if msg is _KILL_SENTINEL:
-                break
-            if not isinstance(msg, _ActorMsg) or not isinstance(msg.value, tuple):
-                continue
-            to_id, value = msg.value
-            sender_id    = msg.sender_id
-            env     = _make_actor_envelope(to_id, sender_id, value)
-            payload = json.dumps(env, separators=(',', ':')).encode('utf-8')
-            try:
-                import paho.mqtt.client as mqtt
-                client = mqtt.Client()
-                client.connect(host, port, keepalive=10)
-                client.publish(topic, payload, qos=1)
-                client.disconnect()
-            except Exception as e:
-                ts2 = datetime.now().strftime('%H:%M:%S')
-                print(f"[{ts2}] actor-wifi-out error: {e}")
-        with ForthActors._registry_lock:
-            if actor_id in ForthActors._registry:
-                ForthActors._registry[actor_id]['alive'] = False
+        try:
+            while True:
+                json_items, binary_items = [], []
+                killed = _encode_msgs(ta_queue.get_batch(MQTT_BATCH_MAX),
+                                      json_items, binary_items)
+                try:
+                    for items, packet in ((json_items, _codec.json_packet),
+                                          (binary_items, _codec.binary_packet)):
+                        if len(items) >= MQTT_BATCH_MIN:
+                            publish(link, packet(items), len(items))
+                        else:
+                            for item in items:
+                                publish(link, packet([item]), 1)
+                except Exception as e:
+                    stats['errors'] += 1
+                    ts2 = datetime.now().strftime('%H:%M:%S')
+                    print(f"[{ts2}] actor-wifi-out error: {e}")
+                if killed:
+                    break
+        finally:
+            link.unwatch(stats)
+            _mqttlink.release_link(link)
+            with ForthActors._registry_lock:
+                if actor_id in ForthActors._registry:
+                    ForthActors._registry[actor_id]['alive'] = False
 
     thread = threading.Thread(target=body, daemon=True,
                                name=f"actor-wifi-out-{actor_id}")
     with ForthActors._registry_lock:
-        ForthActors._registry[actor_id] = {
+        _registry_put(actor_id, {
             'thread':        thread,
             'queue':         ta_queue,
             'name':          f'wifi-out({host}:{port}/{topic})',
             'forth':         None,
-            'alive':         False,
+            'alive':         True,    # el cliente conecta (y reconecta) solo
             'pending':       False,
             'type':          'wifi-out',
+            'stats':         stats,
             '_timer_stop':   stop_evt,
             '_timer_thread': None,
-        }
+        })
     thread.start()
     print(f"actor-wifi-out {actor_id} iniciado → MQTT {host}:{port}/{topic}")
     return actor_id
 
 
+# TCP OUT: one persistent connection per destination.  Messages queued while
+# the previous sendall was running go out together in the next one; a lone
+# message waits at most TCP_OUT_LINGER for company (latency bound).  On error
+# the connection is reopened with exponential backoff and the batch resent.
+# A send into a connection the peer already closed still "succeeds" locally
+# and is lost, so before each batch the connection is dropped if it has been
+# idle for TCP_OUT_IDLE (the IN side closes after TCP_IN_IDLE) or if the peer
+# has closed it.
+TCP_OUT_LINGER      = 0.001      # s
+TCP_OUT_BATCH_BYTES = 64 * 1024
+TCP_OUT_BATCH_MSGS  = 1024
+TCP_OUT_BACKOFF     = (0.1, 5.0)  # s: first retry, maximum
+TCP_OUT_IDLE        = 20.0       # s: < TCP_IN_IDLE
+
+
+def _peer_closed(conn):
+    """True if the other end closed (or reset) conn.  The IN side never
+    writes, so anything readable is a FIN or an error."""
+    try:
+        readable, _, _ = select.select([conn], [], [], 0)
+        if not readable:
+            return False
+        return conn.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
+
+def _transport_stats():
+    return {'messages': 0, 'bytes': 0, 'batches': 0, 'max_batch': 0,
+            'reconnects': 0, 'errors': 0, 'since': time.monotonic()}
+
+
 def _start_tcp_out_actor(forth_instance, host, port):
     """Start a TCP OUT transport actor; return its actor_id."""
     with ForthActors._registry_lock:
         actor_id = ForthActors._next_id
         ForthActors._next_id += 1
 
-    ta_queue = queue.Queue()
+    ta_queue = _ActorQueue()
     stop_evt = threading.Event()
+    stats    = _transport_stats()
+
+    def next_batch():
+        """Block for the first message, then coalesce; None on kill.
+        Returns (bytes to send, message count)."""
+        lines, packets = [], []
+        size = 0
+        deadline = None
+        while size < TCP_OUT_BATCH_BYTES \
+                and len(lines) + len(packets) < TCP_OUT_BATCH_MSGS:
+            if deadline is None:
+                msgs = ta_queue.get_batch(TCP_OUT_BATCH_MSGS)
+                deadline = time.monotonic() + TCP_OUT_LINGER
+            else:
+                msgs = ta_queue.get_batch(TCP_OUT_BATCH_MSGS,
+                                          deadline - time.monotonic())
+                if not msgs:
+                    break
+            n_lines, n_packets = len(lines), len(packets)
+            if _encode_msgs(msgs, lines, packets):
+                return None
+            size += sum(len(x) for x in lines[n_lines:]) \
+                  + sum(len(x) for x in packets[n_packets:])
+        count = len(lines) + len(packets)
+        data = b''.join(line + b'\n' for line in lines)
+        if packets:
+            data += _codec.binary_packet(packets)
+        return data, count
+
+    def connect():
+        delay = TCP_OUT_BACKOFF[0]
+        while not stop_evt.is_set():
+            try:
+                conn = socket.create_connection((host, port), timeout=5)
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return conn
+            except OSError as e:
+                stats['errors'] += 1
+                ts = datetime.now().strftime('%H:%M:%S')
+                print(f"[{ts}] actor-wifi-tcp-out {host}:{port}: {e} "
+                      f"(reintento en {delay:.1f}s)")
+                stop_evt.wait(delay)
+                delay = min(delay * 2, TCP_OUT_BACKOFF[1])
+        return None
 
     def body():
         with ForthActors._registry_lock:
@@ -1807,41 +3452,63 @@ def _start_tcp_out_actor(forth_instance, host, port):
                 ForthActors._registry[actor_id]['alive'] = True
         ts = datetime.now().strftime('%H:%M:%S')
         print(f"[{ts}] actor-wifi-tcp-out ({actor_id}): TCP {host}:{port} listo")
-        while True:
-            msg = ta_queue.get(block=True)
-            if msg is _KILL_SENTINEL:
-                break
-            if not isinstance(msg, _ActorMsg) or not isinstance(msg.value, tuple):
-                continue
-            to_id, value = msg.value
-            sender_id    = msg.sender_id
-            env     = _make_actor_envelope(to_id, sender_id, value)
-            line    = (json.dumps(env, separators=(',', ':')) + '\n').encode('utf-8')
-            try:
-                s = socket.create_connection((host, port), timeout=5)
-                s.sendall(line)
-                s.close()
-            except Exception as e:
-                ts2 = datetime.now().strftime('%H:%M:%S')
-                print(f"[{ts2}] actor-wifi-tcp-out error: {e}")
-        with ForthActors._registry_lock:
-            if actor_id in ForthActors._registry:
-                ForthActors._registry[actor_id]['alive'] = False
+        conn = None
+        last_send = 0.0
+        try:
+            while True:
+                batch = next_batch()
+                if batch is None:
+                    break
+                data, count = batch
+                if not count:
+                    continue
+                if conn is not None and (time.monotonic() - last_send > TCP_OUT_IDLE
+                                         or _peer_closed(conn)):
+                    conn.close()
+                    conn = None
+                while True:
+                    if conn is None:
+                        conn = connect()
+                        if conn is None:
+                            return
+                        if stats['batches']:
+                            stats['reconnects'] += 1
+                    try:
+                        conn.sendall(data)
+                        break
+                    except OSError as e:
+                        stats['errors'] += 1
+                        ts2 = datetime.now().strftime('%H:%M:%S')
+                        print(f"[{ts2}] actor-wifi-tcp-out error: {e}")
+                        conn.close()
+                        conn = None
+                last_send = time.monotonic()
+                stats['messages'] += count
+                stats['bytes']    += len(data)
+                stats['batches']  += 1
+                stats['max_batch'] = max(stats['max_batch'], count)
+        finally:
+            if conn is not None:
+                conn.close()
+            with ForthActors._registry_lock:
+                if actor_id in ForthActors._registry:
+                    ForthActors._registry[actor_id]['alive'] = False
 
     thread = threading.Thread(target=body, daemon=True,
                                name=f"actor-wifi-tcp-out-{actor_id}")
     with ForthActors._registry_lock:
-        ForthActors._registry[actor_id] = {
+        _registry_put(actor_id, {
             'thread':        thread,
             'queue':         ta_queue,
             'name':          f'tcp-out({host}:{port})',
             'forth':         None,
-            'alive':         False,
+            'alive':         True,   # conexión perezosa: ya acepta mensajes
             'pending':       False,
             'type':          'tcp-out',
+            'stats':         stats,
             '_timer_stop':   stop_evt,
             '_timer_thread': None,
-        }
+        })
     thread.start()
     print(f"actor-wifi-tcp-out {actor_id} iniciado → TCP {host}:{port}")
     return actor_id
@@ -1862,7 +3529,7 @@ def _start_uart_out_actor(forth_instance, device, baud):
         actor_id = ForthActors._next_id
         ForthActors._next_id += 1
 
-    ta_queue = queue.Queue()
+    ta_queue = _ActorQueue()
     stop_evt = threading.Event()
 
     def body():
@@ -1907,7 +3574,7 @@ def _start_uart_out_actor(forth_instance, device, baud):
     thread = threading.Thread(target=body, daemon=True,
                                name=f"actor-uart-out-{actor_id}")
     with ForthActors._registry_lock:
-        ForthActors._registry[actor_id] = {
+        _registry_put(actor_id, {
             'thread':        thread,
             'queue':         ta_queue,
             'name':          f'uart-out({device}@{baud})',
@@ -1917,7 +3584,7 @@ def _start_uart_out_actor(forth_instance, device, baud):
             'type':          'uart-out',
             '_timer_stop':   stop_evt,
             '_timer_thread': None,
-        }
+        })
     thread.start()
     print(f"actor-uart-out {actor_id} iniciado → {device}@{baud}")
     return actor_id
@@ -1926,7 +3593,7 @@ def _start_uart_out_actor(forth_instance, device, baud):
 def _start_spi_out_actor(forth_instance, device, speed):
     """Start an SPI OUT transport actor; return its actor_id.
 
-    Requires spidev (Linux).  Writes binary-framed JSON envelopes.
+    Requires spidev (Linux).  Writes framed envelopes.
     device — bus.device string, e.g. '0.0'
     """
     try:
@@ -1939,7 +3606,7 @@ def _start_spi_out_actor(forth_instance, device, speed):
         actor_id = ForthActors._next_id
         ForthActors._next_id += 1
 
-    ta_queue = queue.Queue()
+    ta_queue = _ActorQueue()
     stop_evt = threading.Event()
 
     def body():
@@ -1989,7 +3656,7 @@ def _start_spi_out_actor(forth_instance, device, speed):
     thread = threading.Thread(target=body, daemon=True,
                                name=f"actor-spi-out-{actor_id}")
     with ForthActors._registry_lock:
-        ForthActors._registry[actor_id] = {
+        _registry_put(actor_id, {
             'thread':        thread,
             'queue':         ta_queue,
             'name':          f'spi-out({device}@{speed}Hz)',
@@ -1999,7 +3666,7 @@ def _start_spi_out_actor(forth_instance, device, speed):
             'type':          'spi-out',
             '_timer_stop':   stop_evt,
             '_timer_thread': None,
-        }
+        })
     thread.start()
     print(f"actor-spi-out {actor_id} iniciado → SPI /dev/spidev{device}@{speed}Hz")
     return actor_id
@@ -2055,8 +3722,7 @@ def _send_to_log(from_id, text, level='info'):
     log_id = getattr(ForthActors, '_log_actor_id', None)
     if log_id is None:
         return
-    with ForthActors._registry_lock:
-        entry = ForthActors._registry.get(log_id)
+    entry = ForthActors._registry.get(log_id)
     if entry and entry.get('alive'):
         payload = {'level': level, 'msg': text, 'from': from_id}
         entry['queue'].put(_ActorMsg(from_id, payload))
@@ -6,6 +6,58 @@ import math
 import sys
 
 
+# Efecto de pila de las primitivas para el modo trusted:
+# nombre -> (entradas, salidas, variante sin comprobación o None)
+TRUSTED_ARITHMETIC_EFFECTS = {
+    '+':      (2, 1, '_plus_unchecked'),
+    '-':      (2, 1, '_minus_unchecked'),
+    '*':      (2, 1, '_mult_unchecked'),
+    '/':      (2, 1, None),
+    'mod':    (2, 1, None),
+    '/mod':   (2, 2, None),
+    '**':     (2, 1, '_power_unchecked'),
+    '1+':     (1, 1, '_one_plus_unchecked'),
+    '1-':     (1, 1, '_one_minus_unchecked'),
+    '2*':     (1, 1, '_two_mult_unchecked'),
+    '2/':     (1, 1, '_two_div_unchecked'),
+    '0=':     (1, 1, '_zero_equal_unchecked'),
+    '0<':     (1, 1, '_zero_less_unchecked'),
+    '0>':     (1, 1, '_zero_greater_unchecked'),
+    '=':      (2, 1, '_equal_unchecked'),
+    '<>':     (2, 1, '_not_equal_unchecked'),
+    '<':      (2, 1, '_less_unchecked'),
+    '>':      (2, 1, '_greater_unchecked'),
+    '<=':     (2, 1, '_less_equal_unchecked'),
+    '>=':     (2, 1, '_greater_equal_unchecked'),
+    'and':    (2, 1, '_and_unchecked'),
+    'or':     (2, 1, '_or_unchecked'),
+    'xor':    (2, 1, '_xor_unchecked'),
+    'not':    (1, 1, '_zero_equal_unchecked'),
+    'invert': (1, 1, '_invert_unchecked'),
+    'lshift': (2, 1, '_lshift_unchecked'),
+    'rshift': (2, 1, '_rshift_unchecked'),
+    'abs':    (1, 1, '_abs_unchecked'),
+    'negate': (1, 1, '_negate_unchecked'),
+    'min':    (2, 1, '_min_unchecked'),
+    'max':    (2, 1, '_max_unchecked'),
+    'sin':    (1, 1, None),
+    'cos':    (1, 1, None),
+    'tan':    (1, 1, None),
+    'asin':   (1, 1, None),
+    'acos':   (1, 1, None),
+    'atan':   (1, 1, None),
+    'sqrt':   (1, 1, None),
+    'log':    (1, 1, None),
+    'ln':     (1, 1, None),
+    'exp':    (1, 1, None),
+    'floor':  (1, 1, None),
+    'ceil':   (1, 1, None),
+    'round':  (1, 1, None),
+    'pi':     (0, 1, None),
+    'e':      (0, 1, None),
+}
+
+
 class ForthArithmetic:
     """Mixin providing arithmetic operations"""
     
@@ -106,6 +158,7 @@ class ForthArithmetic:
                 else:
                     self.stack.append(a / b)
             else:
+                self._flush_output()
                 print("Error: division by zero")
                 self.stack.extend([a, b])
     
@@ -119,6 +172,7 @@ class ForthArithmetic:
                 self.stack.append(resto)
                 self.stack.append(cociente)
             else:
+                self._flush_output()
                 print("Error: division by zero")
                 self.stack.extend([dividendo, divisor])
     
@@ -129,6 +183,7 @@ class ForthArithmetic:
             if b != 0:
                 self.stack.append(a % b)
             else:
+                self._flush_output()
                 print("Error: division by zero")
                 self.stack.extend([a, b])
     
@@ -240,6 +295,138 @@ class ForthArithmetic:
         if len(self.stack) >= 2:
             self.stack.append(max(self.stack.pop(), self.stack.pop()))
     
+    # -- Variantes sin comprobación de profundidad (modo trusted) --------
+    # Solo se llaman desde definiciones cuyo efecto de pila se ha verificado
+    # al compilar y cuya profundidad se ha comprobado al entrar en la palabra.
+    # Mismo resultado y orden de operandos que las comprobadas: nunca
+    # asignación aumentada (+=, *=...), que modificaría en su sitio listas
+    # o arrays que el programa tiene en otra parte.
+    
+    def _plus_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = b + s[-1]
+    
+    def _minus_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = s[-1] - b
+    
+    def _mult_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = b * s[-1]
+    
+    def _power_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = s[-1] ** b
+    
+    def _one_plus_unchecked(self):
+        s = self.stack
+        s[-1] = s[-1] + 1
+    
+    def _one_minus_unchecked(self):
+        s = self.stack
+        s[-1] = s[-1] - 1
+    
+    def _two_mult_unchecked(self):
+        s = self.stack
+        s[-1] = s[-1] * 2
+    
+    def _two_div_unchecked(self):
+        s = self.stack
+        s[-1] = s[-1] / 2
+    
+    def _zero_equal_unchecked(self):
+        s = self.stack
+        s[-1] = -1 if s[-1] == 0 else 0
+    
+    def _zero_less_unchecked(self):
+        s = self.stack
+        s[-1] = -1 if s[-1] < 0 else 0
+    
+    def _zero_greater_unchecked(self):
+        s = self.stack
+        s[-1] = -1 if s[-1] > 0 else 0
+    
+    def _equal_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if b == s[-1] else 0
+    
+    def _not_equal_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if b != s[-1] else 0
+    
+    def _less_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if s[-1] < b else 0
+    
+    def _greater_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if s[-1] > b else 0
+    
+    def _less_equal_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if s[-1] <= b else 0
+    
+    def _greater_equal_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = -1 if s[-1] >= b else 0
+    
+    def _and_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = b & s[-1]
+    
+    def _or_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = b | s[-1]
+    
+    def _xor_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = b ^ s[-1]
+    
+    def _invert_unchecked(self):
+        s = self.stack
+        s[-1] = ~int(s[-1])
+    
+    def _lshift_unchecked(self):
+        s = self.stack
+        n = int(s.pop())
+        s[-1] = int(s[-1]) << n
+    
+    def _rshift_unchecked(self):
+        s = self.stack
+        n = int(s.pop())
+        s[-1] = int(s[-1]) >> n
+    
+    def _abs_unchecked(self):
+        s = self.stack
+        s[-1] = abs(s[-1])
+    
+    def _negate_unchecked(self):
+        s = self.stack
+        s[-1] = -s[-1]
+    
+    def _min_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = min(b, s[-1])
+    
+    def _max_unchecked(self):
+        s = self.stack
+        b = s.pop()
+        s[-1] = max(b, s[-1])
+    
     def _clean_trig(self, value):
         """Clean up floating point errors for trig functions"""
         if abs(value) < 1e-14:
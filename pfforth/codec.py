@@ -0,0 +1,321 @@
+"""
+PFForth codec - pfforth-actor envelopes for the transports: JSON text (v1) or compact binary (v2)
+"""
+
+import json
+import struct
+import sys
+
+
+PROTO = 'pfforth-actor'
+PROTO_VERSION = 2           # 'v' de los sobres que enviamos: entendemos binario
+V_JSON, V_BINARY = 1, 2     # 'v' de una ruta: cómo se codifica hacia ese actor
+
+MAGIC = 0xA5                # nunca es el primer byte de un texto JSON (UTF-8)
+
+# Paquete binario:  A5 <versión> <varint len> <cuerpo>
+#   cuerpo = <varint n> n × (<varint to> <varint from> <valor>)
+# Valor = etiqueta de un byte + datos
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_BYTES, T_LIST, T_DICT, T_ARRAY, \
+    T_INTS = range(11)
+
+_F64 = struct.Struct('<d')
+
+# T_INTS: lista de enteros empaquetada (struct, sin etiqueta por elemento)
+#   <código struct b/h/i/q> <varint n> n × entero little-endian
+PACK_MIN = 8                # listas más cortas van elemento a elemento
+_INT_CODES = ((b'b', 1 << 7), (b'h', 1 << 15), (b'i', 1 << 31), (b'q', 1 << 63))
+
+
+# ── varints ──────────────────────────────────────────────────────────────────
+
+def _put_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, pos):
+    b = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+    n, shift = b & 0x7F, 7
+    while True:
+        pos += 1
+        b = buf[pos]
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos + 1
+        shift += 7
+
+
+# ── valores ──────────────────────────────────────────────────────────────────
+
+def encode_value(out, value):
+    """Añade value (etiquetado) al bytearray out"""
+    t = type(value)
+    if t is int:
+        out.append(T_INT)
+        _put_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif t is float:
+        out.append(T_FLOAT)
+        out += _F64.pack(value)
+    elif t is str:
+        data = value.encode('utf-8')
+        out.append(T_STR)
+        _put_varint(out, len(data))
+        out += data
+    elif value is None:
+        out.append(T_NONE)
+    elif t is bool:
+        out.append(T_TRUE if value else T_FALSE)
+    elif (t is list or t is tuple) and len(value) >= PACK_MIN \
+            and all(type(x) is int for x in value) \
+            and _pack_ints(out, value):
+        pass
+    elif t is list or t is tuple:
+        out.append(T_LIST)
+        _put_varint(out, len(value))
+        append = out.append
+        for item in value:
+            if type(item) is int:           # camino rápido: listas de enteros
+                z = (item << 1) if item >= 0 else ((-item << 1) - 1)
+                append(T_INT)
+                if z < 0x80:
+                    append(z)
+                else:
+                    _put_varint(out, z)
+            else:
+                encode_value(out, item)
+    elif t is dict:
+        out.append(T_DICT)
+        _put_varint(out, len(value))
+        for k, v in value.items():
+            encode_value(out, str(k))
+            encode_value(out, v)
+    elif t is bytes or t is bytearray:
+        out.append(T_BYTES)
+        _put_varint(out, len(value))
+        out += value
+    elif isinstance(value, int):            # bool ya tratado; enteros derivados
+        encode_value(out, int(value))
+    elif isinstance(value, float):
+        encode_value(out, float(value))
+    else:
+        np = sys.modules.get('numpy')
+        if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            dt = value.dtype.str.encode('ascii')
+            out.append(T_ARRAY)
+            _put_varint(out, len(dt))
+            out += dt
+            _put_varint(out, value.ndim)
+            for n in value.shape:
+                _put_varint(out, n)
+            out += np.ascontiguousarray(value).tobytes()
+        elif np is not None and isinstance(value, np.generic):
+            encode_value(out, value.item())
+        else:
+            encode_value(out, str(value))   # como el JSON: texto legible
+
+
+def _pack_ints(out, value):
+    """Añade value (solo ints) como T_INTS con el ancho mínimo; False si
+    no cabe en 64 bits"""
+    lo, hi = min(value), max(value)
+    for code, limit in _INT_CODES:
+        if -limit <= lo and hi < limit:
+            n = len(value)
+            out.append(T_INTS)
+            out += code
+            _put_varint(out, n)
+            out += struct.pack(f'<{n}{code.decode()}', *value)
+            return True
+    return False
+
+
+def decode_value(buf, pos):
+    """(valor, posición siguiente) del valor etiquetado en buf[pos]"""
+    tag = buf[pos]
+    pos += 1
+    if tag == T_INT:
+        z, pos = _get_varint(buf, pos)
+        return (z >> 1) if not z & 1 else -((z + 1) >> 1), pos
+    if tag == T_STR:
+        n, pos = _get_varint(buf, pos)
+        return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+    if tag == T_FLOAT:
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag == T_LIST:
+        n, pos = _get_varint(buf, pos)
+        items = []
+        append = items.append
+        for _ in range(n):
+            if buf[pos] == T_INT and buf[pos + 1] < 0x80:   # entero pequeño
+                z = buf[pos + 1]
+                append((z >> 1) if not z & 1 else -((z + 1) >> 1))
+                pos += 2
+            else:
+                item, pos = decode_value(buf, pos)
+                append(item)
+        return items, pos
+    if tag == T_INTS:
+        code = chr(buf[pos])
+        n, pos = _get_varint(buf, pos + 1)
+        fmt = struct.Struct(f'<{n}{code}')
+        return list(fmt.unpack_from(buf, pos)), pos + fmt.size
+    if tag == T_NONE:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_DICT:
+        n, pos = _get_varint(buf, pos)
+        d = {}
+        for _ in range(n):
+            k, pos = decode_value(buf, pos)
+            d[k], pos = decode_value(buf, pos)
+        return d, pos
+    if tag == T_BYTES:
+        n, pos = _get_varint(buf, pos)
+        return bytes(buf[pos:pos + n]), pos + n
+    if tag == T_ARRAY:
+        import numpy as np
+        n, pos = _get_varint(buf, pos)
+        dtype = np.dtype(bytes(buf[pos:pos + n]).decode('ascii'))
+        pos += n
+        ndim, pos = _get_varint(buf, pos)
+        shape = []
+        for _ in range(ndim):
+            d, pos = _get_varint(buf, pos)
+            shape.append(d)
+        count = 1
+        for d in shape:
+            count *= d
+        arr = np.frombuffer(buf, dtype, count, pos).reshape(shape).copy()
+        return arr, pos + count * dtype.itemsize
+    raise ValueError(f"codec: etiqueta desconocida {tag}")
+
+
+# ── sobres ───────────────────────────────────────────────────────────────────
+
+def binary_item(to_id, from_id, value):
+    """Un sobre binario (sin cabecera de paquete): to, from, valor"""
+    out = bytearray()
+    _put_varint(out, to_id)
+    _put_varint(out, from_id)
+    encode_value(out, value)
+    return out
+
+
+def binary_packet(items):
+    """Paquete binario con los sobres ya codificados de items"""
+    body = bytearray()
+    _put_varint(body, len(items))
+    for item in items:
+        body += item
+    out = bytearray((MAGIC, PROTO_VERSION))
+    _put_varint(out, len(body))
+    out += body
+    return bytes(out)
+
+
+def json_item(to_id, from_id, value):
+    """Un sobre JSON en bytes.  Lo que JSON no sabe representar viaja como
+    texto (str)."""
+    env = {'proto': PROTO, 'v': PROTO_VERSION, 'to': to_id, 'from': from_id,
+           'msg': value}
+    try:
+        text = json.dumps(env, separators=(',', ':'), default=str)
+    except ValueError:                         # referencias circulares
+        env['msg'] = str(value)
+        text = json.dumps(env, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def json_packet(items):
+    """Un sobre JSON tal cual, o varios como array"""
+    if len(items) == 1:
+        return items[0]
+    return b'[' + b','.join(items) + b']'
+
+
+def encode(to_id, from_id, value, v=V_JSON):
+    """Un mensaje como paquete completo en la codificación v de su ruta"""
+    if v >= V_BINARY:
+        return binary_packet([binary_item(to_id, from_id, value)])
+    return json_item(to_id, from_id, value)
+
+
+def _decode_body(buf, pos, end, version):
+    n, pos = _get_varint(buf, pos)
+    envs = []
+    for _ in range(n):
+        to_id, pos = _get_varint(buf, pos)
+        from_id, pos = _get_varint(buf, pos)
+        value, pos = decode_value(buf, pos)
+        envs.append({'proto': PROTO, 'v': version, 'to': to_id,
+                     'from': from_id, 'msg': value})
+    if pos != end:
+        raise ValueError("codec: longitud de paquete incorrecta")
+    return envs
+
+
+def packet_extent(buf, pos=0):
+    """(inicio del cuerpo, fin) del paquete binario en buf[pos], o None si
+    aún no está completo"""
+    if len(buf) - pos < 3:
+        return None
+    try:
+        n, body = _get_varint(buf, pos + 2)
+    except IndexError:
+        return None
+    end = body + n
+    return (body, end) if len(buf) >= end else None
+
+
+def decode(data):
+    """Lista de sobres (dicts como los JSON) de un paquete binario, un
+    sobre JSON o un array JSON de sobres.  Lo que no sea pfforth-actor se
+    descarta."""
+    if data[:1] == b'\xA5':
+        ext = packet_extent(data)
+        if ext is None:
+            raise ValueError("codec: paquete binario incompleto")
+        return _decode_body(data, ext[0], ext[1], data[1])
+    payload = json.loads(data)
+    envs = payload if isinstance(payload, list) else [payload]
+    return [e for e in envs if isinstance(e, dict) and e.get('proto') == PROTO]
+
+
+def take_stream(buf):
+    """Saca del bytearray buf todos los mensajes completos de un flujo TCP
+    (líneas JSON y paquetes binarios mezclados) y devuelve sus sobres; lo
+    incompleto se queda en buf.  Los mensajes ilegibles se saltan."""
+    envs = []
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        if buf[pos] == MAGIC:
+            ext = packet_extent(buf, pos)
+            if ext is None:
+                break
+            try:
+                envs.extend(_decode_body(buf, ext[0], ext[1], buf[pos + 1]))
+            except (ValueError, IndexError, UnicodeDecodeError, struct.error):
+                pass
+            pos = ext[1]
+        else:
+            nl = buf.find(b'\n', pos)
+            if nl < 0:
+                break
+            line = bytes(buf[pos:nl])
+            pos = nl + 1
+            if line.strip():
+                try:
+                    envs.extend(decode(line))
+                except ValueError:
+                    pass
+    del buf[:pos]
+    return envs
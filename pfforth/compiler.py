@@ -54,10 +54,12 @@ class ForthCompiler:
         return self
     
     def _list_immediate_words(self):
+        self._flush_output()
         print("Palabras inmediatas:", list(self.immediate_words.keys()))
         return self
     
     def _list_words(self):
+        self._flush_output()
         system_words = sorted([w for w in self.words.keys() 
                                if not w.startswith('_') and self._is_system_word(w)])
         user_words = [name for (_, name) in self._definition_order if name in self.words]
@@ -88,6 +90,7 @@ class ForthCompiler:
     
     def _see_word(self, word_name):
         """Display the definition of a word"""
+        self._flush_output()
         if word_name in self._definition_source:
             print(self._definition_source[word_name])
         elif word_name in self.words:
@@ -239,7 +242,7 @@ class ForthCompiler:
                       if name != edited_name and name in self.words]
 
         for name in user_names:
-            fn = self.words[name]
+            fn = self._unwrap_word(self.words[name])
             # El cuerpo compilado está en el primer argumento por defecto del closure
             if not (hasattr(fn, '__defaults__') and fn.__defaults__):
                 continue
@@ -250,9 +253,19 @@ class ForthCompiler:
                 if (isinstance(op, tuple) and len(op) == 3
                         and op[0] == 'cached' and op[1] == edited_name):
                     compiled[i] = ('cached', edited_name, new_fn)
+            # La variante trusted se verificó con el efecto de pila anterior
+            # de edited_name: se descarta y la palabra vuelve al modo normal.
+            trusted = fn.__defaults__[2] if len(fn.__defaults__) > 2 else None
+            if trusted is not None and any(
+                    isinstance(op, tuple) and len(op) == 3 and op[1] == edited_name
+                    for op in trusted[1]):
+                fn.__defaults__ = fn.__defaults__[:2] + (None,)
+                self._word_effects.pop(name, None)
 
     def _remove_definition(self, def_type, name):
         """Remove a definition by type and name"""
+        self._word_effects.pop(name, None)
+        self._memo_caches.pop(name, None)
         if def_type in ('word', 'immediate', 'code', 'created'):
             if name in self.words:
                 del self.words[name]
@@ -288,6 +301,16 @@ class ForthCompiler:
                 elif xt in self.immediate_words:
                     self.immediate_words[xt]()
     
+    def _resolve_xt(self, xt):
+        """Devuelve el callable de un xt (callable o nombre de palabra) o None"""
+        if isinstance(xt, tuple) and len(xt) == 3 and xt[0] == 'word':
+            xt = xt[2]
+        if callable(xt):
+            return xt
+        if isinstance(xt, str):
+            return self.words.get(xt) or self.immediate_words.get(xt)
+        return None
+    
     def _bracket_tick(self):
         pass
     
@@ -306,18 +329,33 @@ class ForthCompiler:
             if not callable(xt):
                 print("Error: catch requiere xt ejecutable")
                 return
-            saved_stack = self.stack.copy()
-            saved_rstack = self.rstack.copy()
+            # Marco de excepción: solo profundidades, coste constante
+            frame = (len(self.stack), len(self.rstack),
+                     len(self._loop_stack), len(self._locals_stack))
             try:
                 xt()
                 self.stack.append(0)
             except ForthException as e:
-                self.stack = saved_stack
-                self.rstack = saved_rstack
+                self._catch_restore(frame)
                 self.stack.append(e.code)
         else:
             print("Error: catch requiere xt en pila")
     
+    def _catch_restore(self, frame):
+        """Vuelve al marco de CATCH truncando las pilas en su sitio (ANS).
+        Si xt consumió celdas por debajo de la profundidad guardada, se
+        rellenan con 0: tras THROW su contenido no está definido."""
+        depth, rdepth, loops, local_frames = frame
+        stack = self.stack
+        if len(stack) >= depth:
+            del stack[depth:]
+        else:
+            stack.extend([0] * (depth - len(stack)))
+        del self.rstack[rdepth:]
+        del self._loop_stack[loops:]
+        del self._locals_stack[local_frames:]
+        self._leave_flag = False
+    
     def _defer_stub(self):
         print("Error: DEFER requiere nombre")
     
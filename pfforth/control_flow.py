@@ -103,6 +103,7 @@ class ForthControlFlow:
     def _execute_do_loop(self, loop_tokens, is_plus_loop=False):
         """Execute a DO...LOOP or DO...+LOOP"""
         if len(self.stack) < 2:
+            self._flush_output()
             print("Error: DO requiere dos valores (límite e índice)")
             return
         
@@ -149,6 +150,7 @@ class ForthControlFlow:
     def _execute_if_then_else(self, if_tokens, else_tokens=None):
         """Execute an IF...THEN or IF...ELSE...THEN"""
         if not self.stack:
+            self._flush_output()
             print("Error: IF requiere una condición")
             return
         
@@ -177,6 +179,7 @@ class ForthControlFlow:
                 break
             
             if not self.stack:
+                self._flush_output()
                 print("Error: UNTIL requiere una condición")
                 break
             
@@ -208,6 +211,7 @@ class ForthControlFlow:
                 break
             
             if not self.stack:
+                self._flush_output()
                 print("Error: WHILE requiere una condición")
                 break
             
@@ -234,6 +238,7 @@ class ForthControlFlow:
         - ENDCASE drops the case value
         """
         if not self.stack:
+            self._flush_output()
             print("Error: CASE requiere un valor")
             return
         
@@ -244,6 +249,7 @@ class ForthControlFlow:
             self._execute_tokens(test_tokens)
             
             if not self.stack:
+                self._flush_output()
                 print("Error: OF requiere un valor de prueba")
                 continue
             
@@ -27,9 +27,25 @@ def clear_screen():
         os.system('clear')
 
 
+class _LazyMemory:
+    """self.memory se crea en el primer acceso.  Descriptor sin __set__: la
+    lista queda en el __dict__ de la instancia y los accesos siguientes no
+    pasan por aquí.  Un intérprete que no usa memoria (actores, workers) no
+    reserva las 64K celdas, que además el recolector de ciclos recorrería en
+    cada pasada."""
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        memory = obj.__dict__['memory'] = [0] * obj._memory_size
+        return memory
+
+
 class ForthBase:
     """Base mixin providing core infrastructure"""
     
+    memory = _LazyMemory()
+    
     def __init__(self):
         self.stack = []
         self.rstack = []
@@ -57,7 +73,6 @@ class ForthBase:
         
         self._memory_size = 65536
         self._pad_size = 256
-        self.memory = [0] * self._memory_size
         self.here = self._pad_size
         
         self._tick_mode = False
@@ -84,6 +99,11 @@ class ForthBase:
         self._next_fileid = 1
         
         self._use_inline_cache = True
+        self._trusted_mode = False
+        self._word_effects = {}
+        self._memo_pending = None
+        self._memo_caches = {}
+        self._memo_capacity = 1024
         
         self._locals_stack = []
         self._current_locals = []
@@ -250,6 +270,7 @@ class ForthBase:
             
             if text[i] == '(' and (i + 1 >= n or text[i + 1].isspace()):
                 i += 1
+                start = i
                 depth = 1
                 while i < n and depth > 0:
                     if text[i] == '(':
@@ -257,6 +278,9 @@ class ForthBase:
                     elif text[i] == ')':
                         depth -= 1
                     i += 1
+                # memo: necesita el efecto de pila declarado tras el nombre
+                if len(tokens) >= 2 and tokens[-2] == 'memo:':
+                    tokens.append(('stack_effect', text[start:i - 1].strip()))
                 continue
             
             if text[i] == '\\':
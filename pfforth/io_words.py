@@ -2,10 +2,28 @@
 PFForth I/O - Input/output operations and File Wordset
 """
 
+import io
 import sys
 import os
 import select
 
+# Códigos fam (file access method) de ANS Forth. BIN se combina con OR.
+FAM_RO  = 0
+FAM_WO  = 1
+FAM_RW  = 2
+FAM_BIN = 4
+
+# Tamaño del buffer interno de los ficheros binarios (read-line / read-file)
+FILE_BUFFER_SIZE = 1 << 16
+
+# Políticas de vaciado del buffer de salida (type/emit/./cr ...)
+#   always   - flush tras cada escritura (comportamiento clásico)
+#   line     - flush al escribir un salto de línea
+#   full     - flush al acumular _flush_threshold caracteres
+#   explicit - solo con flush-out, el prompt del REPL, key o accept
+FLUSH_MODES = ('always', 'line', 'full', 'explicit')
+OUTPUT_BUFFER_SIZE = 8192
+
 class ForthIO:
     """Mixin providing I/O operations"""
     
@@ -59,6 +77,12 @@ class ForthIO:
         self.words['file-exists?'] = self._file_exists
         self.words['flush-file'] = self._flush_file
         self.words['rename-file'] = self._rename_file
+        self.words['r/o'] = self._fam_ro
+        self.words['w/o'] = self._fam_wo
+        self.words['r/w'] = self._fam_rw
+        self.words['bin'] = self._fam_bin
+        self.words['file-each-line'] = self._file_each_line
+        self.words['file-each-record'] = self._file_each_record
         
         self.words['decimal'] = self._decimal
         self.words['hex'] = self._hex
@@ -78,16 +102,94 @@ class ForthIO:
         self.words['output-stream?']    = self._output_stream_query
         self.words['input-stream?']     = self._input_stream_query
 
+        self.words['flush-always']      = self._flush_always
+        self.words['flush-line']        = self._flush_line
+        self.words['flush-full']        = self._flush_full
+        self.words['flush-explicit']    = self._flush_explicit
+        self.words['flush-size!']       = self._flush_size_store
+        self.words['flush-mode?']       = self._flush_mode_query
+        self.words['flush-out']         = self._flush_output
+
         self._original_stdin  = sys.stdin
         self._string_buffer   = None
         self._forth_output    = sys.stdout
         self._forth_input     = sys.stdin
 
+        self._flush_mode      = 'always'
+        self._flush_threshold = OUTPUT_BUFFER_SIZE
+        self._out_pending     = []
+        self._out_pending_len = 0
+
+    # ------------------------------------------------------------------ #
+    #  Buffer de salida                                                   #
+    # ------------------------------------------------------------------ #
+
+    def _out(self, text):
+        """Escribe text en la salida Forth según la política de flush activa.
+        Fuera del modo 'always' el texto se acumula y se entrega al stream
+        con un solo write() + flush()."""
+        if self._flush_mode == 'always':
+            self._forth_output.write(text)
+            self._forth_output.flush()
+            return
+        self._out_pending.append(text)
+        self._out_pending_len += len(text)
+        if self._flush_mode == 'line':
+            if '\n' in text:
+                self._flush_output()
+        elif self._flush_mode == 'full':
+            if self._out_pending_len >= self._flush_threshold:
+                self._flush_output()
+
+    def _flush_output(self):
+        """flush-out ( -- ) Vacía el buffer de salida al stream actual"""
+        if self._out_pending:
+            self._forth_output.write(''.join(self._out_pending))
+            self._out_pending = []
+            self._out_pending_len = 0
+        self._forth_output.flush()
+
+    def _set_flush_mode(self, mode):
+        self._flush_output()
+        self._flush_mode = mode
+
+    def _flush_always(self):
+        """flush-always ( -- ) Flush tras cada escritura (por defecto con execute)"""
+        self._set_flush_mode('always')
+
+    def _flush_line(self):
+        """flush-line ( -- ) Flush al final de cada línea (por defecto en el REPL)"""
+        self._set_flush_mode('line')
+
+    def _flush_full(self):
+        """flush-full ( -- ) Flush al llenarse el buffer (ver flush-size!)"""
+        self._set_flush_mode('full')
+
+    def _flush_explicit(self):
+        """flush-explicit ( -- ) Flush solo con flush-out, prompt, key o accept"""
+        self._set_flush_mode('explicit')
+
+    def _flush_size_store(self):
+        """flush-size! ( n -- ) Umbral en caracteres del modo flush-full"""
+        if not self.stack:
+            print("Error: FLUSH-SIZE! requiere un tamaño")
+            return
+        size = int(self.stack.pop())
+        if size < 1:
+            print("Error: FLUSH-SIZE! requiere un tamaño positivo")
+            return
+        self._flush_threshold = size
+
+    def _flush_mode_query(self):
+        """flush-mode? ( -- ) Muestra la política de flush actual"""
+        self._flush_output()
+        print(f"flush: {self._flush_mode} (umbral {self._flush_threshold}, "
+              f"pendiente {self._out_pending_len})")
+
     def _emit(self):
         if self.stack:
             code = int(self.stack.pop())
-            self._forth_output.write(chr(code))
-            self._forth_output.flush()
+            self._out(chr(code))
     
     # ------------------------------------------------------------------ #
     #  Detección de plataforma para key / key?                           #
@@ -173,6 +275,7 @@ class ForthIO:
     # ------------------------------------------------------------------ #
 
     def _key(self):
+        self._flush_output()
         try:
             if self._forth_input is not sys.stdin:
                 # Stream redirigido — carácter a carácter, sin cambios de modo
@@ -217,6 +320,7 @@ class ForthIO:
     # ------------------------------------------------------------------ #
 
     def _key_question(self):
+        self._flush_output()
         try:
             if self._forth_input is not sys.stdin:
                 import io
@@ -253,6 +357,7 @@ class ForthIO:
             self.stack.append(0)
 
     def _accept(self):
+        self._flush_output()
         if len(self.stack) >= 2:
             max_len = int(self.stack.pop())
             addr = int(self.stack.pop())
@@ -277,8 +382,7 @@ class ForthIO:
 
         if isinstance(self.stack[-1], str):
             string = self.stack.pop()
-            self._forth_output.write(string)
-            self._forth_output.flush()
+            self._out(string)
             return
 
         if len(self.stack) >= 2:
@@ -289,18 +393,12 @@ class ForthIO:
                 print("Error: TYPE requiere (addr len) o un string")
                 return
 
-            chars = []
-            for i in range(length):
-                if 0 <= addr + i < self._memory_size:
-                    val = self.memory[addr + i]
-                    if isinstance(val, int) and 0 < val < 128:
-                        chars.append(chr(val))
-            self._forth_output.write(''.join(chars))
-            self._forth_output.flush()
+            cells = self._fetch_cells(addr, length)
+            self._out(''.join([chr(v) for v in cells
+                               if isinstance(v, int) and 0 < v < 128]))
 
     def _cr(self):
-        self._forth_output.write('\n')
-        self._forth_output.flush()
+        self._out('\n')
 
     def _page(self):
         from .core import clear_screen
@@ -308,8 +406,7 @@ class ForthIO:
         sys.stdout.flush()
 
     def _space(self):
-        self._forth_output.write(' ')
-        self._forth_output.flush()
+        self._out(' ')
     
     def _bl(self):
         self.stack.append(32)
@@ -658,6 +755,86 @@ class ForthIO:
             return ''.join(chars)
         return None
     
+    def _fam_ro(self):
+        """r/o ( -- fam ) Acceso de solo lectura"""
+        self.stack.append(FAM_RO)
+
+    def _fam_wo(self):
+        """w/o ( -- fam ) Acceso de solo escritura"""
+        self.stack.append(FAM_WO)
+
+    def _fam_rw(self):
+        """r/w ( -- fam ) Acceso de lectura/escritura"""
+        self.stack.append(FAM_RW)
+
+    def _fam_bin(self):
+        """bin ( fam1 -- fam2 ) Modifica fam para acceso binario
+        Ejemplo: s" datos.bin" r/o bin open-file
+        """
+        if not self.stack:
+            print("Error: BIN requiere un fam")
+            return
+        self.stack.append(int(self.stack.pop()) | FAM_BIN)
+
+    def _file_mode(self, fam, create=False):
+        """Traduce un fam de Forth al modo de open() de Python"""
+        if create:
+            mode = 'w+'
+        else:
+            mode = {FAM_RO: 'r', FAM_WO: 'w', FAM_RW: 'r+'}.get(fam & ~FAM_BIN, 'r')
+        return mode + 'b' if fam & FAM_BIN else mode
+
+    def _register_file_handle(self, filename, mode):
+        """Abre el fichero y lo registra en _file_handles. Devuelve el fileid.
+        Los ficheros binarios usan un buffer interno de FILE_BUFFER_SIZE bytes."""
+        if 'b' in mode:
+            f = open(filename, mode, buffering=FILE_BUFFER_SIZE)
+        else:
+            f = open(filename, mode)
+        fileid = self._next_fileid
+        self._file_handles[fileid] = f
+        self._next_fileid += 1
+        return fileid
+
+    def _is_binary_handle(self, f):
+        return not isinstance(f, io.TextIOBase)
+
+    def _file_read_view(self, size):
+        """Devuelve un memoryview de `size` bytes sobre un buffer reutilizable,
+        para que readinto() no reserve memoria en cada lectura."""
+        buf = getattr(self, '_file_read_buf', None)
+        if buf is None or len(buf) < size:
+            buf = self._file_read_buf = bytearray(max(size, FILE_BUFFER_SIZE))
+        return memoryview(buf)[:size]
+
+    def _store_codes(self, addr, codes):
+        """Copia una secuencia de códigos (bytes, memoryview o lista de int)
+        a memoria desde addr con una sola asignación de slice. Lo que queda
+        fuera de la memoria se descarta, igual que en los bucles anteriores."""
+        start = max(addr, 0)
+        end = min(addr + len(codes), self._memory_size)
+        if start < end:
+            self.memory[start:end] = codes[start - addr:end - addr]
+
+    def _fetch_cells(self, addr, count):
+        """Devuelve las celdas de memoria [addr, addr+count) recortadas a los límites"""
+        start = max(addr, 0)
+        end = min(addr + count, self._memory_size)
+        return self.memory[start:end] if start < end else []
+
+    def _text_codes(self, text):
+        """Códigos de carácter de un str sin bucle Python (vía UTF-32)"""
+        return memoryview(text.encode('utf-32-le')).cast('I')
+
+    def _cells_to_bytes(self, cells):
+        try:
+            return bytes(cells)
+        except (TypeError, ValueError):
+            return bytes(v & 0xFF for v in cells if isinstance(v, int))
+
+    def _cells_to_text(self, cells):
+        return ''.join([chr(v) for v in cells if isinstance(v, int)])
+
     def _open_file(self):
         if len(self.stack) < 2:
             print("Error: OPEN-FILE requiere (addr u fam)")
@@ -670,14 +847,8 @@ class ForthIO:
             self.stack.extend([0, -1])
             return
         
-        mode_map = {0: 'r', 1: 'w', 2: 'r+'}
-        mode = mode_map.get(fam, 'r')
-        
         try:
-            f = open(filename, mode)
-            fileid = self._next_fileid
-            self._file_handles[fileid] = f
-            self._next_fileid += 1
+            fileid = self._register_file_handle(filename, self._file_mode(fam))
             self.stack.extend([fileid, 0])
         except:
             self.stack.extend([0, -1])
@@ -712,10 +883,7 @@ class ForthIO:
             return
         
         try:
-            f = open(filename, 'w+')
-            fileid = self._next_fileid
-            self._file_handles[fileid] = f
-            self._next_fileid += 1
+            fileid = self._register_file_handle(filename, self._file_mode(fam, create=True))
             self.stack.extend([fileid, 0])
         except:
             self.stack.extend([0, -1])
@@ -748,11 +916,17 @@ class ForthIO:
         
         try:
             f = self._file_handles[fileid]
-            data = f.read(count)
-            for i, char in enumerate(data):
-                if 0 <= addr + i < self._memory_size:
-                    self.memory[addr + i] = ord(char)
-            self.stack.extend([len(data), 0])
+            if self._is_binary_handle(f):
+                # readinto sobre el buffer reutilizable y copia en bloque
+                count = max(0, min(count, self._memory_size - addr))
+                view = self._file_read_view(count)
+                n = f.readinto(view) or 0
+                self._store_codes(addr, view[:n])
+                self.stack.extend([n, 0])
+            else:
+                data = f.read(count)
+                self._store_codes(addr, self._text_codes(data))
+                self.stack.extend([len(data), 0])
         except:
             self.stack.extend([0, -1])
     
@@ -771,13 +945,22 @@ class ForthIO:
         
         try:
             f = self._file_handles[fileid]
-            line = f.readline(max_len)
-            if line.endswith('\n'):
-                line = line[:-1]
-            for i, char in enumerate(line):
-                if 0 <= addr + i < self._memory_size:
-                    self.memory[addr + i] = ord(char)
-            flag = -1 if line else 0
+            if self._is_binary_handle(f):
+                # readline() del BufferedReader se sirve de su buffer interno
+                raw = f.readline(max_len)
+                line = raw
+                if line.endswith(b'\n'):
+                    line = line[:-1]
+                    if line.endswith(b'\r'):
+                        line = line[:-1]
+                self._store_codes(addr, line)
+                flag = -1 if raw else 0
+            else:
+                line = f.readline(max_len)
+                if line.endswith('\n'):
+                    line = line[:-1]
+                self._store_codes(addr, self._text_codes(line))
+                flag = -1 if line else 0
             self.stack.extend([len(line), flag, 0])
         except:
             self.stack.extend([0, 0, -1])
@@ -797,13 +980,11 @@ class ForthIO:
         
         try:
             f = self._file_handles[fileid]
-            chars = []
-            for i in range(count):
-                if 0 <= addr + i < self._memory_size:
-                    val = self.memory[addr + i]
-                    if isinstance(val, int):
-                        chars.append(chr(val))
-            f.write(''.join(chars))
+            cells = self._fetch_cells(addr, count)
+            if self._is_binary_handle(f):
+                f.write(self._cells_to_bytes(cells))
+            else:
+                f.write(self._cells_to_text(cells))
             self.stack.append(0)
         except:
             self.stack.append(-1)
@@ -823,13 +1004,11 @@ class ForthIO:
         
         try:
             f = self._file_handles[fileid]
-            chars = []
-            for i in range(count):
-                if 0 <= addr + i < self._memory_size:
-                    val = self.memory[addr + i]
-                    if isinstance(val, int):
-                        chars.append(chr(val))
-            f.write(''.join(chars) + '\n')
+            cells = self._fetch_cells(addr, count)
+            if self._is_binary_handle(f):
+                f.write(self._cells_to_bytes(cells) + b'\n')
+            else:
+                f.write(self._cells_to_text(cells) + '\n')
             self.stack.append(0)
         except:
             self.stack.append(-1)
@@ -938,6 +1117,74 @@ class ForthIO:
         except:
             self.stack.append(-1)
 
+    def _file_each_line(self):
+        """FILE-EACH-LINE ( xt fileid -- ) Ejecuta xt para cada línea del fichero
+        Ficheros de texto: xt recibe ( str ). Ficheros bin: xt recibe ( addr len )
+        con la línea copiada en HERE. La lectura va por bloques del buffer del
+        fichero, así la memoria usada es constante sea cual sea su tamaño.
+        Ejemplo: : .linea type cr ;  ' .linea fid file-each-line
+        """
+        if len(self.stack) < 2:
+            print("Error: FILE-EACH-LINE requiere (xt fileid)")
+            return
+        fileid = self.stack.pop()
+        func = self._resolve_xt(self.stack.pop())
+        f = self._file_handles.get(fileid)
+        if func is None or f is None:
+            print("Error: FILE-EACH-LINE requiere un xt y un fileid abierto")
+            return
+        stack = self.stack
+        if self._is_binary_handle(f):
+            addr = self.here
+            for raw in f:
+                line = raw[:-1] if raw.endswith(b'\n') else raw
+                if line.endswith(b'\r'):
+                    line = line[:-1]
+                self._store_codes(addr, line)
+                stack.append(addr)
+                stack.append(len(line))
+                func()
+        else:
+            for line in f:
+                stack.append(line[:-1] if line.endswith('\n') else line)
+                func()
+
+    def _file_each_record(self):
+        """FILE-EACH-RECORD ( xt reclen fileid -- ) Ejecuta xt por cada registro
+        de reclen bytes/caracteres. El último registro puede ser más corto.
+        Ficheros de texto: xt recibe ( str ). Ficheros bin: xt recibe ( addr len )
+        con el registro copiado en HERE.
+        """
+        if len(self.stack) < 3:
+            print("Error: FILE-EACH-RECORD requiere (xt reclen fileid)")
+            return
+        fileid = self.stack.pop()
+        reclen = int(self.stack.pop())
+        func = self._resolve_xt(self.stack.pop())
+        f = self._file_handles.get(fileid)
+        if func is None or f is None or reclen <= 0:
+            print("Error: FILE-EACH-RECORD requiere un xt, reclen > 0 y un fileid abierto")
+            return
+        stack = self.stack
+        if self._is_binary_handle(f):
+            addr = self.here
+            view = self._file_read_view(reclen)
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                self._store_codes(addr, view[:n])
+                stack.append(addr)
+                stack.append(n)
+                func()
+        else:
+            while True:
+                record = f.read(reclen)
+                if not record:
+                    break
+                stack.append(record)
+                func()
+
     def _output_to(self):
         """Redirige la salida Forth al objeto Python en la cima de la pila.
         El objeto debe tener un método write(str) y flush().
@@ -949,18 +1196,20 @@ class ForthIO:
         if not hasattr(obj, 'write'):
             print("Error: output-to — el objeto no tiene método write()")
             return
+        self._flush_output()
         self._string_buffer = None
         self._forth_output = obj
 
     def _output_to_console(self):
         """Restaura la salida Forth a la consola."""
+        self._flush_output()
         self._forth_output = sys.stdout
         self._string_buffer = None
 
     def _output_to_string(self):
         """Captura toda la salida Forth en un buffer interno.
         Usar output-get-string para recuperar el texto."""
-        import io
+        self._flush_output()
         self._string_buffer = io.StringIO()
         self._forth_output = self._string_buffer
 
@@ -968,6 +1217,7 @@ class ForthIO:
         """Recupera el texto capturado y restaura la salida a la consola.
         ( -- str )"""
         if self._string_buffer is not None:
+            self._flush_output()
             result = self._string_buffer.getvalue()
             self._forth_output = sys.stdout
             self._string_buffer = None
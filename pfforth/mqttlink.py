@@ -0,0 +1,422 @@
+"""
+PFForth MQTT link - one long-lived MQTT client per broker, shared by the transport actors
+"""
+
+import queue
+import threading
+
+
+MQTT_INFLIGHT  = 32         # publicaciones QoS 1 sin confirmar por enlace
+MQTT_KEEPALIVE = 30         # s
+MQTT_RECONNECT = (1, 30)    # s: primer reintento, máximo
+
+_factory = None             # None = paho; use_local_broker() lo cambia
+_links = {}                 # (host, port) -> MqttLink
+_links_lock = threading.Lock()
+
+
+def _paho_client():
+    import paho.mqtt.client as mqtt
+    api = getattr(mqtt, 'CallbackAPIVersion', None)   # paho >= 2.0
+    return mqtt.Client(api.VERSION1) if api is not None else mqtt.Client()
+
+
+def available():
+    """True si hay cliente MQTT: paho instalado o broker local activo"""
+    if _factory is not None:
+        return True
+    try:
+        import paho.mqtt.client  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class MqttLink:
+    """Cliente MQTT persistente hacia host:port.
+
+    Lo comparten todos los actores wifi-out y wifi-in de ese broker: una
+    sola conexión, loop_start() en segundo plano y reconexión automática
+    (paho reintenta con espera creciente y reenvía lo no confirmado).  Las
+    suscripciones se renuevan en cada reconexión.
+
+    publish() no espera la confirmación del broker: como mucho
+    MQTT_INFLIGHT publicaciones QoS 1 quedan pendientes; la siguiente
+    bloquea hasta que llegue un PUBACK (contrapresión hacia la cola del
+    actor, que entonces agrupa).
+    """
+
+    def __init__(self, host, port, client):
+        self.host   = host
+        self.port   = port
+        self.client = client
+        self.refs   = 0
+        self.connected = False
+        self._lock    = threading.Lock()
+        self._window  = threading.Semaphore(MQTT_INFLIGHT)
+        self._pending = set()      # mids publicados sin PUBACK
+        self._early   = set()      # PUBACK llegado antes de conocer el mid
+        self._subs    = {}         # topic -> callback(payload)
+        self._watchers = []        # dicts de stats de los actores: reconnects
+        self.stats = {'published': 0, 'acked': 0, 'bytes': 0,
+                      'connects': 0, 'reconnects': 0, 'errors': 0}
+        client.on_connect    = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_publish    = self._on_publish
+        client.max_inflight_messages_set(MQTT_INFLIGHT)
+        client.reconnect_delay_set(*MQTT_RECONNECT)
+
+    def start(self):
+        self.client.connect_async(self.host, self.port, keepalive=MQTT_KEEPALIVE)
+        self.client.loop_start()
+
+    def stop(self):
+        try:
+            self.client.disconnect()
+        finally:
+            self.client.loop_stop()
+
+    # -- callbacks (hilo de red del cliente) -------------------------------
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            self.stats['errors'] += 1
+            return
+        with self._lock:
+            self.connected = True
+            self.stats['connects'] += 1
+            if self.stats['connects'] > 1:
+                self.stats['reconnects'] += 1
+                for st in self._watchers:
+                    st['reconnects'] += 1
+            topics = list(self._subs)
+        for topic in topics:
+            client.subscribe(topic, qos=1)
+
+    def _on_disconnect(self, client, userdata, rc):
+        self.connected = False
+
+    def _on_publish(self, client, userdata, mid):
+        with self._lock:
+            if mid in self._pending:
+                self._pending.discard(mid)
+            else:
+                self._early.add(mid)
+                return
+            self.stats['acked'] += 1
+        self._window.release()
+
+    # -- API ---------------------------------------------------------------
+
+    def publish(self, topic, payload, stop=None):
+        """Publica con QoS 1 sin esperar el PUBACK.  Bloquea mientras la
+        ventana esté llena; False si stop (Event) se activa antes."""
+        while not self._window.acquire(timeout=0.5):
+            if stop is not None and stop.is_set():
+                return False
+        info = self.client.publish(topic, payload, qos=1)
+        # rc != 0 sin conexión: paho lo encola y lo envía al reconectar
+        if info.rc not in (0, 4):          # MQTT_ERR_SUCCESS, MQTT_ERR_NO_CONN
+            self.stats['errors'] += 1
+            self._window.release()
+            return False
+        with self._lock:
+            self.stats['published'] += 1
+            self.stats['bytes'] += len(payload)
+            if info.mid in self._early:
+                self._early.discard(info.mid)
+                self.stats['acked'] += 1
+                acked = True
+            else:
+                self._pending.add(info.mid)
+                acked = False
+        if acked:
+            self._window.release()
+        return True
+
+    def inflight(self):
+        return len(self._pending)
+
+    def subscribe(self, topic, callback):
+        """callback(payload bytes) para cada mensaje de topic"""
+        with self._lock:
+            self._subs[topic] = callback
+        self.client.message_callback_add(topic, lambda c, u, m: callback(m.payload))
+        if self.connected:
+            self.client.subscribe(topic, qos=1)
+
+    def unsubscribe(self, topic):
+        with self._lock:
+            self._subs.pop(topic, None)
+        self.client.message_callback_remove(topic)
+        if self.connected:
+            self.client.unsubscribe(topic)
+
+    def watch(self, stats):
+        """stats['reconnects'] de un actor sigue las reconexiones del enlace"""
+        with self._lock:
+            self._watchers.append(stats)
+
+    def unwatch(self, stats):
+        with self._lock:
+            self._watchers = [s for s in self._watchers if s is not stats]
+
+
+def get_link(host, port):
+    """Enlace compartido hacia host:port (se crea y conecta al primer uso).
+    Cada get_link debe ir emparejado con un release_link."""
+    key = (host, port)
+    with _links_lock:
+        link = _links.get(key)
+        if link is None:
+            client = _factory() if _factory is not None else _paho_client()
+            link = MqttLink(host, port, client)
+            link.start()
+            _links[key] = link
+        link.refs += 1
+        return link
+
+
+def release_link(link):
+    """Suelta un enlace; el último en soltarlo lo desconecta"""
+    with _links_lock:
+        link.refs -= 1
+        if link.refs > 0:
+            return
+        if _links.get((link.host, link.port)) is link:
+            del _links[(link.host, link.port)]
+    link.stop()
+
+
+def links():
+    with _links_lock:
+        return list(_links.values())
+
+
+# ── Broker local (pruebas) ────────────────────────────────────────────────────
+
+def topic_matches(sub, topic):
+    """Filtro MQTT (con + y #) contra un topic concreto"""
+    s, t = sub.split('/'), topic.split('/')
+    for i, part in enumerate(s):
+        if part == '#':
+            return True
+        if i >= len(t) or (part != '+' and part != t[i]):
+            return False
+    return len(s) == len(t)
+
+
+class LocalMessage:
+    __slots__ = ('topic', 'payload', 'qos', 'retain', 'mid')
+
+    def __init__(self, topic, payload, qos=0, mid=0):
+        self.topic   = topic
+        self.payload = payload
+        self.qos     = qos
+        self.retain  = False
+        self.mid     = mid
+
+
+class LocalMessageInfo:
+    __slots__ = ('rc', 'mid')
+
+    def __init__(self, rc, mid):
+        self.rc  = rc
+        self.mid = mid
+
+
+class LocalBroker:
+    """Broker MQTT en memoria para probar los transportes sin red ni paho.
+
+        broker = mqttlink.use_local_broker()
+        ...  actor-wifi-out / actor-wifi-in usan ahora este broker
+        broker.down(); broker.up()      # simula una caída del broker
+        mqttlink.use_paho()
+
+    Un hilo despachador entrega cada publicación a los suscriptores y luego
+    confirma al emisor (on_publish), como haría el PUBACK.  host y port se
+    ignoran: todos los clientes comparten este broker.
+    """
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._clients = []
+        self._events  = queue.Queue()
+        self.online   = True
+        self.stats    = {'published': 0, 'delivered': 0, 'bytes': 0}
+        threading.Thread(target=self._dispatch, daemon=True,
+                         name='mqtt-local-broker').start()
+
+    def client(self, *args, **kwargs):
+        """Fábrica compatible con paho.mqtt.client.Client"""
+        return LocalClient(self)
+
+    def _dispatch(self):
+        while True:
+            sender, msg = self._events.get()
+            with self._lock:
+                targets = [c for c in self._clients if c.connected]
+                self.stats['published'] += 1
+                self.stats['bytes'] += len(msg.payload)
+            for c in targets:
+                if c._deliver(msg):
+                    self.stats['delivered'] += 1
+            sender._acked(msg.mid)
+
+    def _connect(self, client):
+        with self._lock:
+            if not self.online or client.connected:
+                return
+            client.connected = True
+            if client not in self._clients:
+                self._clients.append(client)
+        client._on_up()
+
+    def _disconnect(self, client, rc=0):
+        with self._lock:
+            if not client.connected:
+                return
+            client.connected = False
+        if client.on_disconnect:
+            client.on_disconnect(client, None, rc)
+
+    def down(self):
+        """Corta a todos los clientes (rc=1, como una caída de red)"""
+        self.online = False
+        with self._lock:
+            clients = list(self._clients)
+        for c in clients:
+            self._disconnect(c, rc=1)
+
+    def up(self):
+        """Vuelve a aceptar conexiones; los clientes en loop reconectan"""
+        self.online = True
+        with self._lock:
+            clients = [c for c in self._clients if c._looping and c._wanted]
+        for c in clients:
+            self._connect(c)
+
+
+class LocalClient:
+    """Subconjunto de paho.mqtt.client.Client (API de callbacks VERSION1)
+    que usan MqttLink y los transportes, sobre un LocalBroker."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.connected = False
+        self.on_connect = self.on_disconnect = None
+        self.on_publish = self.on_message = None
+        self._lock    = threading.Lock()
+        self._subs    = set()
+        self._callbacks = {}
+        self._unacked = {}         # mid -> LocalMessage (se reenvían al reconectar)
+        self._mid     = 0
+        self._looping = False
+        self._wanted  = False
+
+    # configuración
+    def max_inflight_messages_set(self, n):
+        pass
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        pass
+
+    # conexión
+    def connect(self, host, port=1883, keepalive=60):
+        self._wanted = True
+        self.broker._connect(self)
+        return 0 if self.connected else 1
+
+    def connect_async(self, host, port=1883, keepalive=60):
+        self._wanted = True
+
+    def loop_start(self):
+        self._looping = True
+        if self._wanted:
+            self.broker._connect(self)
+
+    def loop_stop(self):
+        self._looping = False
+
+    def loop(self, timeout=1.0):
+        threading.Event().wait(timeout)
+        return 0
+
+    def disconnect(self):
+        self._wanted = False
+        self.broker._disconnect(self)
+        return 0
+
+    def _on_up(self):
+        if self.on_connect:
+            self.on_connect(self, None, {}, 0)
+        with self._lock:
+            resend = sorted(self._unacked.items())
+        for _, msg in resend:
+            self.broker._events.put((self, msg))
+
+    # mensajes
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        with self._lock:
+            self._mid += 1
+            msg = LocalMessage(topic, payload or b'', qos, self._mid)
+            self._unacked[msg.mid] = msg
+            connected = self.connected
+        if connected:
+            self.broker._events.put((self, msg))
+            return LocalMessageInfo(0, msg.mid)
+        return LocalMessageInfo(4, msg.mid)      # MQTT_ERR_NO_CONN: encolado
+
+    def _acked(self, mid):
+        with self._lock:
+            if self._unacked.pop(mid, None) is None:
+                return
+        if self.on_publish:
+            self.on_publish(self, None, mid)
+
+    def subscribe(self, topic, qos=0):
+        with self._lock:
+            self._subs.add(topic)
+        return (0, 0)
+
+    def unsubscribe(self, topic):
+        with self._lock:
+            self._subs.discard(topic)
+        return (0, 0)
+
+    def message_callback_add(self, sub, callback):
+        with self._lock:
+            self._callbacks[sub] = callback
+
+    def message_callback_remove(self, sub):
+        with self._lock:
+            self._callbacks.pop(sub, None)
+
+    def _deliver(self, msg):
+        with self._lock:
+            if not any(topic_matches(s, msg.topic) for s in self._subs):
+                return False
+            callbacks = [cb for s, cb in self._callbacks.items()
+                         if topic_matches(s, msg.topic)]
+        for cb in callbacks:
+            cb(self, None, msg)
+        if not callbacks and self.on_message:
+            self.on_message(self, None, msg)
+        return True
+
+
+def use_local_broker(broker=None):
+    """Los enlaces que se creen a partir de ahora usan un LocalBroker
+    (nuevo o el dado) en lugar de paho; devuelve el broker"""
+    global _factory
+    broker = broker if broker is not None else LocalBroker()
+    _factory = broker.client
+    return broker
+
+
+def use_paho():
+    """Vuelve a paho-mqtt para los enlaces nuevos"""
+    global _factory
+    _factory = None
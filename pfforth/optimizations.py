@@ -1,7 +1,46 @@
 """
-PFForth Optimizations - Inline caching
+PFForth Optimizations - Inline caching, trusted (check-free) mode and
+word-level memoization (memo:)
 """
 
+from collections import OrderedDict
+
+from .stack_ops import TRUSTED_STACK_EFFECTS
+from .arithmetic import TRUSTED_ARITHMETIC_EFFECTS
+
+
+# Efectos de pila conocidos: nombre -> (entradas, salidas, variante sin comprobación)
+TRUSTED_EFFECTS = {
+    'i': (0, 1, None),
+    'j': (0, 1, None),
+    'k': (0, 1, None),
+}
+TRUSTED_EFFECTS.update(TRUSTED_STACK_EFFECTS)
+TRUSTED_EFFECTS.update(TRUSTED_ARITHMETIC_EFFECTS)
+
+# memo: solo acepta primitivas de MEMO_PURE_WORDS (y palabras de usuario
+# cuyo cuerpo lo cumpla); estas tablas solo dan el motivo del aviso
+MEMO_IMPURE_MIXINS = {
+    'ForthMemory': 'memoria',
+    'ForthIO': 'E/S',
+    'ForthPersistence': 'E/S',
+    'ForthActors': 'E/S',
+    'ForthCompiler': 'E/S',
+}
+MEMO_IMPURE_WORDS = {
+    '.': 'E/S', '.r': 'E/S', '.s': 'E/S',
+    'depth': 'pila', 'pick': 'pila', 'roll': 'pila', 'clear': 'pila',
+}
+MEMO_PURE_WORDS = (set(TRUSTED_EFFECTS) - set(MEMO_IMPURE_WORDS)) | {
+    "'", 'throw', 'exit', '?dup', 'pi', 'e',
+    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'sqrt', 'log', 'ln', 'exp',
+    'floor', 'ceil', 'round',
+}
+# Leen la pila de bucles o de retorno: solo son puras si lo que leen lo
+# abrió el propio cuerpo (profundidad de DO / de >r necesaria)
+MEMO_LOOP_WORDS = {'i': 1, 'j': 2, 'k': 3, 'leave': 1, 'unloop': 1}
+MEMO_RSTACK_WORDS = {'>r': 0, 'r>': 1, 'r@': 1}
+
 
 class ForthOptimizations:
     """Mixin providing optimization controls"""
@@ -11,6 +50,13 @@ class ForthOptimizations:
         self.words['cache-on'] = self._cache_on
         self.words['cache-off'] = self._cache_off
         self.words['cache?'] = self._cache_status
+        self.words['trusted-on'] = self._trusted_on
+        self.words['trusted-off'] = self._trusted_off
+        self.words['trusted?'] = self._trusted_status
+        self.words['memo:'] = self._memo_stub
+        self.words['memo-stats'] = self._memo_stats_word
+        self.words['memo-clear'] = self._memo_clear_word
+        self.words['memo-size!'] = self._memo_size_store
     
     def _cache_on(self):
         self._use_inline_cache = True
@@ -33,3 +79,345 @@ class ForthOptimizations:
         """Disable inline caching (Python API)"""
         self._use_inline_cache = False
         return self
+    
+    # ------------------------------------------------------------------ #
+    #  Modo trusted                                                       #
+    # ------------------------------------------------------------------ #
+    # Al compilar una palabra se calcula su efecto de pila estático. Si se
+    # conoce, se genera una variante del cuerpo que llama a las primitivas
+    # *_unchecked y la palabra comprueba la profundidad una sola vez al
+    # entrar. Si la pila no es suficiente se ejecuta el cuerpo normal, con
+    # el comportamiento de siempre ante un underflow.
+    
+    def _trusted_on(self):
+        self._trusted_mode = True
+        print("Modo trusted activado (afecta a las palabras que se definan)")
+    
+    def _trusted_off(self):
+        self._trusted_mode = False
+        print("Modo trusted desactivado")
+    
+    def _trusted_status(self):
+        status = "activado" if self._trusted_mode else "desactivado"
+        print(f"Modo trusted: {status} ({len(self._word_effects)} palabras verificadas)")
+    
+    def enable_trusted_mode(self):
+        """Enable trusted mode for words defined from now on (Python API)"""
+        self._trusted_mode = True
+        return self
+    
+    def disable_trusted_mode(self):
+        """Disable trusted mode for words defined from now on (Python API)"""
+        self._trusted_mode = False
+        return self
+    
+    def _token_effect(self, token, local_names):
+        """(entradas, salidas) de un token simple, o None si no se conoce"""
+        if isinstance(token, tuple):
+            op = token[0]
+            if op in ('literal', 'string') and len(token) > 1:
+                return (0, 1)
+            if op in ('print_string', 'locals'):
+                return (0, 0)
+            if op in ('to_local', 'to_value'):
+                return (1, 0)
+            if op == 'cached':
+                name = token[1]
+                if name in TRUSTED_EFFECTS and self._is_primitive(name, token[2]):
+                    return TRUSTED_EFFECTS[name][:2]
+                if name in self._word_effects and token[2] is self.words.get(name):
+                    return self._word_effects[name]
+            return None
+        if token in TRUSTED_EFFECTS and self._is_primitive(token, self.words.get(token)):
+            return TRUSTED_EFFECTS[token][:2]
+        if token in local_names or token in self.variables or token in self.values:
+            return (0, 1)
+        return None
+    
+    def _is_primitive(self, name, fn):
+        """True si fn es la primitiva que se registró como name (no una
+        redefinición del usuario): solo entonces valen TRUSTED_EFFECTS y la
+        variante *_unchecked"""
+        fn = self._unwrap_word(fn)
+        return getattr(fn, '__self__', None) is self and \
+            getattr(fn, '__func__', None) is getattr(self, '_primitive_funcs', {}).get(name)
+    
+    def _stack_effect(self, tokens, local_names):
+        """Efecto de pila estático (profundidad necesaria, neto) de una lista
+        de tokens compilados, o None si no se puede determinar."""
+        need = 0
+        depth = 0
+
+        def apply(inputs, net):
+            nonlocal need, depth
+            need = max(need, inputs - depth)
+            depth += net
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            op = token[0] if isinstance(token, tuple) else None
+
+            if op == 'if_start':
+                if_tokens, else_tokens, end_idx = self._extract_if_block(tokens, i)
+                if_eff = self._stack_effect(if_tokens, local_names)
+                else_eff = self._stack_effect(else_tokens or [], local_names)
+                if if_eff is None or else_eff is None or if_eff[1] != else_eff[1]:
+                    return None
+                apply(1, -1)
+                apply(max(if_eff[0], else_eff[0]), if_eff[1])
+                i = end_idx
+                continue
+
+            if op == 'do_start':
+                loop_tokens, end_idx, is_plus = self._extract_do_block(tokens, i)
+                body = self._stack_effect(loop_tokens, local_names)
+                if body is None:
+                    return None
+                body_need, body_net = body
+                if is_plus:
+                    body_need = max(body_need, 1 - body_net)
+                    body_net -= 1
+                if body_net != 0:
+                    return None
+                apply(2, -2)
+                apply(body_need, 0)
+                i = end_idx
+                continue
+
+            if op == 'begin_start':
+                info = self._extract_begin_block(tokens, i)
+                first = self._stack_effect(info['while_tokens'], local_names)
+                if first is None or info['type'] is None:
+                    return None
+                if info['type'] == 'again':
+                    if first[1] != 0:
+                        return None
+                    apply(first[0], 0)
+                elif info['type'] == 'until':
+                    if first[1] != 1:
+                        return None
+                    apply(max(first[0], 1 - first[1]), 0)
+                else:
+                    second = self._stack_effect(info['repeat_tokens'], local_names)
+                    if second is None:
+                        return None
+                    w_need = max(first[0], 1 - first[1])
+                    w_net = first[1] - 1
+                    if w_net + second[1] != 0:
+                        return None
+                    apply(max(w_need, second[0] - w_net), w_net)
+                i = info['end_idx']
+                continue
+
+            effect = self._token_effect(token, local_names)
+            if effect is None:
+                return None
+            apply(effect[0], effect[1] - effect[0])
+            i += 1
+
+        return (need, depth)
+    
+    def _trusted_variant(self, compiled, local_names):
+        """Devuelve (profundidad mínima, cuerpo sin comprobaciones,
+        (entradas, salidas)) para una definición, o None si su efecto de pila
+        no es estático."""
+        effect = self._stack_effect(compiled, local_names)
+        if effect is None:
+            return None
+        fast = []
+        for token in compiled:
+            name = fn = None
+            if isinstance(token, tuple) and token[0] == 'cached':
+                name, fn = token[1], token[2]
+            elif isinstance(token, str) and token not in local_names:
+                name, fn = token, self.words.get(token)
+            unchecked = TRUSTED_EFFECTS.get(name, (0, 0, None))[2] if name else None
+            if unchecked and self._is_primitive(name, fn):
+                fast.append(('cached', name, getattr(self, unchecked)))
+            else:
+                fast.append(token)
+        n_locals = len(local_names)
+        need = n_locals + effect[0]
+        return (need, fast, (need, need + effect[1] - n_locals))
+    
+    # ------------------------------------------------------------------ #
+    #  memo:                                                              #
+    # ------------------------------------------------------------------ #
+    # memo: nombre ( entradas -- salidas ) ... ; define una palabra pura cuyo
+    # resultado se guarda en un LRU indexado por los valores de entrada.
+    # Si el cuerpo usa memoria, variables, E/S o lee índices de bucle o la
+    # pila de retorno que no abrió él mismo, la palabra se define sin
+    # memoizar y se avisa.
+    
+    def _memo_stub(self):
+        print("Error: MEMO: requiere nombre y efecto de pila: memo: nombre ( n -- n' ) ... ;")
+    
+    @staticmethod
+    def _parse_stack_effect(text):
+        """'a b -- c' -> (2, 1), o None si no es un efecto de pila"""
+        if '--' not in text:
+            return None
+        inputs, outputs = text.split('--', 1)
+        return (len(inputs.split()), len(outputs.split()))
+    
+    def _memo_impurity(self, tokens, local_names, seen=None):
+        """Devuelve (motivo, palabra) del primer token impuro o None"""
+        seen = set() if seen is None else seen
+        loops = rdepth = 0
+        for token in tokens:
+            if isinstance(token, tuple):
+                op = token[0]
+                if op == 'do_start':
+                    loops += 1
+                    continue
+                if op in ('loop_end', 'plusloop_end', 'plus_loop_end'):
+                    loops -= 1
+                    continue
+                if op == 'leave':
+                    name, fn = 'leave', None
+                elif op == 'print_string':
+                    return ('E/S', '."')
+                elif op in ('py_eval', 'py_exec', 'py_inline'):
+                    return ('E/S', 'py')
+                elif op == 'to_value':
+                    return ('variables', f'to {token[1]}')
+                elif op != 'cached':
+                    continue
+                else:
+                    name, fn = token[1], token[2]
+            elif isinstance(token, str):
+                if token in local_names:
+                    continue
+                if token in self.variables or token in self.values:
+                    return ('variables', token)
+                name, fn = token, self.words.get(token)
+                if fn is None and name not in MEMO_LOOP_WORDS:
+                    continue
+            else:
+                continue
+            if name in MEMO_LOOP_WORDS:
+                if loops < MEMO_LOOP_WORDS[name]:
+                    return ('pila de bucles', name)
+                continue
+            if name in MEMO_RSTACK_WORDS:
+                if rdepth < MEMO_RSTACK_WORDS[name]:
+                    return ('pila de retorno', name)
+                rdepth += {'>r': 1, 'r>': -1}.get(name, 0)
+                continue
+            reason = self._memo_word_impurity(name, fn, seen)
+            if reason:
+                return (reason, name)
+        return None
+    
+    def _memo_word_impurity(self, name, fn, seen):
+        """Motivo por el que la palabra name no es pura, o None"""
+        if name in self.variables or name in self.values:
+            return 'variables'
+        if name in MEMO_PURE_WORDS and self._is_primitive(name, fn):
+            return None
+        if name in MEMO_IMPURE_WORDS:
+            return MEMO_IMPURE_WORDS[name]
+        fn = self._unwrap_word(fn)
+        defaults = getattr(fn, '__defaults__', None)
+        if defaults and isinstance(defaults[0], list):
+            if id(fn) in seen:
+                return None
+            seen.add(id(fn))
+            found = self._memo_impurity(defaults[0], defaults[1], seen)
+            return found[0] if found else None
+        owner = getattr(getattr(fn, '__func__', None), '__qualname__', '').split('.')[0]
+        return MEMO_IMPURE_MIXINS.get(owner, 'efectos no verificados')
+    
+    def _memo_word(self, name, fn, counts, compiled, local_names):
+        """Devuelve fn memoizada, o fn si el cuerpo no es puro"""
+        impure = self._memo_impurity(compiled, local_names)
+        if impure:
+            print(f"Aviso: MEMO: '{name}' usa {impure[0]} ({impure[1]}); se define sin memoizar")
+            return fn
+        n_in, n_out = counts
+        cache = OrderedDict()
+        entry = {'cache': cache, 'hits': 0, 'misses': 0, 'inputs': n_in, 'outputs': n_out}
+        self._memo_caches[name] = entry
+        
+        def memoized():
+            stack = self.stack
+            base = len(stack) - n_in
+            if base < 0:
+                fn()
+                return
+            # con el tipo: 1, 1.0 y True son iguales como claves de dict
+            key = tuple([(type(x), x) for x in stack[base:]])
+            try:
+                result = cache.get(key)
+            except TypeError:
+                fn()
+                return
+            if result is not None:
+                cache.move_to_end(key)
+                entry['hits'] += 1
+                del stack[base:]
+                stack.extend(result)
+                return
+            entry['misses'] += 1
+            fn()
+            stack = self.stack
+            if len(stack) == base + n_out:
+                cache[key] = tuple(stack[base:])
+                if len(cache) > self._memo_capacity:
+                    cache.popitem(last=False)
+        
+        memoized._memoized = fn
+        # recurse debe pasar por la caché para que la recursión sea lineal;
+        # referencia directa: redefinir name después no cambia esta palabra
+        bodies = [compiled]
+        trusted = fn.__defaults__[2]
+        if trusted is not None:
+            bodies.append(trusted[1])
+        for body in bodies:
+            for i, token in enumerate(body):
+                if isinstance(token, tuple) and token[0] == 'recurse':
+                    body[i] = ('cached', name, memoized)
+        return memoized
+    
+    def memo_stats(self):
+        """Devuelve {nombre: {hits, misses, size, inputs, outputs}} de las palabras memo:"""
+        return {name: {'hits': e['hits'], 'misses': e['misses'], 'size': len(e['cache']),
+                       'inputs': e['inputs'], 'outputs': e['outputs']}
+                for name, e in self._memo_caches.items()}
+    
+    def memo_clear(self, name=None):
+        """Vacía la caché y las estadísticas de name (o de todas)"""
+        entries = [self._memo_caches[name]] if name else self._memo_caches.values()
+        for e in entries:
+            e['cache'].clear()
+            e['hits'] = e['misses'] = 0
+        return self
+    
+    def _memo_stats_word(self):
+        """memo-stats ( -- ) Aciertos, fallos y tamaño de cada caché memo:"""
+        stats = self.memo_stats()
+        if not stats:
+            print("No hay palabras memo:")
+            return
+        print(f"{'Palabra':<20} {'Aciertos':>10} {'Fallos':>10} {'Entradas':>9} {'% acierto':>10}")
+        print("-" * 63)
+        for name, st in stats.items():
+            total = st['hits'] + st['misses']
+            rate = 100.0 * st['hits'] / total if total else 0.0
+            print(f"{name[:20]:<20} {st['hits']:>10} {st['misses']:>10} {st['size']:>9} {rate:>9.1f}%")
+        print(f"Capacidad por palabra: {self._memo_capacity}")
+    
+    def _memo_clear_word(self):
+        """memo-clear ( -- ) Vacía todas las cachés memo:"""
+        self.memo_clear()
+    
+    def _memo_size_store(self):
+        """memo-size! ( n -- ) Capacidad máxima de cada caché memo:"""
+        if not self.stack or not isinstance(self.stack[-1], int) or self.stack[-1] <= 0:
+            print("Error: MEMO-SIZE! requiere un entero positivo")
+            return
+        self._memo_capacity = self.stack.pop()
+        for e in self._memo_caches.values():
+            while len(e['cache']) > self._memo_capacity:
+                e['cache'].popitem(last=False)
@@ -0,0 +1,434 @@
+"""
+PFForth Parallel - par-map and parameter sweeps over a pool of
+pre-warmed child interpreters
+"""
+
+import math
+import pickle
+from itertools import product
+
+
+PAR_START_METHOD = 'spawn'
+PAR_CHUNKS_PER_WORKER = 4
+
+
+# ---------------------------------------------------------------------- #
+#  Lado del proceso hijo                                                  #
+# ---------------------------------------------------------------------- #
+# Cada proceso del pool crea un intérprete una sola vez (_par_init) y lo
+# reutiliza para todos los trozos. Las definiciones llegan como instantánea
+# del diccionario (_dictionary_snapshot, el mismo camino que actor-spawn);
+# el estado mutable (variables, values, memoria) viaja con cada trozo.
+
+_worker = None
+
+
+def _par_init(snapshot):
+    """Inicializador del pool: crea el intérprete hijo del proceso"""
+    global _worker
+    from .repl import InteractiveForth
+    _worker = InteractiveForth()
+    _worker._load_snapshot(snapshot)
+
+
+def _par_apply_state(forth, state):
+    """Copia en el hijo las variables, values y memoria del padre"""
+    for name, value in state['variables'].items():
+        if name in forth.variables:
+            forth.variables[name] = value
+    forth.values.update(state['values'])
+    data = state['memory']
+    forth.memory[:len(data)] = data
+    forth.here = state['here']
+
+
+def _par_result(stack):
+    """Resultado de una iteración: la cima si dejó un valor, si no la pila"""
+    return stack[0] if len(stack) == 1 else list(stack)
+
+
+def _par_call(job):
+    """Adaptador para pool.imap: job = (func, args)"""
+    func, args = job
+    return func(*args)
+
+
+def _par_chunk(word, start, stop, state, forth=None):
+    """Ejecuta word para cada i en [start, stop) y devuelve los resultados"""
+    forth = forth or _worker
+    if state is not None:
+        _par_apply_state(forth, state)
+    fn = forth.words.get(word)
+    if fn is None:
+        raise RuntimeError(f"palabra desconocida en el hijo: {word}")
+    stack = forth.stack
+    results = []
+    for i in range(start, stop):
+        stack.clear()
+        stack.append(i)
+        try:
+            fn()
+        except Exception as e:
+            raise RuntimeError(f"{word} en la iteracion {i}: {e}") from None
+        results.append(_par_result(stack))
+    stack.clear()
+    return results
+
+
+def _sweep_chunk(word, params, combos, state, forth=None):
+    """Ejecuta word una vez por combinación de parámetros y devuelve la
+    pila resultante de cada una. params = [(kind, name)], kind 'value' o
+    'variable'."""
+    forth = forth or _worker
+    if state is not None:
+        _par_apply_state(forth, state)
+    fn = forth.words.get(word)
+    if fn is None:
+        raise RuntimeError(f"palabra desconocida en el hijo: {word}")
+    stack = forth.stack
+    rows = []
+    for combo in combos:
+        for (kind, name), value in zip(params, combo):
+            if kind == 'value':
+                forth.values[name] = value
+            else:
+                forth.variables[name] = value
+        stack.clear()
+        try:
+            fn()
+        except Exception as e:
+            raise RuntimeError(f"{word} con {combo}: {e}") from None
+        rows.append(tuple(stack))
+    stack.clear()
+    return rows
+
+
+# ---------------------------------------------------------------------- #
+#  Mixin                                                                  #
+# ---------------------------------------------------------------------- #
+
+class ForthParallel:
+    """Mixin providing par-map and sweep over a multiprocessing pool
+
+    El pool se crea la primera vez que se usa y se mantiene caliente entre
+    llamadas mientras no cambien las definiciones (palabras, constantes,
+    create); si cambian, se recrea con la nueva instantánea.
+    """
+
+    def _register_parallel_words(self):
+        """Register parallel words"""
+        self.words['par-map'] = self._par_map_word
+        self.words['par-workers!'] = self._par_workers_store
+        self.words['par-workers?'] = self._par_workers_fetch
+        self.words['par-stop'] = self._par_stop_word
+        self.words['sweep'] = self._sweep_word
+        self._par_pool = None
+        self._par_key = None
+        self._par_workers = None
+
+    # ------------------------------------------------------------------ #
+    #  Instantánea y pool                                                 #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _picklable(value):
+        try:
+            pickle.dumps(value)
+            return True
+        except Exception:
+            return False
+
+    def _par_snapshot(self):
+        """Devuelve (definiciones, clave, estado) listos para otro proceso.
+        Los values que no se pueden serializar (p.ej. xt) no viajan."""
+        snap = self._dictionary_snapshot(memory=True)
+        values = {k: v for k, v in snap['values'].items() if self._picklable(v)}
+        skipped = set(snap['values']) - set(values)
+        if skipped:
+            snap['order'] = [e for e in snap['order']
+                             if not (e[0] == 'value' and e[1] in skipped)]
+        snap['values'] = values
+        variables = {k: v for k, v in snap['variables'].items() if self._picklable(v)}
+        snap['variables'] = variables
+        state = {'variables': variables, 'values': values,
+                 'memory': snap.pop('memory'), 'here': snap.pop('here')}
+        key = pickle.dumps((snap['order'], snap['source'],
+                            snap['constants'], snap['created']))
+        return snap, key, state
+
+    def par_workers(self):
+        """Número de procesos del pool (por defecto, los núcleos disponibles)"""
+        if self._par_workers:
+            return self._par_workers
+        import os
+        try:
+            return len(os.sched_getaffinity(0))
+        except (AttributeError, OSError):
+            return os.cpu_count() or 1
+
+    def _par_get_pool(self, snap, key):
+        """Pool caliente para la instantánea actual (lo recrea si cambió)"""
+        if self._par_pool is not None and self._par_key == key:
+            return self._par_pool
+        self.par_stop()
+        import multiprocessing
+        ctx = multiprocessing.get_context(PAR_START_METHOD)
+        self._par_pool = ctx.Pool(self.par_workers(), initializer=_par_init,
+                                  initargs=(snap,))
+        self._par_key = key
+        return self._par_pool
+
+    def par_stop(self):
+        """Cierra el pool de procesos (se vuelve a crear al usarlo)"""
+        pool, self._par_pool, self._par_key = self._par_pool, None, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        return self
+
+    def par_warm(self):
+        """Arranca el pool ya, para no pagar el arranque en la primera llamada"""
+        snap, key, _ = self._par_snapshot()
+        pool = self._par_get_pool(snap, key)
+        pool.map(abs, range(self.par_workers()))
+        return self
+
+    def _par_run(self, func, tasks):
+        """Ejecuta func(*task, state) en el pool y va devolviendo (iterador)
+        los resultados en el orden de tasks a medida que llegan. Sin
+        multiprocessing disponible, o con un solo proceso, ejecuta en un
+        clon local del intérprete."""
+        snap, key, state = self._par_snapshot()
+        if self.par_workers() > 1:
+            try:
+                pool = self._par_get_pool(snap, key)
+            except (ImportError, OSError, ValueError) as e:
+                print(f"Aviso: pool de procesos no disponible ({e}); "
+                      f"se ejecuta en secuencia")
+            else:
+                return pool.imap(_par_call, [(func, task + (state,)) for task in tasks])
+        from .repl import InteractiveForth
+        local = InteractiveForth()
+        local._load_snapshot(snap)
+        return (func(*task, state, local) for task in tasks)
+
+    def _par_tasks(self, n):
+        """Límites (start, stop) de los trozos en que se reparten n elementos"""
+        size = max(1, math.ceil(n / (self.par_workers() * PAR_CHUNKS_PER_WORKER)))
+        return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+    # ------------------------------------------------------------------ #
+    #  par-map                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _word_name(self, word):
+        """Nombre Forth de un xt o de una cadena; None si no tiene nombre"""
+        if callable(word):
+            return next((k for k, v in self.words.items() if v is word), None)
+        return str(word)
+
+    def par_map(self, word, lo, hi, workers=None):
+        """Ejecuta word ( i -- r ) para cada i en [lo, hi) repartiendo el
+        rango entre procesos. Devuelve los resultados en orden: la cima si
+        la iteración dejó un valor, o la lista de la pila si dejó varios."""
+        name = self._word_name(word)
+        if name is None or name not in self.words:
+            raise ValueError(f"par-map: palabra desconocida: {word!r}")
+        if workers is not None and workers != self._par_workers:
+            self._par_workers = workers
+            self.par_stop()
+        n = max(0, hi - lo)
+        if n == 0:
+            return []
+        tasks = [(name, lo + start, lo + stop) for start, stop in self._par_tasks(n)]
+        return [r for chunk in self._par_run(_par_chunk, tasks) for r in chunk]
+
+    def _par_map_word(self):
+        """par-map ( xt lo hi -- results ) Ejecuta xt ( i -- r ) para cada i
+        de lo a hi-1 en procesos paralelos; deja la lista de resultados"""
+        if len(self.stack) < 3:
+            print("Error: PAR-MAP requiere xt lo hi en la pila")
+            return
+        hi = self.stack.pop()
+        lo = self.stack.pop()
+        word = self.stack.pop()
+        name = self._word_name(word)
+        if name is None:
+            print("Error: PAR-MAP: xt sin nombre conocido (usa s\" nombre\")")
+            return
+        try:
+            self.stack.append(self.par_map(name, int(lo), int(hi)))
+        except Exception as e:
+            print(f"Error: PAR-MAP: {e}")
+
+    def _par_workers_store(self):
+        """par-workers! ( n -- ) Fija el número de procesos (0 = núcleos)"""
+        if not self.stack:
+            print("Error: PAR-WORKERS! requiere un número en la pila")
+            return
+        n = self.stack.pop()
+        if not isinstance(n, int) or n < 0:
+            print("Error: PAR-WORKERS! requiere un entero >= 0")
+            return
+        self._par_workers = n or None
+        self.par_stop()
+
+    def _par_workers_fetch(self):
+        """par-workers? ( -- n ) Número de procesos que usará par-map"""
+        self.stack.append(self.par_workers())
+
+    def _par_stop_word(self):
+        """par-stop ( -- ) Cierra el pool de procesos de par-map"""
+        self.par_stop()
+
+    # ------------------------------------------------------------------ #
+    #  sweep                                                              #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _sweep_number(text):
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+
+    @classmethod
+    def _sweep_parse_spec(cls, spec):
+        """Interpreta 'carga=100:1000:100 luz=2,4,6 -> flecha' y devuelve
+        ([(nombre, [valores])], [columnas de salida] o None).
+        lo:hi[:paso] va de lo a hi sin incluirlo, como DO y par-map."""
+        text, _, outputs = spec.partition('->')
+        params = []
+        for item in text.split():
+            name, sep, values = item.partition('=')
+            if not sep or not name or not values:
+                raise ValueError(f"parametro mal formado '{item}' (usa nombre=lo:hi:paso o nombre=a,b,c)")
+            if ':' in values:
+                parts = [cls._sweep_number(v) for v in values.split(':')]
+                if len(parts) not in (2, 3):
+                    raise ValueError(f"rango mal formado '{values}'")
+                lo, hi = parts[0], parts[1]
+                step = parts[2] if len(parts) == 3 else 1
+                if step <= 0:
+                    raise ValueError(f"el paso de '{name}' debe ser positivo")
+                count = max(0, math.ceil((hi - lo) / step - 1e-9))
+                seq = [lo + k * step for k in range(count)]
+                if any(isinstance(v, float) for v in parts):
+                    seq = [round(v, 12) for v in seq]
+            else:
+                seq = [cls._sweep_number(v) for v in values.split(',') if v]
+            params.append((name, seq))
+        return params, (outputs.split() or None)
+
+    def _ensure_ai(self):
+        """Estado del vocabulario de IA (mismo formato que code/ai/data)"""
+        if not hasattr(self, '_ai'):
+            self._ai = {
+                'dataset':    None,
+                'target_col': None,
+                'train_set':  None,
+                'test_set':   None,
+                'model':      None,
+                'last_op':    None,
+                'verbose':    False,
+                'image':      None,
+                'audio':      None,
+                'clip_model': None,
+                'yolo_model': None,
+            }
+        return self._ai
+
+    def sweep(self, word, params, outputs=None):
+        """Barrido de parámetros: ejecuta word con cada combinación de
+        valores de params (VALUEs o variables) en procesos paralelos y
+        deja un DataFrame (parámetros + salidas) en self._ai['dataset'].
+
+        params: dict {nombre: valores} o lista [(nombre, valores)]
+        outputs: nombres de las columnas de salida (por defecto result1..n)
+
+        Los trozos se escriben, según llegan, en un array NumPy reservado
+        de antemano con una fila por combinación."""
+        import numpy as np
+        import pandas as pd
+
+        name = self._word_name(word)
+        if name is None or name not in self.words:
+            raise ValueError(f"sweep: palabra desconocida: {word!r}")
+        params = list(params.items()) if isinstance(params, dict) else list(params)
+        if not params:
+            raise ValueError("sweep: no hay parametros")
+        kinds = []
+        for pname, _ in params:
+            if pname in self.values:
+                kinds.append(('value', pname))
+            elif pname in self.variables:
+                kinds.append(('variable', pname))
+            else:
+                raise ValueError(f"'{pname}' no es un VALUE ni una variable")
+        grid = list(product(*[list(values) for _, values in params]))
+        if not grid:
+            raise ValueError("sweep: algun parametro no tiene valores")
+
+        n, n_params = len(grid), len(params)
+        spans = self._par_tasks(n)
+        tasks = [(name, kinds, grid[start:stop]) for start, stop in spans]
+        data = None
+        for (start, stop), rows in zip(spans, self._par_run(_sweep_chunk, tasks)):
+            widths = {len(row) for row in rows}
+            if data is None:
+                width = widths.pop() if len(widths) == 1 else -1
+                if width < 0:
+                    raise ValueError(f"{name} deja un numero variable de valores")
+                if outputs is None:
+                    outputs = ['result'] if width == 1 else [f'result{k + 1}' for k in range(width)]
+                elif len(outputs) != width:
+                    raise ValueError(f"{name} deja {width} valores y hay "
+                                     f"{len(outputs)} columnas de salida")
+                data = np.empty((n, n_params + width), dtype=float)
+                data[:, :n_params] = grid
+            elif widths != {data.shape[1] - n_params}:
+                raise ValueError(f"{name} deja un numero variable de valores")
+            data[start:stop, n_params:] = rows
+
+        columns = [pname for pname, _ in params] + list(outputs)
+        df = pd.DataFrame(data, columns=columns)
+        for col, (_, values) in zip(columns, params):
+            if all(isinstance(v, int) for v in values):
+                df[col] = df[col].astype(int)
+
+        ai = self._ensure_ai()
+        ai['dataset'] = df
+        ai['target_col'] = None
+        ai['train_set'] = None
+        ai['test_set'] = None
+        ai['model'] = None
+        ai['last_op'] = {
+            'type':    'sweep',
+            'data':    {'word': name, 'params': columns[:n_params], 'outputs': list(outputs)},
+            'metrics': {'rows': len(df), 'cols': len(df.columns)},
+        }
+        return df
+
+    def _sweep_word(self):
+        """sweep ( xt spec -- ) Ejecuta xt con cada combinación de la
+        especificación, p.ej. s" carga=100:1000:100 luz=2,4,6 -> flecha",
+        y deja el resultado como dataset activo de IA"""
+        if len(self.stack) < 2:
+            print("Error: SWEEP requiere xt y especificacion en la pila")
+            return
+        spec = self.stack.pop()
+        word = self.stack.pop()
+        name = self._word_name(word)
+        if name is None:
+            print("Error: SWEEP: xt sin nombre conocido (usa s\" nombre\")")
+            return
+        try:
+            params, outputs = self._sweep_parse_spec(str(spec))
+            df = self.sweep(name, params, outputs)
+        except ImportError as e:
+            print(f"Error: SWEEP requiere numpy y pandas (pip install numpy pandas): {e}")
+            return
+        except Exception as e:
+            print(f"Error: SWEEP: {e}")
+            return
+        print(f"✓ Barrido de {name}: {len(df)} filas × {len(df.columns)} columnas → dataset")
@@ -6,8 +6,6 @@ import os
 import sys
 import math
 import time
-import subprocess
-import platform
 from collections import defaultdict
 
 
@@ -499,6 +497,16 @@ def execute(forth):
     def _import_code_word(self, full_name):
         """Import a CODE word from file (.py) or all words from a directory"""
         full_name = full_name.rstrip('/')
+        start = time.perf_counter()
+        try:
+            self._import_code_path(full_name)
+        finally:
+            times = getattr(self, '_vocab_times', None)
+            if times is not None:
+                times[full_name] = times.get(full_name, 0.0) + time.perf_counter() - start
+
+    def _import_code_path(self, full_name):
+        """Import a CODE word or directory (see _import_code_word)"""
         base_dir = os.path.join(self._base_dir, 'extended-code')
         dir_path = os.path.join(base_dir, full_name)
 
@@ -648,6 +656,9 @@ def execute(forth):
         if self._is_replit():
             return False
 
+        # Importación diferida: subprocess y platform pesan en el arranque
+        import platform
+        import subprocess
         system = platform.system()
 
         try:
@@ -0,0 +1,197 @@
+"""
+PFForth Pool - Thread-safe pool of cloned interpreters for embedding
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+POOL_LATENCY_WINDOW = 1024
+
+
+class Pool:
+    """Pool of N interpreters that share the same dictionary
+
+    Un intérprete no es seguro entre hilos (pila, pila de retorno, bucles y
+    locals son estado mutable), así que el pool reparte intérpretes
+    completos: cada hilo usa uno en exclusiva y lo devuelve con las pilas
+    limpias. Los clones se crean una sola vez, a partir de la instantánea del
+    diccionario del primero (el mismo camino que actor-spawn y par-map).
+
+        pool = pfforth.Pool(4, init_source=': control ( e -- u ) 3 * 2 / ;')
+        pool.run('control', 10)          # -> [15]
+        with pool.acquire() as f:
+            f.execute('10 control')
+        pool.stats()
+
+    Las variables y values que cambie una petición se quedan en ese clon;
+    solo las pilas se reinician al devolverlo.
+    """
+
+    def __init__(self, size=4, init_source=None, forth=None):
+        if size < 1:
+            raise ValueError("Pool: size debe ser >= 1")
+        from .repl import InteractiveForth
+        start = time.perf_counter()
+        # forth: intérprete del que clonar; sigue siendo del llamador
+        prototype = forth if forth is not None else InteractiveForth()
+        if init_source:
+            prototype.execute(init_source)
+            prototype._flush_output()
+        snapshot = prototype._dictionary_snapshot(memory=True)
+        self._interpreters = [] if forth is not None else [prototype]
+        while len(self._interpreters) < size:
+            clone = InteractiveForth()
+            clone._load_snapshot(snapshot)
+            self._interpreters.append(clone)
+        self._idle = queue.LifoQueue()
+        for f in self._interpreters:
+            self._reset(f)
+            self._idle.put(f)
+        self.size = size
+        self.build_time = time.perf_counter() - start
+        self._lock = threading.Lock()
+        self._closed = False
+        self._reset_stats()
+
+    def __repr__(self):
+        return f"<pfforth.Pool size={self.size} idle={self._idle.qsize()}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _reset(f):
+        """Deja un intérprete listo para otra petición"""
+        f._flush_output()
+        f.stack.clear()
+        f.rstack.clear()
+        f._loop_stack.clear()
+        f._locals_stack.clear()
+        f._leave_flag = False
+        f._exit_flag = False
+        f._input_tokens = None
+        f._input_index = 0
+
+    # ------------------------------------------------------------------ #
+    #  Préstamo                                                           #
+    # ------------------------------------------------------------------ #
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Presta un intérprete en exclusiva; al salir del with se devuelve
+        con las pilas limpias. Lanza queue.Empty si no hay ninguno libre
+        antes de timeout segundos."""
+        if self._closed:
+            raise RuntimeError("Pool cerrado")
+        start = time.perf_counter()
+        f = self._idle.get(timeout=timeout)
+        waited = time.perf_counter() - start
+        try:
+            yield f
+        finally:
+            busy = time.perf_counter() - start - waited
+            self._reset(f)
+            self._idle.put(f)
+            with self._lock:
+                self._stats['acquired'] += 1
+                self._stats['wait_total'] += waited
+                self._stats['busy_total'] += busy
+                self._waits.append(waited)
+
+    def run(self, word, *args, timeout=None):
+        """Apila args, ejecuta word (nombre o código Forth) en un intérprete
+        libre y devuelve la pila resultante como lista"""
+        with self.acquire(timeout) as f:
+            start = time.perf_counter()
+            failed = True
+            try:
+                f.stack.extend(args)
+                fn = f.words.get(word)
+                if fn is not None:
+                    fn()
+                else:
+                    f.execute(word)
+                failed = False
+                return list(f.stack)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._stats['runs'] += 1
+                    self._stats['errors'] += failed
+                    self._latencies.append(elapsed)
+
+    def close(self):
+        """Marca el pool como cerrado (los intérpretes prestados terminan)"""
+        self._closed = True
+
+    # ------------------------------------------------------------------ #
+    #  Métricas                                                           #
+    # ------------------------------------------------------------------ #
+
+    def _reset_stats(self):
+        with self._lock:
+            self._stats = {'runs': 0, 'errors': 0, 'acquired': 0,
+                           'wait_total': 0.0, 'busy_total': 0.0}
+            self._latencies = deque(maxlen=POOL_LATENCY_WINDOW)
+            self._waits = deque(maxlen=POOL_LATENCY_WINDOW)
+            self._started = time.perf_counter()
+
+    def reset_stats(self):
+        """Pone a cero las métricas"""
+        self._reset_stats()
+        return self
+
+    @staticmethod
+    def _percentile(ordered, p):
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def stats(self):
+        """Métricas desde la creación (o reset_stats): peticiones, errores,
+        throughput (run/s), latencias de run() y esperas de acquire() sobre
+        las últimas POOL_LATENCY_WINDOW, y ocupación media del pool"""
+        with self._lock:
+            s = dict(self._stats)
+            latencies = sorted(self._latencies)
+            waits = sorted(self._waits)
+            elapsed = time.perf_counter() - self._started
+        pct = self._percentile
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize(),
+            'runs': s['runs'],
+            'errors': s['errors'],
+            'acquired': s['acquired'],
+            'elapsed': elapsed,
+            'throughput': s['runs'] / elapsed if elapsed > 0 else 0.0,
+            'latency_p50': pct(latencies, 0.50),
+            'latency_p95': pct(latencies, 0.95),
+            'latency_p99': pct(latencies, 0.99),
+            'latency_max': latencies[-1] if latencies else 0.0,
+            'wait_mean': s['wait_total'] / s['acquired'] if s['acquired'] else 0.0,
+            'wait_p95': pct(waits, 0.95),
+            'utilization': (s['busy_total'] / (elapsed * self.size)
+                            if elapsed > 0 else 0.0),
+            'build_time': self.build_time,
+        }
+
+    def print_stats(self):
+        """Imprime stats() en formato legible"""
+        s = self.stats()
+        ms = lambda v: f"{v * 1000:.3f} ms"
+        print(f"Pool: {s['size']} interpretes ({s['idle']} libres), "
+              f"creado en {ms(s['build_time'])}")
+        print(f"  Peticiones: {s['runs']} ({s['errors']} con error), "
+              f"{s['throughput']:,.0f} run/s, ocupacion {s['utilization']:.0%}")
+        print(f"  Latencia: p50 {ms(s['latency_p50'])}  p95 {ms(s['latency_p95'])}  "
+              f"p99 {ms(s['latency_p99'])}  max {ms(s['latency_max'])}")
+        print(f"  Espera: media {ms(s['wait_mean'])}  p95 {ms(s['wait_p95'])}")
+        return self
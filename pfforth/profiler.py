@@ -0,0 +1,513 @@
+"""
+PFForth Profiler - Per-word call counts, self time and inclusive time,
+a statistical micro-benchmark (bench) and the startup-time report
+"""
+
+import json
+import marshal
+import sys
+import time
+from collections import defaultdict
+
+
+BENCH_MIN_TIME = 0.005      # duración mínima de cada muestra (segundos)
+BENCH_MAX_BATCH = 1 << 20   # tope de iteraciones por muestra
+
+
+class ForthProfiler:
+    """Mixin providing a per-word profiler (profile-on / profile-report ...)
+
+    profile-on sustituye cada palabra de self.words y cada referencia
+    ('cached', name, fn) o recurse de los cuerpos compilados por un
+    envoltorio que mide el tiempo. profile-off restaura las funciones originales, así que
+    con el profiler apagado el intérprete no paga ningún coste.
+    """
+
+    _PROFILE_SORT_KEYS = ('self', 'total', 'calls', 'name')
+
+    def _register_profiler_words(self):
+        """Register profiler words"""
+        self.words['profile-on'] = self._profile_on
+        self.words['profile-off'] = self._profile_off
+        self.words['profile-reset'] = self._profile_reset
+        self.words['profile-report'] = self._profile_report_word
+        self.words['profile-report-by'] = self._profile_report_by
+        self.words['profile-save'] = self._profile_save
+        self.words['bench'] = self._bench_word
+        self.words['bench-mem'] = self._bench_mem_word
+        self.words['bench-last'] = self._bench_last
+        self.words['startup-report'] = self._startup_report_word
+        self._profile = None
+        self._profile_stats = {}
+        self._profile_edges = {}
+        self._last_bench = None
+
+    # ------------------------------------------------------------------ #
+    #  Cuerpos compilados                                                 #
+    # ------------------------------------------------------------------ #
+
+    # Capas de instrumentación: atributo que guarda la función envuelta ->
+    # método que vuelve a envolver (profiler y tracing pueden anidarse).
+    # La capa de memo: es permanente y siempre la más interna: se atraviesa
+    # pero nunca se quita ni se vuelve a crear.
+    _WRAP_LAYERS = {'_profiled': '_profile_wrap', '_traced': '_trace_wrap',
+                    '_memoized': None}
+
+    def _unwrap_word(self, fn):
+        """Devuelve la función original bajo todas las capas de instrumentación"""
+        while True:
+            inner = next((getattr(fn, attr) for attr in self._WRAP_LAYERS
+                          if hasattr(fn, attr)), None)
+            if inner is None:
+                return fn
+            fn = inner
+
+    def _has_layer(self, fn, attr):
+        """True si alguna capa de fn es del tipo attr"""
+        while fn is not None:
+            if hasattr(fn, attr):
+                return True
+            fn = next((getattr(fn, a) for a in self._WRAP_LAYERS if hasattr(fn, a)), None)
+        return False
+
+    def _strip_layer(self, name, fn, attr):
+        """Quita la capa attr de fn aunque no sea la más externa"""
+        if hasattr(fn, attr):
+            return getattr(fn, attr)
+        for other, rewrap in self._WRAP_LAYERS.items():
+            if hasattr(fn, other):
+                inner = getattr(fn, other)
+                stripped = self._strip_layer(name, inner, attr)
+                if stripped is inner:
+                    return fn
+                return getattr(self, rewrap)(name, stripped)
+        return fn
+
+    def _compiled_bodies(self):
+        """Genera (nombre, tokens compilados) de todas las palabras de usuario
+        (cuerpo normal y, si existe, cuerpo trusted)."""
+        seen = set()
+        for table in (self.words, self.immediate_words):
+            for name, fn in list(table.items()):
+                fn = self._unwrap_word(fn)
+                defaults = getattr(fn, '__defaults__', None)
+                if not defaults or not isinstance(defaults[0], list):
+                    continue
+                bodies = [defaults[0]]
+                if len(defaults) > 2 and defaults[2] is not None:
+                    bodies.append(defaults[2][1])
+                for body in bodies:
+                    if id(body) not in seen:
+                        seen.add(id(body))
+                        yield name, body
+
+    def _replace_cached(self, mapper):
+        """Aplica mapper(name, fn) a cada ('cached', name, fn) compilado y a
+        cada recurse (como llamada a la propia palabra)"""
+        for name, body in self._compiled_bodies():
+            self._map_body(name, body, mapper)
+
+    def _map_body(self, name, body, mapper):
+        """_replace_cached sobre un solo cuerpo, el de la palabra name.
+        recurse se compila como ('recurse',); instrumentado pasa a ser
+        ('recurse', fn) y vuelve a ('recurse',) al quitar la última capa."""
+        for i, op in enumerate(body):
+            if not isinstance(op, tuple):
+                continue
+            if len(op) == 3 and op[0] == 'cached':
+                new_fn = mapper(op[1], op[2])
+                if new_fn is not op[2]:
+                    body[i] = ('cached', op[1], new_fn)
+            elif op[0] == 'recurse':
+                fn = op[1] if len(op) > 1 else self._run_recurse
+                new_fn = mapper(name, fn)
+                if new_fn == self._run_recurse:
+                    body[i] = ('recurse',)
+                elif new_fn is not fn:
+                    body[i] = ('recurse', new_fn)
+
+    # ------------------------------------------------------------------ #
+    #  Instrumentación                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _profile_wrap(self, name, fn):
+        """Devuelve fn envuelta para contar llamadas y tiempos de name"""
+        if self._profile is None or self._has_layer(fn, '_profiled'):
+            return fn
+        prof = self._profile
+        frames = prof['frames']
+        active = prof['active']
+        stats = self._profile_stats
+        edges = self._profile_edges
+        clock = time.perf_counter
+
+        def profiled():
+            caller = frames[-1][0] if frames else None
+            frame = [name, 0.0]
+            frames.append(frame)
+            active[name] += 1
+            start = clock()
+            try:
+                fn()
+            finally:
+                elapsed = clock() - start
+                frames.pop()
+                active[name] -= 1
+                entry = stats.get(name)
+                if entry is None:
+                    entry = stats[name] = [0, 0.0, 0.0]
+                entry[0] += 1
+                entry[1] += elapsed - frame[1]
+                if not active[name]:
+                    entry[2] += elapsed
+                if frames:
+                    frames[-1][1] += elapsed
+                edge = edges.get((caller, name))
+                if edge is None:
+                    edge = edges[(caller, name)] = [0, 0.0]
+                edge[0] += 1
+                edge[1] += elapsed
+
+        profiled._profiled = fn
+        return profiled
+
+    def _profile_on(self):
+        """profile-on ( -- ) Activa el profiler por palabra"""
+        if self._profile is not None:
+            return
+        self._profile = {'frames': [], 'active': defaultdict(int)}
+        skip = {'profile-on', 'profile-off', 'profile-reset', 'profile-report',
+                'profile-report-by', 'profile-save'}
+        for name, fn in list(self.words.items()):
+            if name not in skip:
+                self.words[name] = self._profile_wrap(name, fn)
+        for name, fn in list(self.immediate_words.items()):
+            self.immediate_words[name] = self._profile_wrap(name, fn)
+        self._replace_cached(self._profile_wrap)
+
+    def _profile_off(self):
+        """profile-off ( -- ) Desactiva el profiler y restaura las palabras"""
+        if self._profile is None:
+            return
+        self._profile = None
+        unwrap = lambda name, fn: self._strip_layer(name, fn, '_profiled')
+        self._replace_cached(unwrap)
+        for table in (self.words, self.immediate_words):
+            for name, fn in list(table.items()):
+                table[name] = unwrap(name, fn)
+
+    def _profile_reset(self):
+        """profile-reset ( -- ) Borra las estadísticas acumuladas"""
+        self._profile_stats.clear()
+        self._profile_edges.clear()
+
+    # ------------------------------------------------------------------ #
+    #  Informes                                                           #
+    # ------------------------------------------------------------------ #
+
+    def profile_stats(self, sort='self'):
+        """Devuelve una lista de dicts {name, calls, self, total} ordenada"""
+        if sort not in self._PROFILE_SORT_KEYS:
+            raise ValueError(f"orden no valido: {sort} (usa {', '.join(self._PROFILE_SORT_KEYS)})")
+        rows = [{'name': name, 'calls': calls, 'self': self_t, 'total': total}
+                for name, (calls, self_t, total) in self._profile_stats.items()]
+        rows.sort(key=lambda r: r[sort], reverse=(sort != 'name'))
+        return rows
+
+    def profile_edges(self):
+        """Devuelve el grafo de llamadas como lista de dicts {caller, callee, calls, time}"""
+        return [{'caller': caller, 'callee': callee, 'calls': calls, 'time': t}
+                for (caller, callee), (calls, t) in self._profile_edges.items()]
+
+    def profile_report(self, sort='self', limit=25):
+        """Imprime el informe del profiler ordenado por sort"""
+        rows = self.profile_stats(sort)
+        if not rows:
+            print("Profiler: sin datos (usa profile-on y ejecuta algo)")
+            return self
+        print(f"{'Palabra':<24} {'Llamadas':>10} {'Propio (ms)':>12} {'Total (ms)':>12} {'us/llamada':>11}")
+        print("-" * 73)
+        for r in rows[:limit]:
+            per_call = r['total'] / r['calls'] * 1e6 if r['calls'] else 0.0
+            print(f"{r['name'][:24]:<24} {r['calls']:>10} {r['self'] * 1e3:>12.3f} "
+                  f"{r['total'] * 1e3:>12.3f} {per_call:>11.2f}")
+        if len(rows) > limit:
+            print(f"... {len(rows) - limit} palabras mas")
+        return self
+
+    def profile_export(self, path, fmt=None):
+        """Exporta las estadísticas a path en formato 'json' o 'pstats'.
+        Si fmt es None se deduce de la extensión (.json -> json)."""
+        if fmt is None:
+            fmt = 'json' if path.endswith('.json') else 'pstats'
+        if fmt == 'json':
+            data = {'words': self.profile_stats('self'), 'edges': self.profile_edges()}
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+        elif fmt == 'pstats':
+            # Formato de cProfile: {(fichero, linea, funcion): (cc, nc, tt, ct, callers)}
+            key = lambda name: ('forth', 0, name)
+            callers = defaultdict(dict)
+            for (caller, callee), (calls, t) in self._profile_edges.items():
+                if caller is not None:
+                    callers[callee][key(caller)] = (calls, calls, 0.0, t)
+            stats = {key(name): (calls, calls, self_t, total, callers[name])
+                     for name, (calls, self_t, total) in self._profile_stats.items()}
+            with open(path, 'wb') as f:
+                marshal.dump(stats, f)
+        else:
+            raise ValueError(f"formato no valido: {fmt} (usa json o pstats)")
+        return self
+
+    def _profile_report_word(self):
+        """profile-report ( -- ) Informe ordenado por tiempo propio"""
+        self.profile_report('self')
+
+    def _profile_report_by(self):
+        """profile-report-by ( str -- ) Informe ordenado por self, total, calls o name
+        Ejemplo: s" calls" profile-report-by"""
+        if not self.stack or not isinstance(self.stack[-1], str):
+            print("Error: PROFILE-REPORT-BY requiere self, total, calls o name")
+            return
+        sort = self.stack.pop()
+        if sort not in self._PROFILE_SORT_KEYS:
+            print(f"Error: orden no valido '{sort}' (usa self, total, calls o name)")
+            return
+        self.profile_report(sort)
+
+    def _profile_save(self):
+        """profile-save ( str -- ) Guarda el perfil: .json en JSON, otro en pstats
+        Ejemplo: s" perfil.prof" profile-save   (python -m pstats perfil.prof)"""
+        if not self.stack or not isinstance(self.stack[-1], str):
+            print("Error: PROFILE-SAVE requiere un nombre de fichero")
+            return
+        path = self.stack.pop()
+        try:
+            self.profile_export(path)
+            print(f"Perfil guardado en {path}")
+        except OSError as e:
+            print(f"Error PROFILE-SAVE: {e}")
+
+    # ------------------------------------------------------------------ #
+    #  Micro-benchmark                                                    #
+    # ------------------------------------------------------------------ #
+    # Cada muestra ejecuta la palabra k veces (k se calibra para que la
+    # muestra dure al menos BENCH_MIN_TIME) restaurando antes de cada
+    # llamada la pila que había al invocar bench. El coste del bucle y de
+    # la restauración se mide aparte con una función vacía y se descuenta.
+
+    def bench(self, word, n=20, warmup=3, memory=False, min_time=BENCH_MIN_TIME, quiet=False):
+        """Mide word con n muestras tras warmup ejecuciones de calentamiento.
+        Devuelve un dict con min, median, p95, mean (segundos por llamada),
+        ops_sec, samples e iterations; con memory=True añade alloc_bytes,
+        alloc_blocks y peak_bytes (tracemalloc) de una llamada.
+        Ejemplo: f.bench('fib', 30)"""
+        func = self._resolve_xt(word)
+        if func is None:
+            raise ValueError(f"palabra no encontrada: {word}")
+        if isinstance(word, tuple):
+            name = word[1]
+        elif isinstance(word, str):
+            name = word
+        else:
+            name = next((k for k, v in self.words.items() if v is func),
+                        getattr(func, '__name__', 'xt'))
+        n = max(1, int(n))
+        snapshot = list(self.stack)
+        clock = time.perf_counter
+
+        def batch(fn, k):
+            start = clock()
+            for _ in range(k):
+                self.stack[:] = snapshot
+                fn()
+            return clock() - start
+
+        try:
+            for _ in range(max(0, int(warmup))):
+                batch(func, 1)
+            k = 1
+            while k < BENCH_MAX_BATCH and batch(func, k) < min_time:
+                k *= 2
+            overhead = min(batch(lambda: None, k) for _ in range(3))
+            samples = sorted(max(batch(func, k) - overhead, 0.0) / k for _ in range(n))
+            mid = n // 2
+            median = samples[mid] if n % 2 else (samples[mid - 1] + samples[mid]) / 2
+            result = {
+                'word': name,
+                'samples': n,
+                'iterations': k,
+                'min': samples[0],
+                'median': median,
+                'p95': samples[min(n - 1, int(0.95 * n))],
+                'mean': sum(samples) / n,
+            }
+            result['ops_sec'] = 1.0 / median if median > 0 else float('inf')
+            if memory:
+                result.update(self._bench_memory(func, snapshot))
+        finally:
+            self.stack[:] = snapshot
+        self._last_bench = result
+        if not quiet:
+            self._bench_print(result)
+        return result
+
+    def _bench_memory(self, func, snapshot):
+        """Asignaciones de una llamada a func medidas con tracemalloc"""
+        import tracemalloc
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            self.stack[:] = snapshot
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        diff = after.compare_to(before, 'lineno')
+        return {
+            'alloc_bytes': sum(d.size_diff for d in diff if d.size_diff > 0),
+            'alloc_blocks': sum(d.count_diff for d in diff if d.count_diff > 0),
+            'peak_bytes': max(0, peak - base),
+        }
+
+    @staticmethod
+    def _bench_fmt(seconds):
+        """Formatea un tiempo por llamada con la unidad adecuada"""
+        if seconds < 1e-6:
+            return f"{seconds * 1e9:.1f} ns"
+        if seconds < 1e-3:
+            return f"{seconds * 1e6:.2f} us"
+        if seconds < 1:
+            return f"{seconds * 1e3:.2f} ms"
+        return f"{seconds:.3f} s"
+
+    def _bench_print(self, r):
+        """Imprime el resultado de bench"""
+        fmt = self._bench_fmt
+        print(f"bench {r['word']}: {r['samples']} muestras x {r['iterations']} iteraciones")
+        print(f"  min {fmt(r['min'])}  mediana {fmt(r['median'])}  p95 {fmt(r['p95'])}  "
+              f"({r['ops_sec']:,.0f} ops/s)")
+        if 'alloc_bytes' in r:
+            print(f"  memoria: {r['alloc_bytes']} bytes en {r['alloc_blocks']} bloques retenidos, "
+                  f"pico {r['peak_bytes']} bytes")
+
+    def _bench_from_stack(self, memory):
+        """Comun a bench y bench-mem: ( xt n -- )"""
+        word = 'BENCH-MEM' if memory else 'BENCH'
+        if len(self.stack) < 2 or not isinstance(self.stack[-1], int):
+            print(f"Error: {word} requiere xt n")
+            return
+        n = self.stack.pop()
+        xt = self.stack.pop()
+        if self._resolve_xt(xt) is None:
+            print(f"Error: {word} requiere un xt valido")
+            return
+        try:
+            self.bench(xt, n, memory=memory)
+        except Exception as e:
+            print(f"Error {word}: {e}")
+
+    def _bench_word(self):
+        """bench ( xt n -- ) Micro-benchmark con n muestras: min, mediana, p95, ops/s
+        Ejemplo: 20 ' fib 30 bench   (los valores bajo xt se restauran en cada llamada)"""
+        self._bench_from_stack(False)
+
+    def _bench_mem_word(self):
+        """bench-mem ( xt n -- ) Como bench e informa además de asignaciones (tracemalloc)"""
+        self._bench_from_stack(True)
+
+    def _bench_last(self):
+        """bench-last ( -- dict ) Resultado del último bench como diccionario"""
+        self.stack.append(dict(self._last_bench) if self._last_bench else {})
+
+    # ------------------------------------------------------------------ #
+    #  Informe de arranque                                                #
+    # ------------------------------------------------------------------ #
+
+    def _import_times(self):
+        """Tiempos de importación de pfforth en un proceso nuevo
+        (python -X importtime). Devuelve [(módulo, propio, acumulado, deps)]
+        con deps = [(módulo, acumulado)] de sus dependencias directas."""
+        import subprocess
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import pfforth'],
+                              capture_output=True, text=True, timeout=60,
+                              cwd=self._base_dir)
+        # La salida está en post-orden: los hijos aparecen antes que el padre
+        pending = defaultdict(list)
+        modules = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            try:
+                self_us, cum_us, name = line[len('import time:'):].split('|')
+                self_t, cum_t = int(self_us) / 1e6, int(cum_us) / 1e6
+            except ValueError:
+                continue
+            level = (len(name) - len(name.lstrip())) // 2
+            name = name.strip()
+            deps = pending.pop(level + 1, [])
+            pending[level].append((name, cum_t))
+            if name.startswith('pfforth'):
+                modules.append((name, self_t, cum_t, sorted(deps, key=lambda d: -d[1])))
+        return modules
+
+    def startup_report(self, imports=True, min_dep=0.001):
+        """Imprime y devuelve el desglose del arranque: importación por
+        módulo (en un proceso nuevo si imports=True), construcción de esta
+        instancia por mixin y vocabularios importados con 'import'."""
+        from . import IMPORT_TIME
+        times = dict(getattr(self, '_startup_times', {}))
+        template = type(self).__dict__.get('_word_template')
+        report = {'import_pfforth': IMPORT_TIME, 'construction': times,
+                  'class_registration': template['times'] if template else None,
+                  'vocabularies': dict(getattr(self, '_vocab_times', {})),
+                  'modules': []}
+        ms = lambda t: f"{t * 1e3:8.2f} ms"
+
+        print("Informe de arranque de PFForth")
+        print(f"  import pfforth (este proceso): {ms(IMPORT_TIME)}")
+        if sys.dont_write_bytecode:
+            print("  (aviso: PYTHONDONTWRITEBYTECODE activo; los modulos se recompilan en cada arranque)")
+        if imports:
+            try:
+                modules = self._import_times()
+            except Exception as e:
+                print(f"  (no se pudo medir la importacion por modulo: {e})")
+                modules = []
+            report['modules'] = [{'module': m, 'self': st, 'cumulative': ct,
+                                  'deps': dict(deps)} for m, st, ct, deps in modules]
+            if modules:
+                print("\n  Importacion por modulo (proceso nuevo, acumulado):")
+                for name, self_t, cum_t, deps in modules:
+                    print(f"    {name:<24}{ms(cum_t)}  (propio {ms(self_t).strip()})")
+                    for dep, dep_t in deps:
+                        if dep_t >= min_dep and not dep.startswith('pfforth'):
+                            print(f"      <- {dep:<19}{ms(dep_t)}")
+
+        total = times.pop('total', None)
+        print("\n  Construccion de esta instancia:")
+        for label, t in times.items():
+            print(f"    {label:<24}{ms(t)}")
+        if total is not None:
+            print(f"    {'total':<24}{ms(total)}")
+        if template and 'plantilla' in times:
+            print("    (palabras enlazadas desde la plantilla de la clase; registro inicial:)")
+            for label, t in template['times'].items():
+                if label not in ('core', 'total'):
+                    print(f"      {label:<22}{ms(t)}")
+
+        if report['vocabularies']:
+            print("\n  Vocabularios importados:")
+            for name, t in report['vocabularies'].items():
+                print(f"    {name:<24}{ms(t)}")
+        return report
+
+    def _startup_report_word(self):
+        """startup-report ( -- ) Desglose del tiempo de importación y construcción"""
+        self.startup_report()
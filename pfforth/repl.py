@@ -4,6 +4,8 @@ PFForth REPL - Interactive Read-Eval-Print Loop and DSL interface
 
 import sys
 import time
+from itertools import repeat
+from types import MethodType
 
 from .core import ForthBase, ForthException, clear_screen
 from .arithmetic import ForthArithmetic
@@ -15,32 +17,134 @@ from .io_words import ForthIO
 from .persistence import ForthPersistence
 from .optimizations import ForthOptimizations
 from .actors import ForthActors
+from .profiler import ForthProfiler
+from .tracing import ForthTracing
+from .parallel import ForthParallel
+
+
+def _unchecked_underflow(exc):
+    """True si el IndexError exc salió de una primitiva *_unchecked (pila
+    insuficiente) y no del código del usuario (índices de listas o cadenas)"""
+    tb = exc.__traceback__
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return tb.tb_frame.f_code.co_name.endswith('_unchecked')
 
 
 class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
             ForthControlFlow, ForthCompiler, ForthIO, ForthPersistence,
-            ForthOptimizations, ForthActors):
+            ForthOptimizations, ForthActors, ForthProfiler,
+            ForthTracing, ForthParallel):
     """Complete Forth interpreter combining all mixins"""
 
+    # Registro de palabras por mixin, en orden. La primera instancia de cada
+    # clase lo ejecuta y guarda una plantilla (funciones sin enlazar + estado
+    # inicial); las siguientes solo enlazan la plantilla a self.
+    _REGISTRATIONS = (
+        ('arithmetic', '_register_arithmetic_words'),
+        ('stack', '_register_stack_words'),
+        ('memory', '_register_memory_words'),
+        ('control_flow', '_register_control_flow_words'),
+        ('compiler', '_register_compiler_words'),
+        ('io', '_register_io_words'),
+        ('persistence', '_register_persistence_words'),
+        ('optimizations', '_register_optimization_words'),
+        ('actors', '_register_actor_words'),
+        ('profiler', '_register_profiler_words'),
+        ('tracing', '_register_tracing_words'),
+        ('parallel', '_register_parallel_words'),
+        ('repl', '_register_repl_words'),
+    )
+
     def __init__(self):
+        clock = time.perf_counter
+        start = clock()
         super().__init__()
+        self._startup_times = {'core': clock() - start}
+        self._vocab_times = {}
         self._register_all_words()
+        self._startup_times['total'] = clock() - start
 
     def _register_all_words(self):
         """Register all words from all mixins"""
-        self._register_arithmetic_words()
-        self._register_stack_words()
-        self._register_memory_words()
-        self._register_control_flow_words()
-        self._register_compiler_words()
-        self._register_io_words()
-        self._register_persistence_words()
-        self._register_optimization_words()
-        self._register_actor_words()
+        template = type(self).__dict__.get('_word_template')
+        if template:
+            start = time.perf_counter()
+            self._bind_word_template(template)
+            self._startup_times['plantilla'] = time.perf_counter() - start
+            return
+
+        clock = time.perf_counter
+        before = dict(vars(self))
+        for label, method in self._REGISTRATIONS:
+            start = clock()
+            getattr(self, method)()
+            self._startup_times[label] = clock() - start
+        if '_primitive_funcs' not in type(self).__dict__:
+            # Primitivas tal como se registraron (modo trusted: saber si
+            # un nombre sigue siendo la primitiva o el usuario lo redefinió)
+            type(self)._primitive_funcs = {
+                name: fn.__func__ for name, fn in self.words.items()
+                if getattr(fn, '__self__', None) is self}
+        if template is None:
+            type(self)._word_template = self._build_word_template(before)
+
+    def _register_repl_words(self):
+        """Register REPL words"""
         self.words['help'] = self._help
         self.words['replit-mode'] = self._set_replit_mode
         self.words['standard-mode'] = self._set_standard_mode
         self._replit_mode = False
+
+    def _build_word_template(self, before):
+        """Plantilla de la clase a partir de esta instancia recién registrada,
+        o False si algo no se puede reproducir (se registrará siempre)."""
+        streams = {id(sys.stdin): 'stdin', id(sys.stdout): 'stdout'}
+        tables = []
+        variables = []
+        for table in (self.words, self.immediate_words):
+            names, funcs = [], []
+            for name, fn in table.items():
+                if getattr(fn, '__self__', None) is self:
+                    func = fn.__func__
+                elif table is self.words and name in self.variables:
+                    # Se recrea con _create_variable; conserva su posición
+                    func = ForthBase._create_variable
+                    variables.append(name)
+                else:
+                    return False
+                names.append(name)
+                funcs.append(func)
+            tables.append((tuple(names), tuple(funcs)))
+        state = {}
+        for attr, value in vars(self).items():
+            if attr in ('words', 'immediate_words', '_startup_times') or before.get(attr, state) is value:
+                continue
+            if id(value) in streams:
+                state[attr] = ('stream', streams[id(value)])
+            elif value is None or isinstance(value, (bool, int, float, str)):
+                state[attr] = ('value', value)
+            elif isinstance(value, (list, dict)) and not value:
+                state[attr] = ('new', type(value))
+            else:
+                return False
+        return {'tables': tables, 'state': state, 'variables': dict(self.variables),
+                'variable_words': variables, 'times': dict(self._startup_times)}
+
+    def _bind_word_template(self, template):
+        """Enlaza a self las palabras y el estado inicial de la plantilla"""
+        for attr, (kind, value) in template['state'].items():
+            if kind == 'stream':
+                value = getattr(sys, value)
+            elif kind == 'new':
+                value = value()
+            setattr(self, attr, value)
+        for table, (names, funcs) in zip((self.words, self.immediate_words),
+                                         template['tables']):
+            table.update(zip(names, map(MethodType, funcs, repeat(self))))
+        for name in template['variable_words']:
+            self._create_variable(name)
+        self.variables.update(template['variables'])
     
     def execute(self, text):
         """Execute Forth code"""
@@ -79,8 +183,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                         self._current_definition.append(token)
                         self._current_source.append(f'." {token[1]}"')
                     else:
-                        self._forth_output.write(token[1])
-                        self._forth_output.flush()
+                        self._out(token[1])
                 elif token[0] == 'literal':
                     self.stack.append(token[1])
                 elif token[0] == 'cached':
@@ -147,6 +250,29 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                     continue
             
             
+            if token == 'memo:':
+                if i + 1 < len(tokens):
+                    name = tokens[i + 1]
+                    effect = tokens[i + 2] if i + 2 < len(tokens) else None
+                    if not (isinstance(effect, tuple) and effect[0] == 'stack_effect'):
+                        print(f"Error: MEMO: requiere el efecto de pila: memo: {name} ( n -- n' )")
+                        i += 2
+                        continue
+                    counts = self._parse_stack_effect(effect[1])
+                    if counts is None:
+                        print(f"Error: MEMO: efecto de pila no valido '( {effect[1]} )'")
+                        i += 3
+                        continue
+                    self._current_name = name
+                    self._defining = True
+                    self._current_definition = []
+                    self._current_locals = []
+                    self._current_source = ['memo:', name, f'( {effect[1]} )']
+                    self._memo_pending = counts
+                    self.variables['state'] = -1
+                    i += 3
+                    continue
+            
             if token == ';':
                 if self._defining:
                     self._current_source.append(';')
@@ -230,6 +356,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                             num = self._parse_number(token)
                             self._current_definition.append(('literal', num))
                         except:
+                            self._flush_output()
                             print(f"Error: palabra desconocida '{token}'")
                             self._defining = False
                             self._current_definition = []
@@ -251,6 +378,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                             num = self._parse_number(token)
                             self._current_definition.append(('literal', num))
                         except:
+                            self._flush_output()
                             print(f"Error: palabra desconocida '{token}'")
                             self._defining = False
                             self._current_definition = []
@@ -457,6 +585,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                     self.stack.append(num)
                 except:
                     if token:
+                        self._flush_output()
                         print(f"? {token}")
             
             if self._input_index > old_index:
@@ -581,10 +710,18 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
         
         compiled_def = self._compile_definition(self._current_definition)
         local_names = self._current_locals[:]
+        trusted = None
+        if self._trusted_mode:
+            trusted = self._trusted_variant(compiled_def, local_names)
         
-        def word_action(definition=compiled_def, locals_list=local_names):
+        def word_action(definition=compiled_def, locals_list=local_names,
+                        trusted=trusted):
+            # Modo trusted: una sola comprobación de profundidad al entrar
+            if trusted is not None and len(self.stack) >= trusted[0]:
+                definition = trusted[1]
             if locals_list:
                 if len(self.stack) < len(locals_list):
+                    self._flush_output()
                     print(f"Error: no hay suficientes valores para locals")
                     return
                 local_dict = {}
@@ -594,15 +731,45 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
             
             try:
                 self._run_compiled(definition, locals_list)
+            except IndexError as e:
+                # Underflow en una primitiva *_unchecked: solo posible si una
+                # palabra llamada cambió su efecto de pila tras verificarse.
+                # Cualquier otro IndexError es del programa y sigue su curso.
+                if trusted is None or definition is not trusted[1] \
+                        or not _unchecked_underflow(e):
+                    raise
+                self._flush_output()
+                print("Error: pila insuficiente (modo trusted)")
             finally:
                 if locals_list:
                     self._locals_stack.pop()
         
+        memo = self._memo_pending
+        self._memo_pending = None
+        self._memo_caches.pop(self._current_name, None)
+        if memo is not None:
+            word_action = self._memo_word(self._current_name, word_action, memo,
+                                          compiled_def, local_names)
+        
+        bodies = [compiled_def] if trusted is None else [compiled_def, trusted[1]]
+        if self._profile is not None and not self._noname_mode:
+            word_action = self._profile_wrap(self._current_name, word_action)
+            for body in bodies:
+                self._map_body(self._current_name, body, self._profile_wrap)
+        if self._trace is not None and not self._noname_mode:
+            word_action = self._trace_wrap(self._current_name, word_action)
+            for body in bodies:
+                self._map_body(self._current_name, body, self._trace_wrap)
+        
         if self._noname_mode:
             self._noname_mode = False
             self.stack.append(word_action)
         else:
             self.words[self._current_name] = word_action
+            if trusted is not None:
+                self._word_effects[self._current_name] = trusted[2]
+            else:
+                self._word_effects.pop(self._current_name, None)
             self._definition_order.append(('word', self._current_name))
             self._definition_source[self._current_name] = ' '.join(str(t) for t in self._current_source)
             self._last_defined_word = self._current_name
@@ -634,6 +801,10 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
         else:
             self._run_compiled_inner(compiled, local_names)
     
+    def _run_recurse(self):
+        """recurse: vuelve a ejecutar el cuerpo de la palabra en curso"""
+        self._run_compiled(self._recurse_context[0], self._recurse_context[1])
+    
     def _run_compiled_inner(self, compiled, local_names):
         """Inner implementation of run_compiled"""
         i = 0
@@ -666,8 +837,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                 elif op == 'string':
                     self.stack.append(token[1])
                 elif op == 'print_string':
-                    self._forth_output.write(token[1])
-                    self._forth_output.flush()
+                    self._out(token[1])
                 elif op == 'py_eval':
                     self._execute_py_eval(token[1])
                 elif op == 'py_exec':
@@ -707,7 +877,9 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                     i = end_idx
                     continue
                 elif op == 'recurse':
-                    if hasattr(self, '_recurse_context') and self._recurse_context:
+                    if len(token) > 1:          # instrumentado (profiler / traza)
+                        token[1]()
+                    elif hasattr(self, '_recurse_context') and self._recurse_context:
                         self._run_compiled(self._recurse_context[0], self._recurse_context[1])
                     else:
                         self._run_compiled(compiled, local_names)
@@ -751,6 +923,7 @@ class Forth(ForthBase, ForthArithmetic, ForthStack, ForthMemory,
                     self.stack.append(num)
                 except:
                     if token:
+                        self._flush_output()
                         print(f"? {token}")
             
             i += 1
@@ -1114,6 +1287,11 @@ class ForthREPL:
             print("(Modo Replit - usa 'standard-mode' para desactivar)")
         print()
         
+        # En el REPL basta con vaciar la salida al final de cada línea: el
+        # prompt, key, accept y los mensajes de error ya hacen flush.  Se
+        # respeta un modo elegido antes de entrar (flush-full, flush-explicit).
+        if self._flush_mode == 'always':
+            self._set_flush_mode('line')
         
         while True:
             try:
@@ -1124,6 +1302,8 @@ class ForthREPL:
                 else:
                     prompt = "OK> "
                 
+                self._flush_output()
+                
                 try:
                     if getattr(self, '_tty_needs_restore', False):
                         # key() manipuló el terminal (setcbreak).
@@ -1250,10 +1430,13 @@ class ForthREPL:
                     print()
                 
             except KeyboardInterrupt:
+                self._flush_output()
                 print("\n(Ctrl+C) Usa 'bye' para salir")
             except Exception as e:
+                self._flush_output()
                 print(f"Error: {e}")
         
+        self._flush_output()
         return self
 
 
@@ -1767,6 +1950,7 @@ class InteractiveForth(Forth, ForthREPL):
             if result is not None:
                 self.stack.append(result)
         except Exception as e:
+            self._flush_output()
             print(f"Error py\": {e}")
     
     def _execute_py_exec(self, code):
@@ -1787,6 +1971,7 @@ class InteractiveForth(Forth, ForthREPL):
         try:
             exec(code, env)
         except Exception as e:
+            self._flush_output()
             print(f"Error py{{}}: {e}")
     
     def _help(self):
@@ -1824,9 +2009,21 @@ class InteractiveForth(Forth, ForthREPL):
         print("    open-file close-file create-file delete-file")
         print("    read-file read-line write-file write-line")
         print("    file-position reposition-file file-size file-exists?")
+        print("    r/o w/o r/w bin  (bin = acceso binario con buffer interno)")
+        print("    file-each-line file-each-record  (xt por cada linea/registro)")
         print("\n  Sistema: words see help measure forget bye abort")
-        print("  Optimizacion: cache-on cache-off cache?")
+        print("  Optimizacion: cache-on cache-off cache? trusted-on trusted-off trusted?")
+        print("                memo: nombre ( n -- n' ) ... ;  memo-stats memo-clear memo-size!")
         print("  Persistencia: save load lsforth code endcode import lscode")
+        print("  Profiler: profile-on profile-off profile-reset profile-report")
+        print("            profile-report-by profile-save")
+        print("  Bench: bench ( xt n -- ) bench-mem bench-last startup-report")
+        print("  Traza: trace-ring-on ( n -- ) trace-ring-off trace-dump")
+        print("         actor-sample-on ( ms -- ) actor-sample-off actor-sample-report")
+        print("  Paralelo: par-map ( xt lo hi -- results ) par-workers! par-workers? par-stop")
+        print("            sweep ( xt spec -- )  spec: s\" a=0:10:2 b=1,2,3 -> salida\"")
+        print("  Salida: flush-always flush-line flush-full flush-explicit")
+        print("          flush-size! flush-mode? flush-out")
         print("\n" + "=" * 70)
         print("Usa 'words' para ver todas las palabras disponibles")
         print("=" * 70)
@@ -1946,6 +2143,10 @@ class InteractiveForth(Forth, ForthREPL):
                 ("dsl_methods()", "Lista metodos DSL (este)"),
                 ("help()", "Ayuda general"),
                 ("measure(word)", "Mide tiempo de ejecucion"),
+                ("bench(word, n)", "Micro-benchmark: min/mediana/p95 (dict)"),
+                ("startup_report()", "Desglose del tiempo de arranque"),
+                ("par_map(word, lo, hi)", "Mapa paralelo en procesos (lista)"),
+                ("sweep(word, params)", "Barrido de parametros -> dataset IA"),
             ],
         }
         for category, methods in dsl_categories.items():
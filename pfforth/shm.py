@@ -0,0 +1,330 @@
+"""
+PFForth shared memory - recycled shared-memory segments for large actor payloads
+"""
+
+import struct
+import sys
+import threading
+import time
+import weakref
+
+
+SHM_MIN_BYTES = 64 * 1024   # por debajo, el payload viaja serializado (pickle)
+SHM_POOL_MAX = 32           # segmentos propios por proceso
+SHM_HEADER = 64             # estado + generación; los datos quedan alineados
+SHM_CLOSE_WAIT = 0.5        # close(): espera máxima a que se mapeen los enviados
+
+# LIBRE -> OCUPADO (export) -> MAPEADO (import de un ndarray) -> LIBRE
+_FREE, _BUSY, _MAPPED = 0, 1, 2
+_HDR = struct.Struct('<II')  # estado, generación
+
+
+class ShmHandle:
+    """Lo que viaja por la tubería en lugar de un ndarray o bytes grandes:
+    nombre del segmento, generación y forma de los datos.  shape None =
+    bytes."""
+
+    __slots__ = ('name', 'gen', 'nbytes', 'shape', 'dtype')
+
+    def __init__(self, name, gen, nbytes, shape=None, dtype=None):
+        self.name   = name
+        self.gen    = gen
+        self.nbytes = nbytes
+        self.shape  = shape
+        self.dtype  = dtype
+
+    def __reduce__(self):
+        return (ShmHandle, (self.name, self.gen, self.nbytes, self.shape, self.dtype))
+
+    def __repr__(self):
+        what = f"{self.dtype}{list(self.shape)}" if self.shape is not None else "bytes"
+        return f"<ShmHandle {self.name} gen={self.gen} {what} {self.nbytes}B>"
+
+
+class _Segment:
+    __slots__ = ('shm', 'size', 'gen', 'exported')
+
+    def __init__(self, shm):
+        self.shm      = shm
+        self.size     = shm.size
+        self.gen      = 0
+        self.exported = -1    # generación entregada a otro proceso
+
+
+class SegmentPool:
+    """Segmentos de memoria compartida de este proceso, reciclados.
+
+    La cabecera de cada segmento dice si está libre u ocupado y su
+    generación.  El proceso dueño ocupa un segmento libre para cada payload
+    (export); el receptor lo mapea sin copiar (import) y lo libera al
+    soltar la última referencia al ndarray (o con release), escribiendo
+    LIBRE en la cabecera: el dueño lo vuelve a usar para el siguiente.
+    Cada handle tiene un único receptor; si muere sin soltarlo, reclaim
+    lo devuelve al pool.
+    """
+
+    def __init__(self, max_segments=SHM_POOL_MAX):
+        self.max_segments = max_segments
+        # RLock: un finalizer de _track puede saltar dentro de la sección
+        self._lock     = threading.RLock()
+        self._segments = []      # propios
+        self._attached = {}      # nombre -> SharedMemory de otros procesos
+        self._views    = {}      # dirección de datos -> (generación, finalize)
+        self.stats = {'created': 0, 'exported': 0, 'zero_copy': 0, 'copied': 0,
+                      'fallback': 0, 'imported': 0, 'released': 0,
+                      'reclaimed': 0}
+
+    # -- dueño ------------------------------------------------------------
+
+    def _acquire(self, nbytes):
+        """Ocupa el segmento libre más pequeño que quepa (o crea uno);
+        None si el pool está lleno"""
+        from multiprocessing import shared_memory
+        need = nbytes + SHM_HEADER
+        with self._lock:
+            best = None
+            for seg in self._segments:
+                if seg.size >= need and (best is None or seg.size < best.size) \
+                        and _HDR.unpack_from(seg.shm.buf, 0)[0] == _FREE:
+                    best = seg
+            if best is None:
+                if len(self._segments) >= self.max_segments:
+                    self.stats['fallback'] += 1
+                    return None
+                size = max(SHM_MIN_BYTES, 1 << (need - 1).bit_length())
+                best = _Segment(shared_memory.SharedMemory(create=True, size=size))
+                self._segments.append(best)
+                self.stats['created'] += 1
+            best.gen = (best.gen + 1) & 0xFFFFFFFF
+            _HDR.pack_into(best.shm.buf, 0, _BUSY, best.gen)
+            return best
+
+    def alloc(self, shape, dtype='uint8'):
+        """ndarray escrito directamente en un segmento del pool: enviarlo
+        a un actor de proceso no copia nada.  No lo reutilices después de
+        enviarlo; pide otro."""
+        import numpy as np
+        dtype = np.dtype(dtype)
+        shape = tuple(int(n) for n in (shape if isinstance(shape, (list, tuple)) else (shape,)))
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        seg = self._acquire(nbytes)
+        if seg is None:
+            return np.empty(shape, dtype)
+        arr = np.ndarray(shape, dtype, buffer=seg.shm.buf, offset=SHM_HEADER)
+        self._track(arr, seg.shm, seg.gen, owner=True)
+        return arr
+
+    def export(self, value):
+        """ShmHandle para value (ndarray o bytes grandes), o None si debe
+        viajar serializado"""
+        if isinstance(value, (bytes, bytearray)):
+            if len(value) < SHM_MIN_BYTES:
+                return None
+            seg = self._acquire(len(value))
+            if seg is None:
+                return None
+            seg.shm.buf[SHM_HEADER:SHM_HEADER + len(value)] = value
+            seg.exported = seg.gen
+            self.stats['exported'] += 1
+            self.stats['copied'] += 1
+            return ShmHandle(seg.shm.name, seg.gen, len(value))
+
+        np = sys.modules.get('numpy')
+        if np is None or not isinstance(value, np.ndarray) \
+                or value.nbytes < SHM_MIN_BYTES or value.dtype.hasobject:
+            return None
+        seg = self._owner(value)
+        if seg is not None:
+            self.stats['zero_copy'] += 1
+        else:
+            seg = self._acquire(value.nbytes)
+            if seg is None:
+                return None
+            np.ndarray(value.shape, value.dtype, buffer=seg.shm.buf,
+                       offset=SHM_HEADER)[...] = value
+            self.stats['copied'] += 1
+        seg.exported = seg.gen
+        self.stats['exported'] += 1
+        return ShmHandle(seg.shm.name, seg.gen, value.nbytes,
+                         value.shape, value.dtype.str)
+
+    def _owner(self, arr):
+        """Segmento propio del que arr (de alloc) es la vista completa"""
+        if not arr.flags['C_CONTIGUOUS']:
+            return None
+        addr = arr.__array_interface__['data'][0]
+        for seg in self._segments:
+            if seg.exported != seg.gen and seg.size - SHM_HEADER >= arr.nbytes \
+                    and self._data_addr(seg.shm) == addr:
+                return seg
+        return None
+
+    @staticmethod
+    def _data_addr(shm):
+        import numpy as np
+        return np.frombuffer(shm.buf, np.uint8, 1, SHM_HEADER).__array_interface__['data'][0]
+
+    # -- receptor ---------------------------------------------------------
+
+    def _shm(self, name):
+        for seg in self._segments:
+            if seg.shm.name == name:
+                return seg.shm
+        shm = self._attached.get(name)
+        if shm is None:
+            from multiprocessing import shared_memory
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            except FileNotFoundError:
+                raise ValueError(f"segmento {name} ya no existe")
+            self._attached[name] = shm
+        return shm
+
+    def import_(self, handle):
+        """Valor de un ShmHandle: bytes (copiados; el segmento se libera en
+        el acto) o un ndarray que mapea el segmento sin copiar"""
+        with self._lock:
+            shm = self._shm(handle.name)
+            state, gen = _HDR.unpack_from(shm.buf, 0)
+            if state != _BUSY or gen != handle.gen:
+                raise ValueError(f"{handle!r} caducado (ya liberado)")
+            self.stats['imported'] += 1
+            if handle.shape is not None:
+                # el dueño ya puede borrar el nombre: el mapeo sigue vivo
+                _HDR.pack_into(shm.buf, 0, _MAPPED, gen)
+        if handle.shape is None:
+            data = bytes(shm.buf[SHM_HEADER:SHM_HEADER + handle.nbytes])
+            self._release(handle.name, handle.gen)
+            return data
+        import numpy as np
+        arr = np.ndarray(handle.shape, np.dtype(handle.dtype), buffer=shm.buf,
+                         offset=SHM_HEADER)
+        self._track(arr, shm, handle.gen)
+        return arr
+
+    def _track(self, arr, shm, gen, owner=False):
+        """Libera el segmento cuando arr (y sus vistas) desaparezcan.
+        owner: arr es de alloc; si ya se envió, el segmento es del receptor"""
+        addr = arr.__array_interface__['data'][0]
+        fin = weakref.finalize(arr, self._release, shm.name, gen, addr, owner)
+        self._views[addr] = (gen, fin)
+
+    def _release(self, name, gen, addr=None, owner=False):
+        with self._lock:
+            if addr is not None and self._views.get(addr, (None,))[0] == gen:
+                del self._views[addr]
+            if owner and any(s.shm.name == name and s.exported == gen
+                             for s in self._segments):
+                return False
+            try:
+                shm = self._shm(name)
+            except ValueError:
+                return False
+            state, current = _HDR.unpack_from(shm.buf, 0)
+            if state == _FREE or current != gen:
+                return False
+            _HDR.pack_into(shm.buf, 0, _FREE, gen)
+            self.stats['released'] += 1
+            return True
+
+    def reclaim(self, handles):
+        """Libera los segmentos de handles ({nombre: generación}) enviados
+        a un actor que ya no existe: los que no llegó a leer o a soltar.
+        Devuelve cuántos vuelven al pool."""
+        n = sum(1 for name, gen in list(handles.items()) if self._release(name, gen))
+        with self._lock:
+            self.stats['reclaimed'] += n
+        return n
+
+    def release(self, arr):
+        """Devuelve ya al pool el segmento de arr (o de la vista de la que
+        procede).  arr no debe usarse después."""
+        np = sys.modules.get('numpy')
+        while np is not None and isinstance(arr, np.ndarray):
+            view = self._views.get(arr.__array_interface__['data'][0])
+            if view is not None:
+                view[1]()
+                return True
+            arr = arr.base
+        return False
+
+    # -- general ----------------------------------------------------------
+
+    def report(self):
+        """Estado del pool: segmentos, ocupados, bytes y contadores"""
+        with self._lock:
+            busy = sum(1 for s in self._segments
+                       if _HDR.unpack_from(s.shm.buf, 0)[0] != _FREE)
+            return dict(self.stats, segments=len(self._segments), busy=busy,
+                        bytes=sum(s.size for s in self._segments),
+                        attached=len(self._attached))
+
+    def _unread(self):
+        """True si algún segmento enviado aún no lo ha importado el receptor"""
+        with self._lock:
+            return any(s.exported == s.gen and
+                       _HDR.unpack_from(s.shm.buf, 0) == (_BUSY, s.gen)
+                       for s in self._segments)
+
+    def close(self, wait=0):
+        """Desmapea y borra los segmentos propios (al salir del proceso).
+        wait: segundos como máximo a que los receptores mapeen lo enviado;
+        borrado el nombre, un handle sin importar ya no se puede abrir."""
+        deadline = time.monotonic() + wait
+        while wait and self._unread() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with self._lock:
+            for _, fin in list(self._views.values()):
+                fin.detach()
+            self._views.clear()
+            for seg in self._segments:
+                try:
+                    seg.shm.unlink()
+                    seg.shm.close()
+                except (BufferError, FileNotFoundError):
+                    pass
+            for shm in self._attached.values():
+                try:
+                    shm.close()
+                except BufferError:
+                    pass
+            self._segments.clear()
+            self._attached.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool de segmentos de este proceso (se crea al primer uso)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import atexit
+                _pool = SegmentPool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def to_wire(value):
+    """value tal cual, o su ShmHandle si es un ndarray / bytes grande"""
+    if isinstance(value, (int, float, str, ShmHandle)) or value is None:
+        return value
+    return get_pool().export(value) or value
+
+
+def close_pool(wait=SHM_CLOSE_WAIT):
+    """Cierra el pool de este proceso si se llegó a crear.  Los procesos
+    hijo lo llaman al terminar: sin atexit fiable (terminate, os._exit) sus
+    segmentos quedarían sin borrar."""
+    if _pool is not None:
+        _pool.close(wait)
+
+
+def from_wire(value):
+    """Deshace to_wire en el proceso receptor"""
+    if type(value) is ShmHandle:
+        return get_pool().import_(value)
+    return value
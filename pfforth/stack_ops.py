@@ -5,6 +5,27 @@ PFForth Stack Operations - Stack manipulation words
 import sys
 
 
+# Efecto de pila de las primitivas para el modo trusted:
+# nombre -> (entradas, salidas, variante sin comprobación o None)
+TRUSTED_STACK_EFFECTS = {
+    'dup':   (1, 2, '_dup_unchecked'),
+    'drop':  (1, 0, '_drop_unchecked'),
+    'swap':  (2, 2, '_swap_unchecked'),
+    'over':  (2, 3, '_over_unchecked'),
+    'rot':   (3, 3, '_rot_unchecked'),
+    '-rot':  (3, 3, '_nrot_unchecked'),
+    'nip':   (2, 1, '_nip_unchecked'),
+    'tuck':  (2, 3, '_tuck_unchecked'),
+    '2dup':  (2, 4, '_2dup_unchecked'),
+    '2drop': (2, 0, '_2drop_unchecked'),
+    '2swap': (4, 4, '_2swap_unchecked'),
+    '2over': (4, 6, '_2over_unchecked'),
+    'depth': (0, 1, None),
+    '.':     (1, 0, None),
+    '.r':    (2, 0, None),
+}
+
+
 class ForthStack:
     """Mixin providing stack manipulation operations"""
     
@@ -106,6 +127,51 @@ class ForthStack:
         if len(self.stack) >= 4:
             self.stack.extend([self.stack[-4], self.stack[-3]])
     
+    # -- Variantes sin comprobación de profundidad (modo trusted) --------
+    # Solo se llaman desde definiciones cuyo efecto de pila se ha verificado
+    # al compilar y cuya profundidad se ha comprobado al entrar en la palabra.
+    
+    def _dup_unchecked(self):
+        self.stack.append(self.stack[-1])
+    
+    def _drop_unchecked(self):
+        self.stack.pop()
+    
+    def _swap_unchecked(self):
+        s = self.stack
+        s[-1], s[-2] = s[-2], s[-1]
+    
+    def _over_unchecked(self):
+        self.stack.append(self.stack[-2])
+    
+    def _rot_unchecked(self):
+        s = self.stack
+        s.append(s.pop(-3))
+    
+    def _nrot_unchecked(self):
+        s = self.stack
+        s.insert(-2, s.pop())
+    
+    def _nip_unchecked(self):
+        del self.stack[-2]
+    
+    def _tuck_unchecked(self):
+        s = self.stack
+        s.insert(-2, s[-1])
+    
+    def _2dup_unchecked(self):
+        self.stack.extend(self.stack[-2:])
+    
+    def _2drop_unchecked(self):
+        del self.stack[-2:]
+    
+    def _2swap_unchecked(self):
+        s = self.stack
+        s[-4:] = s[-2:] + s[-4:-2]
+    
+    def _2over_unchecked(self):
+        self.stack.extend(self.stack[-4:-2])
+    
     def _pick(self):
         if self.stack:
             n = int(self.stack.pop())
@@ -153,8 +219,7 @@ class ForthStack:
                         out = str(int_value) + ' '
             except (ValueError, TypeError):
                 out = str(value) + ' '
-            self._forth_output.write(out)
-            self._forth_output.flush()
+            self._out(out)
 
     def _dot_r(self):
         if len(self.stack) >= 2:
@@ -173,8 +238,7 @@ class ForthStack:
                     num_str = str(int_value)
             except (ValueError, TypeError):
                 num_str = str(n)
-            self._forth_output.write(num_str.rjust(width) + ' ')
-            self._forth_output.flush()
+            self._out(num_str.rjust(width) + ' ')
     
     def _format_value(self, item, base):
         """Format a value for display, preserving floats"""
@@ -197,6 +261,7 @@ class ForthStack:
             return str(item)
     
     def _dot_s(self):
+        self._flush_output()        # lo pendiente de . / emit / type va antes
         base = self.variables.get('base', 10)
         formatted_stack = [self._format_value(item, base) for item in self.stack]
         
@@ -0,0 +1,317 @@
+"""
+PFForth Tracing - Execution trace hooks, ring-buffer tracer and actor sampler
+"""
+
+import sys
+import threading
+from collections import Counter, deque
+
+
+TRACE_EVENTS = ('call', 'return', 'primitive', 'exception')
+TRACE_RING_SIZE = 64
+SAMPLER_INTERVAL_MS = 10
+
+
+class ForthTracing:
+    """Mixin providing pluggable execution trace hooks
+
+    set_trace_hook(fn, events) instala envoltorios, como hace el profiler,
+    sobre las palabras de self.words y sobre las referencias ('cached', ...)
+    de los cuerpos compilados, de modo que el hook se invoca tanto desde
+    _execute_tokens como desde _run_compiled. Sin hook no hay envoltorios y
+    el intérprete no paga ningún coste.
+
+    El hook recibe (event, name, arg):
+        'call'       al entrar en una palabra de dos puntos
+        'return'     al salir de ella (también si sale por excepción)
+        'primitive'  al llamar a una primitiva
+        'exception'  cuando una excepción atraviesa la palabra (arg = excepción)
+    """
+
+    def _register_tracing_words(self):
+        """Register tracing words"""
+        self.words['trace-ring-on'] = self._trace_ring_on
+        self.words['trace-ring-off'] = self._trace_ring_off
+        self.words['trace-dump'] = self._trace_dump_word
+        self.words['actor-sample-on'] = self._actor_sample_on
+        self.words['actor-sample-off'] = self._actor_sample_off
+        self.words['actor-sample-report'] = self._actor_sample_report_word
+        self._trace = None
+        self._trace_ring = None
+        self._sampler = None
+
+    # ------------------------------------------------------------------ #
+    #  Hook                                                               #
+    # ------------------------------------------------------------------ #
+
+    def set_trace_hook(self, fn, events=('call', 'return', 'primitive')):
+        """Instala fn(event, name, arg) como hook de traza (uno por intérprete).
+        events limita los eventos que se generan; los no pedidos no cuestan nada."""
+        events = frozenset(events)
+        unknown = events - set(TRACE_EVENTS)
+        if unknown:
+            raise ValueError(f"eventos no validos: {', '.join(sorted(unknown))} "
+                             f"(usa {', '.join(TRACE_EVENTS)})")
+        if self._trace is not None:
+            self.clear_trace_hook()
+        self._trace = {'hook': fn, 'events': events}
+        for table in (self.words, self.immediate_words):
+            for name, word in list(table.items()):
+                table[name] = self._trace_wrap(name, word)
+        self._replace_cached(self._trace_wrap)
+        return self
+
+    def clear_trace_hook(self):
+        """Quita el hook de traza y restaura las palabras originales"""
+        if self._trace is None:
+            return self
+        unwrap = lambda name, fn: self._strip_layer(name, fn, '_traced')
+        self._replace_cached(unwrap)
+        for table in (self.words, self.immediate_words):
+            for name, fn in list(table.items()):
+                table[name] = unwrap(name, fn)
+        self._trace = None
+        self._trace_ring = None
+        return self
+
+    def _trace_wrap(self, name, fn):
+        """Devuelve fn envuelta para avisar al hook, o fn si no hace falta"""
+        if self._trace is None or self._has_layer(fn, '_traced'):
+            return fn
+        hook = self._trace['hook']
+        events = self._trace['events']
+        on_exception = 'exception' in events
+        inner = self._unwrap_word(fn)
+        defaults = getattr(inner, '__defaults__', None)
+
+        if defaults and isinstance(defaults[0], list) or inner == self._run_recurse:
+            on_call = 'call' in events
+            on_return = 'return' in events
+            if not (on_call or on_return or on_exception):
+                return fn
+
+            def traced():
+                if on_call:
+                    hook('call', name, None)
+                try:
+                    fn()
+                except BaseException as e:
+                    if on_exception:
+                        hook('exception', name, e)
+                    raise
+                finally:
+                    if on_return:
+                        hook('return', name, None)
+        elif 'primitive' in events:
+            def traced():
+                hook('primitive', name, None)
+                try:
+                    fn()
+                except BaseException as e:
+                    if on_exception:
+                        hook('exception', name, e)
+                    raise
+        else:
+            return fn
+
+        traced._traced = fn
+        return traced
+
+    # ------------------------------------------------------------------ #
+    #  Tracer en anillo                                                   #
+    # ------------------------------------------------------------------ #
+
+    def trace_ring(self, size=TRACE_RING_SIZE):
+        """Guarda las últimas size palabras ejecutadas y las vuelca cuando
+        una excepción sale de la palabra más externa."""
+        ring = {'events': deque(maxlen=size), 'depth': 0, 'dumped': None}
+        events = ring['events']
+
+        def hook(event, name, arg):
+            if event == 'call':
+                events.append((ring['depth'], name))
+                ring['depth'] += 1
+            elif event == 'return':
+                ring['depth'] = max(0, ring['depth'] - 1)
+            elif event == 'primitive':
+                events.append((ring['depth'], name))
+            elif ring['depth'] <= 1 and ring['dumped'] is not arg:
+                ring['dumped'] = arg
+                print(f"\nExcepcion en '{name}': {type(arg).__name__}: {arg}")
+                self.trace_dump()
+
+        self.set_trace_hook(hook, TRACE_EVENTS)
+        self._trace_ring = ring
+        return self
+
+    def trace_dump(self):
+        """Imprime el contenido del tracer en anillo (la última palabra al final)"""
+        if self._trace_ring is None:
+            print("Tracer en anillo inactivo (usa trace-ring-on)")
+            return self
+        entries = list(self._trace_ring['events'])
+        print(f"Ultimas {len(entries)} palabras ejecutadas:")
+        for depth, name in entries:
+            print(f"  {'  ' * min(depth, 20)}{name}")
+        return self
+
+    def _trace_ring_on(self):
+        """trace-ring-on ( n -- ) Recuerda las últimas n palabras y las vuelca
+        si una excepción llega al nivel superior"""
+        size = self.stack.pop() if self.stack and isinstance(self.stack[-1], int) else TRACE_RING_SIZE
+        if size <= 0:
+            print("Error: TRACE-RING-ON requiere un tamaño positivo")
+            return
+        self.trace_ring(size)
+        print(f"Tracer en anillo activado ({size} palabras)")
+
+    def _trace_ring_off(self):
+        """trace-ring-off ( -- ) Desactiva el tracer en anillo"""
+        if self._trace_ring is not None:
+            self.clear_trace_hook()
+        print("Tracer en anillo desactivado")
+
+    def _trace_dump_word(self):
+        """trace-dump ( -- ) Muestra las últimas palabras ejecutadas"""
+        self.trace_dump()
+
+    # ------------------------------------------------------------------ #
+    #  Muestreo de actores                                                #
+    # ------------------------------------------------------------------ #
+    # Muestreo estadístico: cada interval ms un hilo lee las pilas de Python
+    # de todos los hilos (sys._current_frames) y, en cada una, busca el
+    # word_action más interno: su 'self' dice qué actor es y su cuerpo
+    # compilado, qué palabra de dos puntos se está ejecutando.  No instala
+    # hooks ni envoltorios: los actores no pagan nada por llamada, solo el
+    # hilo de muestreo trabaja.  Se ven los actores de hilo y los handler
+    # (en el worker que los ejecuta); los de proceso, no.
+
+    _active_sampler = None
+
+    @staticmethod
+    def _sample_frame(frame, actors, names):
+        """(actor-id, nombre, palabra) de la pila frame, o None si el hilo no
+        ejecuta ninguna palabra de un actor"""
+        while frame is not None:
+            if frame.f_code.co_name == 'word_action':
+                local = frame.f_locals
+                forth = local.get('self')
+                # actor de hilo: su intérprete; handler: el buzón que el
+                # worker está atendiendo
+                actor = actors.get(id(forth)) or \
+                    actors.get(id(getattr(forth, '_actor_queue', None)))
+                if actor is not None:
+                    body = local.get('definition')
+                    # una caché por intérprete, vaciada al cambiar su
+                    # diccionario; los cuerpos sin nombre (:noname) también
+                    # se guardan para no recorrer el diccionario en cada
+                    # muestra
+                    version = (len(forth._definition_order), len(forth.words),
+                               len(forth.immediate_words))
+                    cached = names.get(id(forth))
+                    if cached is None or cached[0] != version:
+                        cached = names[id(forth)] = (version, {})
+                    bodies = cached[1]
+                    known = bodies.get(id(body))
+                    if known is None or known[0] is not body:
+                        for word, b in forth._compiled_bodies():
+                            bodies[id(b)] = (b, word)
+                        known = bodies.get(id(body))
+                        if known is None or known[0] is not body:
+                            known = bodies[id(body)] = (body, '<noname>')
+                    return actor + (known[1],)
+            frame = frame.f_back
+        return None
+
+    def start_actor_sampler(self, interval_ms=SAMPLER_INTERVAL_MS):
+        """Arranca el hilo que muestrea la palabra actual de cada actor"""
+        from .actors import ForthActors
+        if ForthTracing._active_sampler is not None:
+            print("Aviso: ya habia un muestreo de actores activo; se reinicia")
+            ForthTracing._active_sampler['owner'].stop_actor_sampler()
+        stop = threading.Event()
+        counts = Counter()
+        names = {}          # id(forth) -> (versión, {id(cuerpo): (cuerpo, palabra)})
+
+        def sample_loop():
+            me = threading.get_ident()
+            while not stop.wait(interval_ms / 1000.0):
+                actors = {id(e['forth'] if e.get('forth') is not None else e['queue']):
+                          (aid, e['name'])
+                          for aid, e in ForthActors._registry.items() if e.get('alive')}
+                frames = sys._current_frames()
+                frames.pop(me, None)
+                for frame in frames.values():
+                    hit = self._sample_frame(frame, actors, names)
+                    if hit is not None:
+                        counts[hit] += 1
+                frames = frame = None       # no retener pilas entre muestras
+                sampler['samples'] += 1
+
+        sampler = {'stop': stop, 'counts': counts, 'samples': 0, 'owner': self,
+                   'interval': interval_ms,
+                   'thread': threading.Thread(target=sample_loop, daemon=True,
+                                              name='actor-sampler')}
+        self._sampler = sampler
+        ForthTracing._active_sampler = sampler
+        sampler['thread'].start()
+        return self
+
+    def stop_actor_sampler(self):
+        """Detiene el muestreo y devuelve el informe (ver actor_sample_report)"""
+        sampler = self._sampler
+        if sampler is None:
+            return []
+        sampler['stop'].set()
+        sampler['thread'].join(timeout=1.0)
+        if ForthTracing._active_sampler is sampler:
+            ForthTracing._active_sampler = None
+        report = self.actor_sample_report()
+        self._sampler = None
+        self._last_sampler = sampler
+        return report
+
+    def actor_sample_report(self):
+        """Devuelve [{actor, name, word, samples, percent}] ordenado por muestras"""
+        sampler = self._sampler or getattr(self, '_last_sampler', None)
+        if sampler is None:
+            return []
+        totals = Counter()
+        for (aid, _, _), n in sampler['counts'].items():
+            totals[aid] += n
+        rows = [{'actor': aid, 'name': name, 'word': word, 'samples': n,
+                 'percent': 100.0 * n / totals[aid]}
+                for (aid, name, word), n in sampler['counts'].items()]
+        rows.sort(key=lambda r: (r['actor'], -r['samples']))
+        return rows
+
+    def _print_sample_report(self, rows):
+        """Imprime el informe del muestreo de actores"""
+        if not rows:
+            print("Muestreo de actores: sin datos")
+            return
+        print(f"{'Actor':>5} {'Nombre':<20} {'Palabra':<24} {'Muestras':>9} {'%':>6}")
+        print("-" * 68)
+        for r in rows:
+            print(f"{r['actor']:>5} {str(r['name'])[:20]:<20} {str(r['word'])[:24]:<24} "
+                  f"{r['samples']:>9} {r['percent']:>6.1f}")
+
+    def _actor_sample_on(self):
+        """actor-sample-on ( ms -- ) Muestrea cada ms la palabra actual de cada actor"""
+        interval = self.stack.pop() if self.stack and isinstance(self.stack[-1], int) else SAMPLER_INTERVAL_MS
+        if interval <= 0:
+            print("Error: ACTOR-SAMPLE-ON requiere un intervalo positivo en ms")
+            return
+        self.start_actor_sampler(interval)
+        print(f"Muestreo de actores activado (cada {interval} ms)")
+
+    def _actor_sample_off(self):
+        """actor-sample-off ( -- ) Detiene el muestreo e imprime el informe"""
+        if self._sampler is None:
+            print("Muestreo de actores inactivo")
+            return
+        self._print_sample_report(self.stop_actor_sampler())
+
+    def _actor_sample_report_word(self):
+        """actor-sample-report ( -- ) Informe del muestreo (activo o último)"""
+        self._print_sample_report(self.actor_sample_report())